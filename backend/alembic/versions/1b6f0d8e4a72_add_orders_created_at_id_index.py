@@ -0,0 +1,26 @@
+"""Add orders (created_at, id) index for the unfiltered admin order listing
+
+Revision ID: 1b6f0d8e4a72
+Revises: f8d3c6a0b415
+Create Date: 2026-10-18 09:12:31.408512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1b6f0d8e4a72'
+down_revision: Union[str, None] = 'f8d3c6a0b415'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_orders_created_at_id', 'orders', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_orders_created_at_id', table_name='orders')
@@ -0,0 +1,61 @@
+"""Store updated_at with microsecond precision
+
+ETags and change-feed cursors are derived from updated_at; at second
+precision two writes within the same second were indistinguishable.
+
+Revision ID: 3e9c7a5b1f64
+Revises: 1b6f0d8e4a72
+Create Date: 2026-10-18 10:03:57.221946
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e9c7a5b1f64'
+down_revision: Union[str, None] = '1b6f0d8e4a72'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = (
+    'checkout_jobs',
+    'idempotency_keys',
+    'order_items',
+    'orders',
+    'product_attributes',
+    'product_stock_shards',
+    'products',
+    'role_applications',
+    'roles',
+    'shopping_cart',
+    'stock_reservations',
+    'tombstones',
+    'user_roles',
+    'users',
+)
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.alter_column(
+            table,
+            'updated_at',
+            existing_type=mysql.DATETIME(),
+            type_=mysql.DATETIME(fsp=6),
+            existing_nullable=False,
+        )
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.alter_column(
+            table,
+            'updated_at',
+            existing_type=mysql.DATETIME(fsp=6),
+            type_=mysql.DATETIME(),
+            existing_nullable=False,
+        )
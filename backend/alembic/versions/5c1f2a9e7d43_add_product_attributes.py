@@ -0,0 +1,132 @@
+"""Add product_attributes for indexed specification filters
+
+Revision ID: 5c1f2a9e7d43
+Revises: 33b89a4fd76b
+Create Date: 2026-10-17 09:12:40.118204
+
+"""
+import re
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1f2a9e7d43'
+down_revision: Union[str, None] = '33b89a4fd76b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copy of the specification flattening in app/products/specs.py as of
+# this revision, so the backfill does not change when the app code does.
+_NUMERIC_VALUE_RE = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*[^\d\s]*\s*$")
+_KEY_MAX_LENGTH = 100
+_VALUE_MAX_LENGTH = 255
+
+
+def _flatten(specs, prefix=""):
+    if not isinstance(specs, dict):
+        return
+    for key, value in specs.items():
+        full_key = f"{prefix}{key}"
+        if isinstance(value, dict):
+            yield from _flatten(value, f"{full_key}.")
+        elif isinstance(value, (list, tuple)):
+            for element in value:
+                if isinstance(element, dict):
+                    yield from _flatten(element, f"{full_key}.")
+                elif element is not None:
+                    yield full_key, element
+        elif value is not None:
+            yield full_key, value
+
+
+def _normalize_value(value):
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value).strip().lower()[:_VALUE_MAX_LENGTH]
+
+
+def _parse_number(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _NUMERIC_VALUE_RE.match(str(value))
+    return float(match.group(1)) if match else None
+
+
+def _attribute_values(specs):
+    seen = set()
+    values = []
+    for key, value in _flatten(specs):
+        row = (key.strip().lower()[:_KEY_MAX_LENGTH], _normalize_value(value))
+        if row in seen:
+            continue
+        seen.add(row)
+        values.append((row[0], row[1], _parse_number(value)))
+    return values
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    # Product.specifications was declared on the model but never made it into
+    # the initial revision.
+    product_columns = {c['name'] for c in sa.inspect(bind).get_columns('products')}
+    if 'specifications' not in product_columns:
+        op.add_column('products', sa.Column('specifications', sa.JSON(), nullable=True))
+
+    op.create_table('product_attributes',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('key', sa.String(length=100), nullable=False),
+    sa.Column('value_str', sa.String(length=255), nullable=True),
+    sa.Column('value_num', sa.Float(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_product_attributes_id'), 'product_attributes', ['id'], unique=False)
+    op.create_index(op.f('ix_product_attributes_product_id'), 'product_attributes', ['product_id'], unique=False)
+    op.create_index('ix_product_attributes_key_str', 'product_attributes', ['key', 'value_str', 'product_id'], unique=False)
+    op.create_index('ix_product_attributes_key_num', 'product_attributes', ['key', 'value_num', 'product_id'], unique=False)
+
+    # Backfill from existing specifications.
+    products = sa.table('products', sa.column('id', sa.Integer()), sa.column('specifications', sa.JSON()))
+    attributes = sa.table(
+        'product_attributes',
+        sa.column('product_id', sa.Integer()),
+        sa.column('key', sa.String()),
+        sa.column('value_str', sa.String()),
+        sa.column('value_num', sa.Float()),
+        sa.column('created_at', sa.DateTime()),
+        sa.column('updated_at', sa.DateTime()),
+    )
+    now = datetime.utcnow()
+    rows = []
+    for product_id, specifications in bind.execute(
+        sa.select(products.c.id, products.c.specifications).where(products.c.specifications.isnot(None))
+    ):
+        for key, value_str, value_num in _attribute_values(specifications):
+            rows.append({
+                'product_id': product_id,
+                'key': key,
+                'value_str': value_str,
+                'value_num': value_num,
+                'created_at': now,
+                'updated_at': now,
+            })
+    if rows:
+        op.bulk_insert(attributes, rows)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_product_attributes_key_num', table_name='product_attributes')
+    op.drop_index('ix_product_attributes_key_str', table_name='product_attributes')
+    op.drop_index(op.f('ix_product_attributes_product_id'), table_name='product_attributes')
+    op.drop_index(op.f('ix_product_attributes_id'), table_name='product_attributes')
+    op.drop_table('product_attributes')
@@ -0,0 +1,32 @@
+"""Bind idempotency keys of asynchronous checkouts to their checkout job
+
+Revision ID: 6a4d2e9c8b17
+Revises: 3e9c7a5b1f64
+Create Date: 2026-10-19 10:04:52.731946
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6a4d2e9c8b17'
+down_revision: Union[str, None] = '3e9c7a5b1f64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('idempotency_keys', sa.Column('checkout_job_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'fk_idempotency_keys_checkout_job_id', 'idempotency_keys', 'checkout_jobs',
+        ['checkout_job_id'], ['id'], ondelete='CASCADE'
+    )
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM idempotency_keys WHERE checkout_job_id IS NOT NULL")
+    op.drop_constraint('fk_idempotency_keys_checkout_job_id', 'idempotency_keys', type_='foreignkey')
+    op.drop_column('idempotency_keys', 'checkout_job_id')
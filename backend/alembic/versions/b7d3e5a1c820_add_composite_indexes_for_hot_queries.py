@@ -0,0 +1,61 @@
+"""Add composite indexes for hot list and cart queries
+
+Revision ID: b7d3e5a1c820
+Revises: 8e4b6d0c2f19
+Create Date: 2026-10-17 14:02:51.904417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d3e5a1c820'
+down_revision: Union[str, None] = '8e4b6d0c2f19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # InnoDB appends the primary key to every secondary index, so these also
+    # serve the (created_at, id) keyset ordering without a filesort.
+    op.create_index('ix_orders_user_id_created_at', 'orders', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_orders_shipper_id_created_at', 'orders', ['shipper_id', 'created_at'], unique=False)
+    op.create_index('ix_products_is_active_category_created_at', 'products', ['is_active', 'category', 'created_at'], unique=False)
+    op.create_index('ix_products_is_active_created_at', 'products', ['is_active', 'created_at'], unique=False)
+
+    # Merge duplicate cart lines (same user and product) before enforcing uniqueness.
+    op.execute(
+        """
+        UPDATE shopping_cart sc
+        JOIN (
+            SELECT MIN(id) AS keep_id, SUM(quantity) AS total
+            FROM shopping_cart
+            GROUP BY user_id, product_id
+            HAVING COUNT(*) > 1
+        ) dup ON sc.id = dup.keep_id
+        SET sc.quantity = dup.total
+        """
+    )
+    op.execute(
+        """
+        DELETE sc FROM shopping_cart sc
+        JOIN (
+            SELECT user_id, product_id, MIN(id) AS keep_id
+            FROM shopping_cart
+            GROUP BY user_id, product_id
+            HAVING COUNT(*) > 1
+        ) dup ON sc.user_id = dup.user_id AND sc.product_id = dup.product_id AND sc.id <> dup.keep_id
+        """
+    )
+    op.create_index('uq_shopping_cart_user_id_product_id', 'shopping_cart', ['user_id', 'product_id'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('uq_shopping_cart_user_id_product_id', table_name='shopping_cart')
+    op.drop_index('ix_products_is_active_created_at', table_name='products')
+    op.drop_index('ix_products_is_active_category_created_at', table_name='products')
+    op.drop_index('ix_orders_shipper_id_created_at', table_name='orders')
+    op.drop_index('ix_orders_user_id_created_at', table_name='orders')
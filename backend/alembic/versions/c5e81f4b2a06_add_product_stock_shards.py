@@ -0,0 +1,42 @@
+"""Add product stock shards for hot-SKU mode
+
+Revision ID: c5e81f4b2a06
+Revises: a93e6c2d5f17
+Create Date: 2026-10-17 20:14:08.336912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e81f4b2a06'
+down_revision: Union[str, None] = 'a93e6c2d5f17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('products', sa.Column('stock_shards', sa.Integer(), server_default='0', nullable=False))
+    op.create_table(
+        'product_stock_shards',
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('slot', sa.Integer(), nullable=False),
+        sa.Column('stock_quantity', sa.Integer(), nullable=False),
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_product_stock_shards_id'), 'product_stock_shards', ['id'], unique=False)
+    op.create_index('uq_product_stock_shards_product_id_slot', 'product_stock_shards', ['product_id', 'slot'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('uq_product_stock_shards_product_id_slot', table_name='product_stock_shards')
+    op.drop_index(op.f('ix_product_stock_shards_id'), table_name='product_stock_shards')
+    op.drop_table('product_stock_shards')
+    op.drop_column('products', 'stock_shards')
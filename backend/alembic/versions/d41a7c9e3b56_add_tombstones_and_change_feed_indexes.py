@@ -0,0 +1,45 @@
+"""Add tombstones table and change feed indexes
+
+Revision ID: d41a7c9e3b56
+Revises: b7d3e5a1c820
+Create Date: 2026-10-17 16:25:12.730118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41a7c9e3b56'
+down_revision: Union[str, None] = 'b7d3e5a1c820'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'tombstones',
+        sa.Column('entity', sa.String(length=50), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('owner_id', sa.Integer(), nullable=True),
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_tombstones_id'), 'tombstones', ['id'], unique=False)
+    op.create_index('ix_tombstones_entity_updated_at', 'tombstones', ['entity', 'updated_at'], unique=False)
+    op.create_index('ix_tombstones_entity_owner_id_updated_at', 'tombstones', ['entity', 'owner_id', 'updated_at'], unique=False)
+    op.create_index('ix_products_updated_at', 'products', ['updated_at'], unique=False)
+    op.create_index('ix_orders_user_id_updated_at', 'orders', ['user_id', 'updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_orders_user_id_updated_at', table_name='orders')
+    op.drop_index('ix_products_updated_at', table_name='products')
+    op.drop_index('ix_tombstones_entity_owner_id_updated_at', table_name='tombstones')
+    op.drop_index('ix_tombstones_entity_updated_at', table_name='tombstones')
+    op.drop_index(op.f('ix_tombstones_id'), table_name='tombstones')
+    op.drop_table('tombstones')
@@ -0,0 +1,26 @@
+"""Add orders (status, created_at) index for filtered order listings
+
+Revision ID: f2c8a1d9b374
+Revises: d41a7c9e3b56
+Create Date: 2026-10-17 18:10:44.215093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c8a1d9b374'
+down_revision: Union[str, None] = 'd41a7c9e3b56'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_orders_status_created_at', 'orders', ['status', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_orders_status_created_at', table_name='orders')
@@ -0,0 +1,46 @@
+"""Add checkout jobs for asynchronous checkout
+
+Revision ID: f8d3c6a0b415
+Revises: e7a2b94c1d38
+Create Date: 2026-10-17 22:08:17.640329
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f8d3c6a0b415'
+down_revision: Union[str, None] = 'e7a2b94c1d38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'checkout_jobs',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.Enum('QUEUED', 'SUCCEEDED', 'FAILED', name='checkoutjobstatus'), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('idempotency_key', sa.String(length=255), nullable=True),
+        sa.Column('order_id', sa.Integer(), nullable=True),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ondelete='SET NULL'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_checkout_jobs_id'), 'checkout_jobs', ['id'], unique=False)
+    op.create_index('uq_checkout_jobs_user_id_idempotency_key', 'checkout_jobs', ['user_id', 'idempotency_key'], unique=True)
+    op.create_index('ix_checkout_jobs_status_updated_at', 'checkout_jobs', ['status', 'updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_checkout_jobs_status_updated_at', table_name='checkout_jobs')
+    op.drop_index('uq_checkout_jobs_user_id_idempotency_key', table_name='checkout_jobs')
+    op.drop_index(op.f('ix_checkout_jobs_id'), table_name='checkout_jobs')
+    op.drop_table('checkout_jobs')
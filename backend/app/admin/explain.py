@@ -0,0 +1,106 @@
+"""
+EXPLAIN the hot query shapes and fail when any of them falls back to a full
+table scan or a filesort.
+
+Run against a database with production-like volumes; on near-empty tables
+MySQL may legitimately prefer a scan over an index.
+
+    python -m app.admin.explain
+"""
+import sys
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Query, Session
+
+from app.database import SessionLocal
+from app.models import Order, OrderStatus, Product, ShoppingCart
+from app.pagination import clamp_limit
+
+
+def _sample(db: Session, column, default):
+    value = db.query(column).filter(column.isnot(None)).limit(1).scalar()
+    return default if value is None else value
+
+
+def _page(query: Query, created_col, id_col) -> Query:
+    return query.order_by(created_col.desc(), id_col.desc()).limit(clamp_limit(None) + 1)
+
+
+def hot_queries(db: Session) -> Dict[str, Query]:
+    user_id = _sample(db, Order.user_id, 1)
+    shipper_id = _sample(db, Order.shipper_id, 1)
+    created_from = _sample(db, Order.created_at, datetime(2024, 1, 1))
+    category = _sample(db, Product.category, "CPU")
+    cart_user_id = _sample(db, ShoppingCart.user_id, 1)
+    cart_product_id = _sample(db, ShoppingCart.product_id, 1)
+
+    return {
+        "list_my_orders": _page(
+            db.query(Order).filter(Order.user_id == user_id), Order.created_at, Order.id
+        ),
+        "list_assigned_orders": _page(
+            db.query(Order).filter(Order.shipper_id == shipper_id), Order.created_at, Order.id
+        ),
+        "list_all_orders": _page(db.query(Order), Order.created_at, Order.id),
+        "list_all_orders_by_date": _page(
+            db.query(Order).filter(Order.created_at >= created_from), Order.created_at, Order.id
+        ),
+        "list_all_orders_by_status": _page(
+            db.query(Order).filter(Order.status == OrderStatus.PENDING), Order.created_at, Order.id
+        ),
+        "list_products": _page(
+            db.query(Product).filter(Product.is_active == True),
+            Product.created_at,
+            Product.id,
+        ),
+        "list_products_by_category": _page(
+            db.query(Product).filter(Product.is_active == True, Product.category == category),
+            Product.created_at,
+            Product.id,
+        ),
+        "add_to_cart": db.query(ShoppingCart)
+        .filter(ShoppingCart.user_id == cart_user_id, ShoppingCart.product_id == cart_product_id),
+    }
+
+
+def explain(db: Session, query: Query) -> List[dict]:
+    sql = query.statement.compile(dialect=db.bind.dialect, compile_kwargs={"literal_binds": True})
+    return [dict(row._mapping) for row in db.execute(text(f"EXPLAIN {sql}"))]
+
+
+def problems(plan: List[dict]) -> List[str]:
+    found = []
+    for row in plan:
+        table = row.get("table")
+        if row.get("type") == "ALL":
+            found.append(f"full scan on {table}")
+        if "Using filesort" in (row.get("Extra") or ""):
+            found.append(f"filesort on {table}")
+    return found
+
+
+def check_hot_queries() -> List[Tuple[str, List[str]]]:
+    db = SessionLocal()
+    try:
+        failures = []
+        for name, query in hot_queries(db).items():
+            plan = explain(db, query)
+            issues = problems(plan)
+            for row in plan:
+                print(f"{name}: table={row.get('table')} type={row.get('type')} key={row.get('key')} extra={row.get('Extra')}")
+            if issues:
+                failures.append((name, issues))
+        return failures
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    failures = check_hot_queries()
+    if failures:
+        for name, issues in failures:
+            print(f"FAIL {name}: {', '.join(issues)}")
+        sys.exit(1)
+    print("Hot query plans OK")
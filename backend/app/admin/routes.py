@@ -1,10 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from typing import List
 
 from app.database import get_db
 from app.models import User, Role, RoleApplication, RoleApplicationStatus, UserRole
-from app.middleware import require_roles, get_current_user_roles
+from app.middleware import require_roles, get_current_user_roles, users_with_roles
 from app.schemas import UserResponse, RoleApplicationResponse, RoleApplicationUpdate
 
 router = APIRouter(prefix="/admin", tags=["admin"])
@@ -23,12 +23,18 @@ def _to_user_response(user) -> UserResponse:
         roles=roles
     )
 
+def _role_applications(db: Session):
+    return db.query(RoleApplication).options(
+        joinedload(RoleApplication.user).load_only(User.username),
+        joinedload(RoleApplication.role),
+    )
+
 @router.get("/users", response_model=List[UserResponse])
 async def list_users(
     db: Session = Depends(get_db),
     _admin = Depends(require_roles(["ADMIN"]))
 ):
-    users = db.query(User).all()
+    users = users_with_roles(db).all()
     return [_to_user_response(u) for u in users]
 
 @router.get("/role-applications", response_model=List[RoleApplicationResponse])
@@ -36,7 +42,7 @@ async def list_role_applications(
     db: Session = Depends(get_db),
     _admin = Depends(require_roles(["ADMIN"]))
 ):
-    apps = db.query(RoleApplication).all()
+    apps = _role_applications(db).all()
     return [
         RoleApplicationResponse(
             id=a.id,
@@ -71,7 +77,7 @@ async def update_user_roles(
             db.add(UserRole(user_id=user_id, role_id=role.id))
             
     db.commit()
-    db.refresh(user)
+    user = users_with_roles(db).filter(User.id == user_id).populate_existing().one()
     return _to_user_response(user)
 
 @router.put("/role-applications/{app_id}", response_model=RoleApplicationResponse)
@@ -81,7 +87,7 @@ async def update_role_application(
     db: Session = Depends(get_db),
     admin = Depends(require_roles(["ADMIN"]))
 ):
-    app = db.query(RoleApplication).filter(RoleApplication.id == app_id).first()
+    app = _role_applications(db).filter(RoleApplication.id == app_id).first()
     if not app:
         raise HTTPException(status_code=404, detail="Application not found")
     
@@ -99,7 +105,7 @@ async def update_role_application(
             db.add(UserRole(user_id=app.user_id, role_id=app.role_id))
             
     db.commit()
-    db.refresh(app)
+    app = _role_applications(db).filter(RoleApplication.id == app_id).populate_existing().one()
     
     return RoleApplicationResponse(
         id=app.id,
@@ -9,7 +9,7 @@ from app.auth import (
     verify_password,
     TokenResponse,
 )
-from app.middleware import get_current_user as get_current_user_dep, get_current_user_roles
+from app.middleware import get_current_user as get_current_user_dep, get_current_user_roles, users_with_roles
 from app.schemas import LoginRequest, RegisterRequest, UserResponse, TokenResponse as TokenSchema
 from app.config import settings
 
@@ -64,7 +64,7 @@ async def register(
     user_role_assignment = UserRole(user_id=new_user.id, role_id=user_role.id)
     db.add(user_role_assignment)
     db.commit()
-    db.refresh(new_user)
+    new_user = users_with_roles(db).filter(User.id == new_user.id).populate_existing().one()
     
     # Create token
     roles = get_user_roles(new_user)
@@ -99,7 +99,7 @@ async def login(
         Token response with user details
     """
     # Find user by username
-    user = db.query(User).filter(User.username == request.username).first()
+    user = users_with_roles(db).filter(User.username == request.username).first()
     
     if not user or not verify_password(request.password, user.password_hash):
         raise HTTPException(
@@ -0,0 +1,48 @@
+"""
+In-process periodic jobs, started and stopped with the app (see app.main).
+
+Each worker process runs its own copy, so jobs must be safe to run
+concurrently with themselves on other workers.
+"""
+import abc
+import logging
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask(abc.ABC):
+    """Daemon thread that calls run_once() every interval seconds."""
+
+    name = "periodic-task"
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @abc.abstractmethod
+    def run_once(self) -> None:
+        """One round of work; exceptions are logged and the next round still runs."""
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("%s failed", self.name)
@@ -0,0 +1,117 @@
+"""
+Order placement from a user's cart.
+
+Shared by the synchronous POST /cart/checkout route and the asynchronous
+checkout workers in app.cart.jobs, so both paths convert holds, take stock,
+create the order and clear the cart the same way.
+"""
+from typing import Callable, List, Optional, Union
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Query, Session, joinedload
+
+from app.cart import reservations
+from app.cart.stock import current_stock, decrement_stock
+from app.models import Order, OrderItem, OrderStatus, ShoppingCart
+from app.products import events
+from app.schemas import CheckoutConflict, CheckoutItem, CheckoutRequest, CheckoutResponse, CheckoutShortfall
+
+
+def cart_items(db: Session) -> Query:
+    return db.query(ShoppingCart).options(joinedload(ShoppingCart.product))
+
+
+def place_order(
+    db: Session,
+    user_id: int,
+    payload: CheckoutRequest,
+    before_commit: Optional[Callable[[CheckoutResponse], None]] = None,
+) -> Union[CheckoutResponse, CheckoutConflict]:
+    """
+    Turn the user's cart into an order and commit.
+
+    Raises 400 when the cart is empty. When stock runs short the transaction
+    is rolled back and the CheckoutConflict describing the lines is returned.
+    before_commit may add its own writes for the same transaction.
+    """
+    items = cart_items(db).filter(ShoppingCart.user_id == user_id).all()
+
+    if not items:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cart is empty")
+
+    # Convert the user's holds and take any remaining units in one
+    # conditional UPDATE per line.
+    held = reservations.claim(db, user_id, [item.product_id for item in items])
+    shortfalls = decrement_stock(db, [(item.product_id, item.quantity) for item in items], held)
+    if shortfalls:
+        names = {item.product_id: item.product.name for item in items}
+        db.rollback()
+        oversold = [
+            CheckoutShortfall(
+                product_id=s.product_id,
+                product_name=names[s.product_id],
+                requested=s.requested,
+                available=s.available,
+            )
+            for s in shortfalls
+        ]
+        detail = "Not enough stock for: " + ", ".join(
+            f"{line.product_name} (requested {line.requested}, available {line.available})" for line in oversold
+        )
+        return CheckoutConflict(detail=detail, oversold=oversold)
+
+    total_price = sum(item.product.price * item.quantity for item in items)
+
+    order = Order(
+        user_id=user_id,
+        status=OrderStatus.PENDING,
+        total_price=total_price,
+        shipping_address=payload.shipping_address,
+        notes=payload.notes,
+    )
+    db.add(order)
+    db.flush()
+
+    order_items: List[OrderItem] = []
+    response_items: List[CheckoutItem] = []
+    stock_changes: List[tuple] = []
+    stock = current_stock(db, [item.product_id for item in items])
+
+    for item in items:
+        order_item = OrderItem(
+            order_id=order.id,
+            product_id=item.product_id,
+            quantity=item.quantity,
+            price_at_order=item.product.price,
+        )
+        order_items.append(order_item)
+
+        response_items.append(
+            CheckoutItem(
+                product_id=item.product_id,
+                product_name=item.product.name,
+                quantity=item.quantity,
+                price_at_order=item.product.price,
+            )
+        )
+
+        previous = events.snapshot(item.product)
+        stock_changes.append((previous, previous._replace(stock_quantity=stock[item.product_id])))
+
+    db.add_all(order_items)
+
+    # Clear cart
+    for item in items:
+        db.delete(item)
+
+    result = CheckoutResponse(
+        order_id=order.id,
+        total_price=total_price,
+        items=response_items,
+    )
+    if before_commit is not None:
+        before_commit(result)
+
+    db.commit()
+    events.inventory_changed(stock_changes)
+    return result
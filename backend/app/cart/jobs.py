@@ -0,0 +1,296 @@
+"""
+Asynchronous checkout.
+
+POST /cart/checkout/async stores a checkout_jobs row and answers 202 with the
+job id; clients poll GET /cart/checkout/jobs/{id} for the outcome. The job id
+goes on a bounded in-process queue served by CHECKOUT_WORKERS threads, so a
+burst of checkouts is absorbed by the queue instead of by the connection
+pool. When the queue is full the API answers 503 with Retry-After rather
+than accept work it cannot get to.
+
+A worker drains up to CHECKOUT_BATCH_SIZE jobs at a time and handles them on
+one database session, each in its own transaction: the job row is locked
+while QUEUED, the order is placed (app.cart.checkout.place_order) and the job
+marked SUCCEEDED in the same commit. A crash or a second worker therefore
+never places an order twice, and a job whose transaction was lost stays
+QUEUED. The database row is the source of truth; the queue is only a
+dispatch hint, so a periodic task re-queues jobs that have been QUEUED for
+more than CHECKOUT_JOB_STALE_SECONDS (after a restart, or when the queue was
+full). The queue remembers which job ids it holds until a worker has handled
+them, so a job that is merely waiting its turn is never queued twice.
+
+An Idempotency-Key is claimed in idempotency_keys in the job's transaction,
+so a key already used for a synchronous checkout, or being used by one right
+now, is rejected rather than queued (see app.idempotency).
+"""
+import logging
+import queue
+import threading
+from datetime import datetime, timedelta
+from typing import List, Optional, Set
+
+from fastapi import HTTPException, status
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app import idempotency
+from app.background import PeriodicTask
+from app.cart.checkout import place_order
+from app.config import settings
+from app.database import SessionLocal
+from app.models import CheckoutJob, CheckoutJobStatus
+from app.schemas import CheckoutConflict, CheckoutJobResponse, CheckoutRequest, CheckoutResponse
+
+logger = logging.getLogger(__name__)
+
+
+def to_job_response(job: CheckoutJob) -> CheckoutJobResponse:
+    succeeded = job.status == CheckoutJobStatus.SUCCEEDED
+    failed = job.status == CheckoutJobStatus.FAILED
+    return CheckoutJobResponse(
+        id=job.id,
+        status=job.status.value,
+        order_id=job.order_id,
+        result=CheckoutResponse.model_validate(job.result) if succeeded else None,
+        error=CheckoutConflict.model_validate(job.result) if failed else None,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+    )
+
+
+def enqueue(db: Session, user_id: int, payload: CheckoutRequest, idempotency_key: Optional[str]) -> CheckoutJob:
+    """
+    Record a checkout job and hand it to the workers. A repeated
+    idempotency_key returns the job it created the first time.
+    """
+    request_hash = idempotency.fingerprint(payload)
+    if idempotency_key:
+        existing = _job_for_key(db, user_id, idempotency_key, payload, request_hash)
+        if existing is not None:
+            return existing
+
+    if checkout_queue.full():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Checkout is busy, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+
+    job = CheckoutJob(
+        user_id=user_id,
+        status=CheckoutJobStatus.QUEUED,
+        payload=payload.model_dump(mode="json"),
+        idempotency_key=idempotency_key,
+    )
+    db.add(job)
+    try:
+        db.flush()
+        if idempotency_key:
+            # Claimed in the job's transaction, through the index the
+            # synchronous endpoint claims its keys with.
+            claimed_by = idempotency.claim_for_job(db, user_id, idempotency_key, request_hash, job.id)
+            if claimed_by is not None:
+                db.rollback()
+                return db.get(CheckoutJob, claimed_by)
+        db.commit()
+    except IntegrityError:
+        # The same key was just used by a concurrent request.
+        db.rollback()
+        return _job_for_key(db, user_id, idempotency_key, payload, request_hash)
+
+    # If the queue filled up in the meantime the job waits for the re-queue task.
+    checkout_queue.offer(job.id)
+    return job
+
+
+def _job_for_key(
+    db: Session, user_id: int, key: str, payload: CheckoutRequest, request_hash: str
+) -> Optional[CheckoutJob]:
+    job_id = idempotency.job_for_key(db, user_id, key, request_hash)
+    if job_id is not None:
+        return db.get(CheckoutJob, job_id)
+    # The idempotency_keys row expires before the job does.
+    job = (
+        db.query(CheckoutJob)
+        .filter(CheckoutJob.user_id == user_id, CheckoutJob.idempotency_key == key)
+        .first()
+    )
+    return _same_request(job, payload) if job is not None else None
+
+
+def _same_request(job: CheckoutJob, payload: CheckoutRequest) -> CheckoutJob:
+    if job.payload != payload.model_dump(mode="json"):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"{idempotency.HEADER} was already used for a different request",
+        )
+    return job
+
+
+def process(db: Session, job_id: int) -> None:
+    """Place the order of one job, unless it is no longer QUEUED."""
+    job = (
+        db.query(CheckoutJob)
+        .filter(CheckoutJob.id == job_id, CheckoutJob.status == CheckoutJobStatus.QUEUED)
+        .with_for_update()
+        .first()
+    )
+    if job is None:
+        db.rollback()
+        return
+    user_id = job.user_id
+    payload = CheckoutRequest.model_validate(job.payload)
+
+    def succeed(placed: CheckoutResponse) -> None:
+        job.status = CheckoutJobStatus.SUCCEEDED
+        job.order_id = placed.order_id
+        job.result = placed.model_dump(mode="json")
+
+    try:
+        outcome = place_order(db, user_id, payload, before_commit=succeed)
+    except HTTPException as exc:
+        db.rollback()
+        outcome = CheckoutConflict(detail=exc.detail, oversold=[])
+    if isinstance(outcome, CheckoutConflict):
+        # place_order rolled back; the job row is still QUEUED.
+        db.execute(
+            update(CheckoutJob)
+            .where(CheckoutJob.id == job_id, CheckoutJob.status == CheckoutJobStatus.QUEUED)
+            .values(status=CheckoutJobStatus.FAILED, result=outcome.model_dump(mode="json"))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+
+
+class CheckoutQueue:
+    """Bounded queue of job ids served by a pool of worker threads."""
+
+    def __init__(self, workers: int, size: int, batch_size: int):
+        self.workers = workers
+        self.batch_size = batch_size
+        self._queue: "queue.Queue[Optional[int]]" = queue.Queue(maxsize=size)
+        self._threads: List[threading.Thread] = []
+        self._queued: Set[int] = set()
+        self._lock = threading.Lock()
+
+    def full(self) -> bool:
+        return self._queue.full()
+
+    def free_slots(self) -> int:
+        return self._queue.maxsize - self._queue.qsize()
+
+    def offer(self, job_id: int) -> bool:
+        """Queue job_id unless it is already waiting; False when the queue is full."""
+        with self._lock:
+            if job_id in self._queued:
+                return True
+            try:
+                self._queue.put_nowait(job_id)
+            except queue.Full:
+                return False
+            self._queued.add(job_id)
+            return True
+
+    def queued(self) -> Set[int]:
+        """Ids offered and not yet handled by a worker."""
+        with self._lock:
+            return set(self._queued)
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"checkout-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        """Let the workers finish the jobs already queued, then end them."""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def _work(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch[-1] is None:
+                self._run(batch[:-1])
+                return
+            self._run(batch)
+
+    def _next_batch(self) -> List[Optional[int]]:
+        batch = [self._queue.get()]
+        while batch[-1] is not None and len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self, job_ids: List[int]) -> None:
+        if not job_ids:
+            return
+        db = SessionLocal()
+        try:
+            for job_id in job_ids:
+                try:
+                    process(db, job_id)
+                except Exception:
+                    logger.exception("Checkout job %s failed", job_id)
+                    db.rollback()
+                finally:
+                    with self._lock:
+                        self._queued.discard(job_id)
+        finally:
+            db.close()
+
+
+class CheckoutRequeuer(PeriodicTask):
+    """
+    Puts jobs that have been QUEUED for too long back on the local queue,
+    skipping the ones still waiting in it.
+    """
+
+    name = "checkout-requeuer"
+
+    def run_once(self) -> None:
+        room = checkout_queue.free_slots()
+        if room <= 0:
+            return
+        db = SessionLocal()
+        try:
+            cutoff = datetime.utcnow() - timedelta(seconds=settings.CHECKOUT_JOB_STALE_SECONDS)
+            stale = db.query(CheckoutJob.id).filter(
+                CheckoutJob.status == CheckoutJobStatus.QUEUED, CheckoutJob.updated_at <= cutoff
+            )
+            queued = checkout_queue.queued()
+            if queued:
+                stale = stale.filter(CheckoutJob.id.notin_(sorted(queued)))
+            ids = [
+                job_id
+                for (job_id,) in stale
+                .order_by(CheckoutJob.updated_at)
+                .limit(room)
+                .all()
+            ]
+            if not ids:
+                return
+            # Restart the clock so the next run does not queue them again.
+            db.execute(
+                update(CheckoutJob)
+                .where(CheckoutJob.id.in_(ids), CheckoutJob.status == CheckoutJobStatus.QUEUED)
+                .values(updated_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+        finally:
+            db.close()
+        for job_id in ids:
+            checkout_queue.offer(job_id)
+
+
+checkout_queue = CheckoutQueue(settings.CHECKOUT_WORKERS, settings.CHECKOUT_QUEUE_SIZE, settings.CHECKOUT_BATCH_SIZE)
+checkout_requeuer = CheckoutRequeuer(settings.CHECKOUT_JOB_STALE_SECONDS)
@@ -0,0 +1,217 @@
+"""
+Time-limited stock holds between adding to the cart and checking out.
+
+Each cart line owns at most one reservation row, and the units it holds are
+also counted in products.reserved_quantity, so availability is read from the
+product row alone (stock_quantity - reserved_quantity) instead of summing the
+holds. Taking or resizing a hold is a conditional UPDATE on that counter, the
+same way checkout takes stock in app.cart.stock. Holds leave the stock level
+as it is, so these updates pin products.updated_at (Core updates would
+otherwise apply its onupdate) and do not show up in the change feeds.
+
+Holds that run out are not released by the request path; a background
+sweeper deletes expired rows in batches and gives their units back with one
+set-based UPDATE per batch. Until then an expired hold still counts, which can
+only make availability look lower, never oversell.
+
+Hot products (app.cart.shards) keep their unreserved units in shard rows;
+holds on them move units out of a shard and back, leaving the products row
+alone.
+
+Lock order is reservation rows first, then product rows in id order, in every
+path here and in checkout, so these transactions cannot deadlock each other.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Iterable
+
+from fastapi import HTTPException, status
+from sqlalchemy import case, delete, update
+from sqlalchemy.orm import Session
+
+from app.background import PeriodicTask
+from app.cart import shards
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Product, StockReservation
+from app.products import events
+
+
+def hold(db: Session, user_id: int, product_id: int, quantity: int) -> datetime:
+    """
+    Set the user's hold on a product to quantity units inside the caller's
+    transaction and return when it expires. Raises 400 when the product is
+    below STOCK_THRESHOLD or the extra units are not available.
+    """
+    reservation = (
+        db.query(StockReservation)
+        .filter(StockReservation.user_id == user_id, StockReservation.product_id == product_id)
+        .with_for_update()
+        .first()
+    )
+    own = reservation.quantity if reservation else 0
+    delta = quantity - own
+
+    hot = shards.hot_products(db, [product_id]).get(product_id)
+    if hot:
+        _hold_sharded(db, product_id, hot, own, delta)
+    else:
+        conditions = [Product.id == product_id, Product.stock_quantity >= settings.STOCK_THRESHOLD]
+        if delta > 0:
+            conditions.append(Product.stock_quantity - Product.reserved_quantity >= delta)
+        result = db.execute(
+            update(Product)
+            .where(*conditions)
+            .values(reserved_quantity=Product.reserved_quantity + delta, updated_at=Product.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            stock, reserved = (
+                db.query(Product.stock_quantity, Product.reserved_quantity).filter(Product.id == product_id).one()
+            )
+            _reject(stock, stock - reserved + own)
+
+    expires_at = datetime.utcnow() + timedelta(seconds=settings.RESERVATION_TTL_SECONDS)
+    if reservation:
+        reservation.quantity = quantity
+        reservation.expires_at = expires_at
+    else:
+        db.add(StockReservation(user_id=user_id, product_id=product_id, quantity=quantity, expires_at=expires_at))
+    return expires_at
+
+
+def _hold_sharded(db: Session, product_id: int, hot, own: int, delta: int) -> None:
+    slots, stock = hot
+    if stock < settings.STOCK_THRESHOLD:
+        _reject(stock, 0)
+    if delta > 0 and not shards.take(db, product_id, delta):
+        _reject(stock, shards.free_stock(db, product_id) + own)
+    if delta < 0:
+        shards.put(db, product_id, -delta, slots)
+
+
+def _reject(stock: int, available: int) -> None:
+    if stock < settings.STOCK_THRESHOLD:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Product out of stock (threshold: {settings.STOCK_THRESHOLD})",
+        )
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Requested quantity exceeds available stock (available: {max(available, 0)})",
+    )
+
+
+def claim(db: Session, user_id: int, product_ids: Iterable[int]) -> Dict[int, int]:
+    """
+    Delete the user's holds on product_ids and return {product_id: units}.
+
+    The units stay counted in reserved_quantity; the caller either converts
+    them into a sale (see app.cart.stock.decrement_stock) or gives them back.
+    """
+    rows = (
+        db.query(StockReservation.id, StockReservation.product_id, StockReservation.quantity)
+        .filter(StockReservation.user_id == user_id, StockReservation.product_id.in_(list(product_ids)))
+        .order_by(StockReservation.product_id)
+        .with_for_update()
+        .all()
+    )
+    if not rows:
+        return {}
+    db.execute(
+        delete(StockReservation)
+        .where(StockReservation.id.in_([row.id for row in rows]))
+        .execution_options(synchronize_session=False)
+    )
+    return {row.product_id: row.quantity for row in rows}
+
+
+def release(db: Session, user_id: int, product_ids: Iterable[int]) -> None:
+    """Drop the user's holds on product_ids and give the units back."""
+    _give_back(db, claim(db, user_id, product_ids))
+
+
+def expirations(db: Session, user_id: int) -> Dict[int, datetime]:
+    """{product_id: expires_at} for the user's holds."""
+    return dict(
+        db.query(StockReservation.product_id, StockReservation.expires_at)
+        .filter(StockReservation.user_id == user_id)
+        .all()
+    )
+
+
+def sweep_expired(db: Session, batch_size: int) -> int:
+    """Reclaim up to batch_size expired holds in one transaction and return how many."""
+    rows = (
+        db.query(StockReservation.id, StockReservation.product_id, StockReservation.quantity)
+        .filter(StockReservation.expires_at <= datetime.utcnow())
+        .order_by(StockReservation.expires_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    if not rows:
+        return 0
+
+    units: Dict[int, int] = {}
+    for row in rows:
+        units[row.product_id] = units.get(row.product_id, 0) + row.quantity
+    db.execute(
+        delete(StockReservation)
+        .where(StockReservation.id.in_([row.id for row in rows]))
+        .execution_options(synchronize_session=False)
+    )
+    _give_back(db, units)
+    db.commit()
+    events.holds_changed(units)
+    return len(rows)
+
+
+def _give_back(db: Session, units: Dict[int, int]) -> None:
+    if not units:
+        return
+    hot = shards.hot_products(db, units)
+    for product_id, (slots, _) in hot.items():
+        shards.put(db, product_id, units[product_id], slots)
+    units = {product_id: count for product_id, count in units.items() if product_id not in hot}
+    if not units:
+        return
+    db.execute(
+        update(Product)
+        .where(Product.id.in_(sorted(units)))
+        .values(
+            reserved_quantity=Product.reserved_quantity - case(units, value=Product.id, else_=0),
+            updated_at=Product.updated_at,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+class ReservationSweeper(PeriodicTask):
+    """Reclaims expired holds every interval seconds."""
+
+    name = "reservation-sweeper"
+
+    def __init__(self, interval: float, batch_size: int):
+        super().__init__(interval)
+        self.batch_size = batch_size
+
+    def run_once(self) -> None:
+        self.sweep()
+
+    def sweep(self) -> int:
+        """Reclaim every hold that has expired so far, batch by batch."""
+        total = 0
+        db = SessionLocal()
+        try:
+            while True:
+                swept = sweep_expired(db, self.batch_size)
+                total += swept
+                if swept < self.batch_size:
+                    return total
+        finally:
+            db.close()
+
+
+reservation_sweeper = ReservationSweeper(
+    settings.RESERVATION_SWEEP_INTERVAL_SECONDS, settings.RESERVATION_SWEEP_BATCH_SIZE
+)
@@ -1,27 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
+from datetime import datetime
+from functools import partial
+from typing import List, Optional
 
 from app.database import get_db
-from app.models import ShoppingCart, Product, User, Order, OrderItem, OrderStatus
+from app.models import ShoppingCart, Product, User, CheckoutJob, CheckoutJobStatus
 from app.schemas import (
     CartAddRequest,
     CartUpdateRequest,
     CartItemResponse,
     CheckoutRequest,
     CheckoutResponse,
-    CheckoutItem,
+    CheckoutConflict,
+    CheckoutJobResponse,
 )
 from app.middleware import get_current_user
 from app.config import settings
+from app import idempotency
+from app.cart import jobs, reservations
+from app.cart.checkout import cart_items, place_order
+from app.products import events
+from app.serialization import json_response
 
 router = APIRouter(prefix="/cart", tags=["cart"])
 
 
-def to_cart_item_response(item: ShoppingCart) -> CartItemResponse:
+def to_cart_item_response(item: ShoppingCart, reserved_until: Optional[datetime] = None) -> CartItemResponse:
     is_in_stock = item.product.stock_quantity >= settings.STOCK_THRESHOLD
     is_low_stock = 0 < item.product.stock_quantity < settings.STOCK_THRESHOLD
-    return CartItemResponse(
+    return CartItemResponse.model_construct(
         id=item.id,
         product_id=item.product_id,
         product_name=item.product.name,
@@ -31,20 +41,17 @@ def to_cart_item_response(item: ShoppingCart) -> CartItemResponse:
         stock_quantity=item.product.stock_quantity,
         is_in_stock=is_in_stock,
         is_low_stock=is_low_stock,
+        reserved_until=reserved_until,
     )
 
 
-def _validate_stock(product: Product, quantity: int) -> None:
-    if product.stock_quantity < settings.STOCK_THRESHOLD:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Product out of stock (threshold: {settings.STOCK_THRESHOLD})",
-        )
-    if quantity > product.stock_quantity:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Requested quantity exceeds stock",
-        )
+def _commit_cart_change(db: Session) -> None:
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent request created the same cart line or hold first.
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Cart item was just added, please retry")
 
 
 @router.get("/", response_model=List[CartItemResponse])
@@ -52,12 +59,11 @@ def get_cart(
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    items = (
-        db.query(ShoppingCart)
-        .filter(ShoppingCart.user_id == user.id)
-        .all()
+    items = cart_items(db).filter(ShoppingCart.user_id == user.id).all()
+    held_until = reservations.expirations(db, user.id)
+    return json_response(
+        List[CartItemResponse], [to_cart_item_response(i, held_until.get(i.product_id)) for i in items]
     )
-    return [to_cart_item_response(i) for i in items]
 
 
 @router.post("/", response_model=CartItemResponse, status_code=status.HTTP_201_CREATED)
@@ -80,19 +86,18 @@ def add_to_cart(
     if existing:
         new_quantity = existing.quantity + payload.quantity
 
-    _validate_stock(product, new_quantity)
+    reserved_until = reservations.hold(db, user.id, product.id, new_quantity)
 
     if existing:
         existing.quantity = new_quantity
-        db.commit()
-        db.refresh(existing)
-        return to_cart_item_response(existing)
-
-    item = ShoppingCart(user_id=user.id, product_id=payload.product_id, quantity=payload.quantity)
-    db.add(item)
-    db.commit()
+        item = existing
+    else:
+        item = ShoppingCart(user_id=user.id, product_id=payload.product_id, quantity=payload.quantity)
+        db.add(item)
+    _commit_cart_change(db)
+    events.holds_changed([product.id])
     db.refresh(item)
-    return to_cart_item_response(item)
+    return to_cart_item_response(item, reserved_until)
 
 
 @router.put("/{item_id}", response_model=CartItemResponse)
@@ -103,19 +108,20 @@ def update_cart_item(
     user: User = Depends(get_current_user),
 ):
     item = (
-        db.query(ShoppingCart)
+        cart_items(db)
         .filter(ShoppingCart.id == item_id, ShoppingCart.user_id == user.id)
         .first()
     )
     if not item:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cart item not found")
 
-    _validate_stock(item.product, payload.quantity)
+    reserved_until = reservations.hold(db, user.id, item.product_id, payload.quantity)
 
     item.quantity = payload.quantity
-    db.commit()
+    _commit_cart_change(db)
+    events.holds_changed([item.product_id])
     db.refresh(item)
-    return to_cart_item_response(item)
+    return to_cart_item_response(item, reserved_until)
 
 
 @router.delete("/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -132,77 +138,83 @@ def remove_cart_item(
     if not item:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cart item not found")
 
+    reservations.release(db, user.id, [item.product_id])
     db.delete(item)
     db.commit()
+    events.holds_changed([item.product_id])
     return None
 
 
-@router.post("/checkout", response_model=CheckoutResponse, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/checkout",
+    response_model=CheckoutResponse,
+    status_code=status.HTTP_201_CREATED,
+    responses={status.HTTP_409_CONFLICT: {"model": CheckoutConflict}},
+)
 def checkout(
     payload: CheckoutRequest,
+    response: Response,
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(
+        None,
+        alias=idempotency.HEADER,
+        max_length=255,
+        description="Client-chosen key; retries with the same key return the first order instead of placing another",
+    ),
 ):
-    items = (
-        db.query(ShoppingCart)
-        .filter(ShoppingCart.user_id == user.id)
-        .all()
+    key_row = None
+    if idempotency_key:
+        key_row, stored = idempotency.claim(db, user.id, idempotency_key, idempotency.fingerprint(payload))
+        if stored is not None:
+            response.headers[idempotency.REPLAYED_HEADER] = "true"
+            return stored
+
+    result = place_order(
+        db,
+        user.id,
+        payload,
+        before_commit=partial(idempotency.record, key_row) if key_row else None,
     )
+    if isinstance(result, CheckoutConflict):
+        return JSONResponse(status_code=status.HTTP_409_CONFLICT, content=result.model_dump())
+    return result
 
-    if not items:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cart is empty")
-
-    # Validate stock for each item
-    for item in items:
-        _validate_stock(item.product, item.quantity)
-
-    total_price = sum(item.product.price * item.quantity for item in items)
 
-    order = Order(
-        user_id=user.id,
-        status=OrderStatus.PENDING,
-        total_price=total_price,
-        shipping_address=payload.shipping_address,
-        notes=payload.notes,
-    )
-    db.add(order)
-    db.flush()
-
-    order_items: list[OrderItem] = []
-    response_items: list[CheckoutItem] = []
-
-    for item in items:
-        order_item = OrderItem(
-            order_id=order.id,
-            product_id=item.product_id,
-            quantity=item.quantity,
-            price_at_order=item.product.price,
-        )
-        order_items.append(order_item)
-
-        response_items.append(
-            CheckoutItem(
-                product_id=item.product_id,
-                product_name=item.product.name,
-                quantity=item.quantity,
-                price_at_order=item.product.price,
-            )
-        )
-
-        # Reduce stock
-        item.product.stock_quantity = item.product.stock_quantity - item.quantity
-
-    db.add_all(order_items)
-
-    # Clear cart
-    for item in items:
-        db.delete(item)
+@router.post(
+    "/checkout/async",
+    response_model=CheckoutJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    responses={status.HTTP_503_SERVICE_UNAVAILABLE: {"description": "Checkout queue is full, retry later"}},
+)
+def checkout_async(
+    payload: CheckoutRequest,
+    response: Response,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(
+        None,
+        alias=idempotency.HEADER,
+        max_length=255,
+        description="Client-chosen key; retries with the same key return the first job instead of queueing another",
+    ),
+):
+    """Queue the checkout and return its job; poll the Location for the order."""
+    job = jobs.enqueue(db, user.id, payload, idempotency_key)
+    response.headers["Location"] = f"/cart/checkout/jobs/{job.id}"
+    return jobs.to_job_response(job)
 
-    db.commit()
-    db.refresh(order)
 
-    return CheckoutResponse(
-        order_id=order.id,
-        total_price=total_price,
-        items=response_items,
-    )
+@router.get("/checkout/jobs/{job_id}", response_model=CheckoutJobResponse)
+def get_checkout_job(
+    job_id: int,
+    response: Response,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    job = db.query(CheckoutJob).filter(CheckoutJob.id == job_id, CheckoutJob.user_id == user.id).first()
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Checkout job not found")
+    if job.status == CheckoutJobStatus.QUEUED:
+        response.headers["Retry-After"] = "1"
+    return jobs.to_job_response(job)
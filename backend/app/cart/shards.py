@@ -0,0 +1,298 @@
+"""
+Hot-SKU mode: a product's unreserved stock split across counter rows.
+
+Normally every sale of a product updates its single products row, so during a
+launch all buyers of that product queue on one row lock. With
+products.stock_shards = N the unreserved units live in N product_stock_shards
+rows instead. A sale or hold decrements one randomly chosen shard that can
+cover it, so up to N buyers proceed in parallel. When no single shard can
+cover a request (one ran dry, or the request is large) all shards of the
+product are locked in slot order, the request is served from their total and
+what is left is spread evenly again.
+
+Held units (app.cart.reservations) move out of the shards when the hold is
+taken and back into one when it is released, so converting a hold at
+checkout touches no counter at all.
+
+products.stock_quantity and reserved_quantity remain the figures every read
+path uses. For hot products they are folded from the shards and holds by a
+background task every STOCK_SHARD_FOLD_INTERVAL_SECONDS, so the catalog may
+show a hot product's stock that far behind. Admin writes that set a stock
+level call respread() to push it into the shards; relative changes read the
+live level with locked_stock() and go through put()/take(), since applying
+them to the folded figure would resurrect units sold since the last fold.
+"""
+import random
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+from sqlalchemy import case, func, update
+from sqlalchemy.orm import Session
+
+from app.background import PeriodicTask
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Product, ProductStockShard, StockReservation
+from app.products import events
+
+# Shards tried on the fast path before falling back to locking all of them.
+FAST_PATH_ATTEMPTS = 2
+
+
+class ShardedStock(NamedTuple):
+    slots: int
+    free: int  # summed over the shards
+    held: int  # by stock_reservations
+
+
+def spread(total: int, slots: int) -> List[int]:
+    """Split total units as evenly as possible over slots counters."""
+    base, extra = divmod(max(total, 0), slots)
+    return [base + (1 if slot < extra else 0) for slot in range(slots)]
+
+
+def hot_products(db: Session, product_ids: Iterable[int]) -> Dict[int, Tuple[int, int]]:
+    """{product_id: (stock_shards, stock_quantity)} for the hot products among product_ids."""
+    rows = (
+        db.query(Product.id, Product.stock_shards, Product.stock_quantity)
+        .filter(Product.id.in_(list(product_ids)), Product.stock_shards > 0)
+        .all()
+    )
+    return {row.id: (row.stock_shards, row.stock_quantity) for row in rows}
+
+
+def free_stock(db: Session, product_id: int) -> int:
+    """Unreserved units of a hot product, summed over its shards."""
+    total = (
+        db.query(func.sum(ProductStockShard.stock_quantity))
+        .filter(ProductStockShard.product_id == product_id)
+        .scalar()
+    )
+    return int(total or 0)
+
+
+def held_units(db: Session, product_ids: Iterable[int]) -> Dict[int, int]:
+    rows = (
+        db.query(StockReservation.product_id, func.sum(StockReservation.quantity))
+        .filter(StockReservation.product_id.in_(list(product_ids)))
+        .group_by(StockReservation.product_id)
+        .all()
+    )
+    return {product_id: int(total) for product_id, total in rows}
+
+
+def take(db: Session, product_id: int, quantity: int) -> bool:
+    """Remove quantity units from a hot product's shards; False if they do not add up."""
+    if quantity <= 0:
+        return True
+    # Plain read to pick candidates; the conditional UPDATE re-checks.
+    shards = (
+        db.query(ProductStockShard.slot, ProductStockShard.stock_quantity)
+        .filter(ProductStockShard.product_id == product_id)
+        .all()
+    )
+    candidates = [slot for slot, stock in shards if stock >= quantity]
+    random.shuffle(candidates)
+    for slot in candidates[:FAST_PATH_ATTEMPTS]:
+        result = db.execute(
+            update(ProductStockShard)
+            .where(
+                ProductStockShard.product_id == product_id,
+                ProductStockShard.slot == slot,
+                ProductStockShard.stock_quantity >= quantity,
+            )
+            .values(stock_quantity=ProductStockShard.stock_quantity - quantity)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 1:
+            return True
+    return _take_rebalancing(db, product_id, quantity)
+
+
+def _take_rebalancing(db: Session, product_id: int, quantity: int) -> bool:
+    rows = _locked_shards(db, product_id)
+    total = sum(row.stock_quantity for row in rows)
+    if not rows or total < quantity:
+        return False
+    for row, stock in zip(rows, spread(total - quantity, len(rows))):
+        row.stock_quantity = stock
+    db.flush()
+    return True
+
+
+def locked_stock(db: Session, product_ids: Iterable[int]) -> Dict[int, ShardedStock]:
+    """
+    Live stock of the hot products among product_ids, with their shards locked
+    (in product and slot order) until the caller's transaction ends. Their
+    stock level is free + held.
+    """
+    hot = hot_products(db, product_ids)
+    held = held_units(db, hot)
+    return {
+        product_id: ShardedStock(
+            slots=hot[product_id][0],
+            free=sum(row.stock_quantity for row in _locked_shards(db, product_id)),
+            held=held.get(product_id, 0),
+        )
+        for product_id in sorted(hot)
+    }
+
+
+def put(db: Session, product_id: int, quantity: int, slots: int) -> None:
+    """Return quantity units to one random shard of a hot product."""
+    if quantity <= 0:
+        return
+    db.execute(
+        update(ProductStockShard)
+        .where(ProductStockShard.product_id == product_id, ProductStockShard.slot == random.randrange(slots))
+        .values(stock_quantity=ProductStockShard.stock_quantity + quantity)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def respread(db: Session, levels: Dict[int, int]) -> None:
+    """
+    Admin writes set {product_id: stock_quantity}; for hot products, make the
+    shards hold that level minus the units currently held.
+    """
+    hot = hot_products(db, levels)
+    if not hot:
+        return
+    held = held_units(db, hot)
+    for product_id in sorted(hot):
+        rows = _locked_shards(db, product_id)
+        for row, stock in zip(rows, spread(levels[product_id] - held.get(product_id, 0), len(rows))):
+            row.stock_quantity = stock
+    db.flush()
+
+
+def configure(db: Session, product: Product, slots: int) -> None:
+    """
+    Switch a product into hot-SKU mode with slots shards (0 switches it back).
+    The caller must hold the product row lock and commit.
+    """
+    held = held_units(db, [product.id]).get(product.id, 0)
+    rows = _locked_shards(db, product.id)
+    if product.stock_shards:
+        free = sum(row.stock_quantity for row in rows)
+    else:
+        free = max(product.stock_quantity - held, 0)
+    for row in rows:
+        db.delete(row)
+    db.flush()
+    db.add_all(
+        ProductStockShard(product_id=product.id, slot=slot, stock_quantity=stock)
+        for slot, stock in enumerate(spread(free, slots) if slots else [])
+    )
+    product.stock_shards = slots
+    product.stock_quantity = free + held
+    product.reserved_quantity = held
+
+
+def shard_levels(db: Session, product_id: int) -> List[int]:
+    return [
+        stock
+        for (stock,) in db.query(ProductStockShard.stock_quantity)
+        .filter(ProductStockShard.product_id == product_id)
+        .order_by(ProductStockShard.slot)
+        .all()
+    ]
+
+
+def _locked_shards(db: Session, product_id: int) -> List[ProductStockShard]:
+    return (
+        db.query(ProductStockShard)
+        .filter(ProductStockShard.product_id == product_id)
+        .order_by(ProductStockShard.slot)
+        .with_for_update()
+        .all()
+    )
+
+
+def fold(db: Session) -> List[Tuple[events.ProductSnapshot, events.ProductSnapshot]]:
+    """
+    Write the shard and hold totals of hot products back to their products
+    rows and return the (previous, current) snapshots whose stock changed.
+    Products whose holds alone moved are reported to events.holds_changed.
+    """
+    rows = (
+        db.query(
+            Product.id,
+            Product.category,
+            Product.price,
+            Product.stock_quantity,
+            Product.reserved_quantity,
+            Product.is_active,
+        )
+        .filter(Product.stock_shards > 0)
+        .all()
+    )
+    if not rows:
+        return []
+    ids = [row.id for row in rows]
+    free = dict(
+        db.query(ProductStockShard.product_id, func.sum(ProductStockShard.stock_quantity))
+        .filter(ProductStockShard.product_id.in_(ids))
+        .group_by(ProductStockShard.product_id)
+        .all()
+    )
+    held = held_units(db, ids)
+
+    stock: Dict[int, int] = {}
+    reserved: Dict[int, int] = {}
+    held_moved = []
+    changes = []
+    for row in rows:
+        reserved_now = held.get(row.id, 0)
+        stock_now = int(free.get(row.id) or 0) + reserved_now
+        if (stock_now, reserved_now) == (row.stock_quantity, row.reserved_quantity):
+            continue
+        stock[row.id] = stock_now
+        reserved[row.id] = reserved_now
+        if stock_now == row.stock_quantity:
+            held_moved.append(row.id)
+            continue
+        previous = events.ProductSnapshot(
+            id=row.id,
+            category=row.category,
+            price=row.price,
+            stock_quantity=row.stock_quantity,
+            is_active=bool(row.is_active),
+        )
+        changes.append((previous, previous._replace(stock_quantity=stock_now)))
+    if not stock:
+        return []
+
+    # Rows where only the holds moved keep their updated_at, as on cold
+    # products (see app.cart.reservations).
+    moved = [previous.id for previous, _ in changes]
+    db.execute(
+        update(Product)
+        .where(Product.id.in_(sorted(stock)), Product.stock_shards > 0)
+        .values(
+            stock_quantity=case(stock, value=Product.id),
+            reserved_quantity=case(reserved, value=Product.id),
+            updated_at=case((Product.id.in_(moved), datetime.utcnow()), else_=Product.updated_at),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    events.holds_changed(held_moved)
+    return changes
+
+
+class ShardFolder(PeriodicTask):
+    """Keeps the products rows of hot products in step with their shards."""
+
+    name = "stock-shard-folder"
+
+    def run_once(self) -> None:
+        db = SessionLocal()
+        try:
+            changes = fold(db)
+        finally:
+            db.close()
+        events.inventory_changed(changes)
+
+
+shard_folder = ShardFolder(settings.STOCK_SHARD_FOLD_INTERVAL_SECONDS)
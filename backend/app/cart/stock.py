@@ -0,0 +1,120 @@
+"""
+Set-based stock decrements for checkout.
+
+Each cart line becomes one conditional UPDATE that only succeeds while the row
+still has enough stock, so the check and the write are a single atomic step
+and concurrent buyers cannot oversell. Lines are applied in product id order
+so two checkouts touching the same products always lock them in the same
+order and cannot deadlock each other.
+
+Units the buyer already holds (see app.cart.reservations) are converted in
+the same UPDATE: they leave reserved_quantity as they leave stock_quantity,
+and only the rest of the line has to come out of unreserved stock. Hot
+products sell from their shard rows instead (see app.cart.shards) and leave
+the products row to the background fold.
+"""
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.cart import shards
+from app.config import settings
+from app.models import Product
+
+
+class StockShortfall(NamedTuple):
+    product_id: int
+    requested: int
+    available: int
+
+
+def decrement_stock(
+    db: Session, lines: Iterable[Tuple[int, int]], held: Optional[Dict[int, int]] = None
+) -> List[StockShortfall]:
+    """
+    Decrement stock for (product_id, quantity) lines inside the caller's
+    transaction and return the lines that could not be fully served.
+
+    held maps product ids to units the buyer has reserved. A product is
+    sellable while its stock is at least STOCK_THRESHOLD and its unreserved
+    stock plus the buyer's own hold covers the requested quantity. When
+    anything is returned the caller must roll back, since the other lines
+    have already been decremented.
+    """
+    held = held or {}
+    wanted: Dict[int, int] = {}
+    for product_id, quantity in lines:
+        wanted[product_id] = wanted.get(product_id, 0) + quantity
+
+    hot = shards.hot_products(db, wanted)
+    now = datetime.utcnow()
+    short = []
+    for product_id in sorted(wanted):
+        quantity = wanted[product_id]
+        own = held.get(product_id, 0)
+        if product_id in hot:
+            if not _take_sharded(db, product_id, hot[product_id], quantity, own):
+                short.append(product_id)
+            continue
+        result = db.execute(
+            update(Product)
+            .where(
+                Product.id == product_id,
+                Product.stock_quantity - Product.reserved_quantity + own >= quantity,
+                Product.stock_quantity >= settings.STOCK_THRESHOLD,
+            )
+            .values(
+                stock_quantity=Product.stock_quantity - quantity,
+                reserved_quantity=Product.reserved_quantity - own,
+                updated_at=now,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            short.append(product_id)
+
+    if not short:
+        return []
+
+    rows = {
+        row.id: row
+        for row in db.query(Product.id, Product.stock_quantity, Product.reserved_quantity)
+        .filter(Product.id.in_(short))
+        .all()
+    }
+    shortfalls = []
+    for product_id in short:
+        own = held.get(product_id, 0)
+        if product_id in hot:
+            _, stock = hot[product_id]
+            available = shards.free_stock(db, product_id) + own if stock >= settings.STOCK_THRESHOLD else 0
+        else:
+            available = _sellable(rows.get(product_id), own)
+        shortfalls.append(StockShortfall(product_id=product_id, requested=wanted[product_id], available=available))
+    return shortfalls
+
+
+def _take_sharded(db: Session, product_id: int, hot, quantity: int, own: int) -> bool:
+    # The held units already left the shards when the hold was taken.
+    slots, stock = hot
+    if stock < settings.STOCK_THRESHOLD:
+        return False
+    if quantity < own:
+        shards.put(db, product_id, own - quantity, slots)
+        return True
+    return shards.take(db, product_id, quantity - own)
+
+
+def current_stock(db: Session, product_ids: Iterable[int]) -> Dict[int, int]:
+    """Stock as stored now; after decrement_stock this reads the locked rows."""
+    return dict(
+        db.query(Product.id, Product.stock_quantity).filter(Product.id.in_(list(product_ids))).all()
+    )
+
+
+def _sellable(row, own: int) -> int:
+    if row is None or row.stock_quantity < settings.STOCK_THRESHOLD:
+        return 0
+    return max(row.stock_quantity - row.reserved_quantity + own, 0)
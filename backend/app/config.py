@@ -20,10 +20,61 @@ class Settings:
     # File upload
     MAX_UPLOAD_SIZE = int(os.getenv("MAX_UPLOAD_SIZE", "5242880"))  # 5MB
     ALLOWED_IMAGE_EXTENSIONS = os.getenv("ALLOWED_IMAGE_EXTENSIONS", "jpg,jpeg,png,gif").split(",")
+    IMAGE_WEBP_QUALITY = int(os.getenv("IMAGE_WEBP_QUALITY", "80"))
+    
+    # Bulk product import
+    IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+    IMPORT_MAX_REPORTED_ERRORS = int(os.getenv("IMPORT_MAX_REPORTED_ERRORS", "1000"))
+    
+    # Pagination
+    DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "50"))
+    MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "200"))
     
     # Stock threshold
     STOCK_THRESHOLD = int(os.getenv("STOCK_THRESHOLD", "6"))
     
+    # Upper bounds of the price buckets reported by /products/facets
+    FACET_PRICE_BUCKETS = [float(b) for b in os.getenv("FACET_PRICE_BUCKETS", "100,250,500,1000,2000").split(",")]
+    
+    # Catalog cache (per process; the backend is meant to run as a single
+    # process, see README "Deployment"). The TTL bounds how stale stock figures
+    # may get when another process changes a product.
+    CATALOG_CACHE_MAX_ENTRIES = int(os.getenv("CATALOG_CACHE_MAX_ENTRIES", "10000"))
+    CATALOG_CACHE_TTL_SECONDS = float(os.getenv("CATALOG_CACHE_TTL_SECONDS", "5"))
+    
+    # Change feeds only return rows older than this many seconds, so a write
+    # whose transaction is still in flight is not skipped by a newer token.
+    CHANGE_FEED_SETTLE_SECONDS = float(os.getenv("CHANGE_FEED_SETTLE_SECONDS", "2"))
+    
+    # Cart lines hold their units for this long; expired holds are reclaimed
+    # by a background sweeper every interval, batch_size rows per transaction.
+    RESERVATION_TTL_SECONDS = int(os.getenv("RESERVATION_TTL_SECONDS", "900"))
+    RESERVATION_SWEEP_INTERVAL_SECONDS = float(os.getenv("RESERVATION_SWEEP_INTERVAL_SECONDS", "30"))
+    RESERVATION_SWEEP_BATCH_SIZE = int(os.getenv("RESERVATION_SWEEP_BATCH_SIZE", "1000"))
+    
+    # Hot products (products.stock_shards > 0) sell from shard rows; their
+    # products.stock_quantity is refreshed from the shards this often.
+    STOCK_SHARD_FOLD_INTERVAL_SECONDS = float(os.getenv("STOCK_SHARD_FOLD_INTERVAL_SECONDS", "1"))
+    
+    # Checkout Idempotency-Key records are kept at least this long, then
+    # purged in batches by a background task.
+    IDEMPOTENCY_KEY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_KEY_TTL_SECONDS", "86400"))
+    IDEMPOTENCY_PURGE_INTERVAL_SECONDS = float(os.getenv("IDEMPOTENCY_PURGE_INTERVAL_SECONDS", "300"))
+    IDEMPOTENCY_PURGE_BATCH_SIZE = int(os.getenv("IDEMPOTENCY_PURGE_BATCH_SIZE", "1000"))
+    
+    # Asynchronous checkout (POST /cart/checkout/async): worker threads per
+    # process, queued jobs accepted before answering 503, jobs handled per
+    # database session, and the age after which a still queued job is
+    # re-queued (e.g. after a restart).
+    CHECKOUT_WORKERS = int(os.getenv("CHECKOUT_WORKERS", "4"))
+    CHECKOUT_QUEUE_SIZE = int(os.getenv("CHECKOUT_QUEUE_SIZE", "1000"))
+    CHECKOUT_BATCH_SIZE = int(os.getenv("CHECKOUT_BATCH_SIZE", "20"))
+    CHECKOUT_JOB_STALE_SECONDS = float(os.getenv("CHECKOUT_JOB_STALE_SECONDS", "30"))
+    
+    # Raise instead of silently lazy loading a relationship inside a request.
+    # Meant for development and CI, to catch N+1 query patterns early.
+    STRICT_LOADING = os.getenv("STRICT_LOADING", "false").lower() == "true"
+    
     # App
     APP_NAME = "PC Sales MVP"
     APP_VERSION = "1.0.0"
@@ -1,7 +1,8 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import raiseload, sessionmaker
 import os
 from dotenv import load_dotenv
+from .config import settings
 from .models import Base
 
 load_dotenv()
@@ -19,9 +20,23 @@ engine = create_engine(
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _raise_on_lazy_loads(orm_execute_state):
+    """
+    In strict loading mode, make request sessions raise instead of lazy loading
+    a relationship that the query did not load eagerly.
+    """
+    if (
+        orm_execute_state.session.info.get("strict_loading")
+        and orm_execute_state.is_select
+        and not orm_execute_state.is_column_load
+        and not orm_execute_state.is_relationship_load
+    ):
+        orm_execute_state.statement = orm_execute_state.statement.options(raiseload("*", sql_only=True))
+
 def get_db():
     """Dependency for getting database session"""
-    db = SessionLocal()
+    db = SessionLocal(info={"strict_loading": settings.STRICT_LOADING})
     try:
         yield db
     finally:
@@ -0,0 +1,181 @@
+"""
+Idempotency-Key handling for checkout.
+
+The key row is inserted at the start of the checkout transaction and filled
+with the order id and response before it commits, so a key is either bound to
+a committed order or not stored at all. A duplicate that arrives while the
+first request is still running blocks on the unique (user_id, key) index
+until that transaction ends, then replays the stored response; if the first
+request failed and rolled back, the duplicate simply proceeds. Failed
+checkouts (empty cart, not enough stock) are therefore never replayed.
+
+Keys are kept for IDEMPOTENCY_KEY_TTL_SECONDS and purged in batches by a
+background task afterwards.
+
+Asynchronous checkouts (app.cart.jobs) claim their keys in the same table,
+bound to the checkout_jobs row they created, so the one unique index admits a
+single claimant per key across both endpoints. A key already used on one
+endpoint is rejected with 422 on the other instead of placing a second order.
+"""
+import hashlib
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.background import PeriodicTask
+from app.config import settings
+from app.database import SessionLocal
+from app.models import IdempotencyKey
+from app.schemas import CheckoutResponse
+
+HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+def fingerprint(payload: BaseModel) -> str:
+    return hashlib.sha256(payload.model_dump_json().encode()).hexdigest()
+
+
+def claim(
+    db: Session, user_id: int, key: str, request_hash: str
+) -> Tuple[Optional[IdempotencyKey], Optional[dict]]:
+    """
+    Claim key for a new request inside the caller's transaction.
+
+    Returns (row, None) when the caller should do the work and record() the
+    result on row, or (None, response) when the key already produced one.
+    Raises 422 when the key was used for a different request body or for an
+    asynchronous checkout.
+    """
+    stored = _stored(db, user_id, key)
+    if stored is None:
+        row = _new_row(user_id, key, request_hash)
+        db.add(row)
+        try:
+            # Waits here while another request with the same key is in flight.
+            db.flush()
+            return row, None
+        except IntegrityError:
+            db.rollback()
+            stored = _stored(db, user_id, key)
+
+    _check(stored, request_hash, for_job=False)
+    return None, stored.response
+
+
+def claim_for_job(db: Session, user_id: int, key: str, request_hash: str, job_id: int) -> Optional[int]:
+    """
+    Claim key for the flushed checkout job job_id inside the caller's
+    transaction.
+
+    Returns None when the key is now bound to job_id, or the id of the job it
+    was bound to earlier, in which case the caller's transaction has been
+    rolled back or must be. Raises 422 like claim().
+    """
+    stored = _stored(db, user_id, key)
+    if stored is None:
+        db.add(_new_row(user_id, key, request_hash, checkout_job_id=job_id))
+        try:
+            db.flush()
+            return None
+        except IntegrityError:
+            db.rollback()
+            stored = _stored(db, user_id, key)
+
+    _check(stored, request_hash, for_job=True)
+    return stored.checkout_job_id
+
+
+def job_for_key(db: Session, user_id: int, key: str, request_hash: str) -> Optional[int]:
+    """Id of the checkout job key is bound to, if it is stored. Raises 422 like claim()."""
+    stored = _stored(db, user_id, key)
+    if stored is None:
+        return None
+    _check(stored, request_hash, for_job=True)
+    return stored.checkout_job_id
+
+
+def record(row: IdempotencyKey, response: CheckoutResponse) -> None:
+    row.order_id = response.order_id
+    row.response = response.model_dump(mode="json")
+
+
+def _stored(db: Session, user_id: int, key: str) -> Optional[IdempotencyKey]:
+    return (
+        db.query(IdempotencyKey)
+        .filter(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+        .first()
+    )
+
+
+def _new_row(user_id: int, key: str, request_hash: str, checkout_job_id: Optional[int] = None) -> IdempotencyKey:
+    return IdempotencyKey(
+        user_id=user_id,
+        key=key,
+        request_hash=request_hash,
+        checkout_job_id=checkout_job_id,
+        expires_at=datetime.utcnow() + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS),
+    )
+
+
+def _check(stored: IdempotencyKey, request_hash: str, for_job: bool) -> None:
+    if (stored.checkout_job_id is not None) != for_job:
+        used_for = "an asynchronous" if stored.checkout_job_id is not None else "a synchronous"
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"{HEADER} was already used for {used_for} checkout",
+        )
+    if stored.request_hash != request_hash:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"{HEADER} was already used for a different request",
+        )
+
+
+def purge_expired(db: Session, batch_size: int) -> int:
+    """Delete up to batch_size expired keys in one transaction and return how many."""
+    ids = [
+        row_id
+        for (row_id,) in db.query(IdempotencyKey.id)
+        .filter(IdempotencyKey.expires_at <= datetime.utcnow())
+        .order_by(IdempotencyKey.expires_at)
+        .limit(batch_size)
+        .all()
+    ]
+    if not ids:
+        return 0
+    db.execute(
+        delete(IdempotencyKey)
+        .where(IdempotencyKey.id.in_(ids))
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return len(ids)
+
+
+class IdempotencyKeyPurger(PeriodicTask):
+    """Deletes expired idempotency keys every interval seconds."""
+
+    name = "idempotency-key-purger"
+
+    def __init__(self, interval: float, batch_size: int):
+        super().__init__(interval)
+        self.batch_size = batch_size
+
+    def run_once(self) -> None:
+        db = SessionLocal()
+        try:
+            while purge_expired(db, self.batch_size) == self.batch_size:
+                pass
+        finally:
+            db.close()
+
+
+idempotency_key_purger = IdempotencyKeyPurger(
+    settings.IDEMPOTENCY_PURGE_INTERVAL_SECONDS, settings.IDEMPOTENCY_PURGE_BATCH_SIZE
+)
@@ -1,17 +1,38 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 import os
 from dotenv import load_dotenv
 
+from app.uploads import UploadFiles
+from app.cart.jobs import checkout_queue, checkout_requeuer
+from app.cart.reservations import reservation_sweeper
+from app.cart.shards import shard_folder
+from app.idempotency import idempotency_key_purger
+
 # Load environment variables
 load_dotenv()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Background jobs run for as long as the app does: reclaim expired cart
+    # holds, fold hot-product stock, purge expired idempotency keys and
+    # place asynchronous checkouts
+    tasks = (reservation_sweeper, shard_folder, idempotency_key_purger, checkout_queue, checkout_requeuer)
+    for task in tasks:
+        task.start()
+    yield
+    for task in reversed(tasks):
+        task.stop()
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="PC Sales MVP API",
     description="Multi-role e-commerce platform for PC sales",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS Middleware - Allow frontend to access backend
@@ -28,7 +49,7 @@ if not os.path.exists("uploads"):
     os.makedirs("uploads/products", exist_ok=True)
     os.makedirs("uploads/avatars", exist_ok=True)
 
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+app.mount("/uploads", UploadFiles(directory="uploads"), name="uploads")
 
 # Health check endpoint
 @app.get("/health")
@@ -1,7 +1,8 @@
-from .auth import get_current_user, get_current_user_roles, require_roles
+from .auth import get_current_user, get_current_user_roles, require_roles, users_with_roles
 
 __all__ = [
     "get_current_user",
     "get_current_user_roles",
     "require_roles",
+    "users_with_roles",
 ]
@@ -1,15 +1,20 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Query, Session, selectinload
 
 from app.database import get_db
-from app.models import User
+from app.models import User, UserRole
 from app.auth import verify_token
 
 # OAuth2 scheme for extracting Bearer token
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
+def users_with_roles(db: Session) -> Query:
+    """User query that loads user_roles and their roles up front."""
+    return db.query(User).options(selectinload(User.user_roles).joinedload(UserRole.role))
+
+
 def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
@@ -23,7 +28,7 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = db.query(User).filter(User.id == token_data.user_id).first()
+    user = users_with_roles(db).filter(User.id == token_data.user_id).first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -3,10 +3,16 @@ from .role import Role, RoleEnum
 from .user import User
 from .user_role import UserRole
 from .product import Product
+from .product_attribute import ProductAttribute
 from .shopping_cart import ShoppingCart
 from .order import Order, OrderStatus
 from .order_item import OrderItem
 from .role_application import RoleApplication, RoleApplicationStatus
+from .tombstone import Tombstone
+from .stock_reservation import StockReservation
+from .product_stock_shard import ProductStockShard
+from .idempotency_key import IdempotencyKey
+from .checkout_job import CheckoutJob, CheckoutJobStatus
 
 __all__ = [
     "Base",
@@ -16,10 +22,17 @@ __all__ = [
     "User",
     "UserRole",
     "Product",
+    "ProductAttribute",
     "ShoppingCart",
     "Order",
     "OrderStatus",
     "OrderItem",
     "RoleApplication",
     "RoleApplicationStatus",
+    "Tombstone",
+    "StockReservation",
+    "ProductStockShard",
+    "IdempotencyKey",
+    "CheckoutJob",
+    "CheckoutJobStatus",
 ]
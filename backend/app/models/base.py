@@ -1,13 +1,18 @@
 from sqlalchemy import Column, DateTime, Integer
+from sqlalchemy.dialects import mysql
 from sqlalchemy.orm import declarative_base
 from datetime import datetime
 
 Base = declarative_base()
 
+# updated_at feeds ETags and change-feed cursors, so it keeps microseconds;
+# MySQL's plain DATETIME would truncate to the second.
+Timestamp = DateTime().with_variant(mysql.DATETIME(fsp=6), "mysql")
+
 class BaseModel(Base):
     """Base model class with common fields for all models"""
     __abstract__ = True
     
     id = Column(Integer, primary_key=True, index=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    updated_at = Column(Timestamp, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
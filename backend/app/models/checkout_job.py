@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Enum, JSON, Index
+from .base import BaseModel
+import enum
+
+class CheckoutJobStatus(str, enum.Enum):
+    """Checkout job status enumeration"""
+    QUEUED = "QUEUED"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+
+class CheckoutJob(BaseModel):
+    """Checkout accepted for asynchronous processing"""
+    __tablename__ = "checkout_jobs"
+    __table_args__ = (
+        Index("uq_checkout_jobs_user_id_idempotency_key", "user_id", "idempotency_key", unique=True),
+        Index("ix_checkout_jobs_status_updated_at", "status", "updated_at"),
+    )
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    status = Column(Enum(CheckoutJobStatus), default=CheckoutJobStatus.QUEUED, nullable=False)
+    payload = Column(JSON, nullable=False)  # CheckoutRequest
+    idempotency_key = Column(String(255), nullable=True)
+    order_id = Column(Integer, ForeignKey("orders.id", ondelete="SET NULL"), nullable=True)
+    result = Column(JSON, nullable=True)  # CheckoutResponse, or CheckoutConflict when FAILED
+    
+    def __repr__(self):
+        return f"<CheckoutJob(id={self.id}, user_id={self.user_id}, status={self.status})>"
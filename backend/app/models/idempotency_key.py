@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, JSON, Index
+from .base import BaseModel
+
+class IdempotencyKey(BaseModel):
+    """Client-supplied key of a checkout request and the response it produced"""
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        Index("uq_idempotency_keys_user_id_key", "user_id", "key", unique=True),
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    key = Column(String(255), nullable=False)
+    request_hash = Column(String(64), nullable=False)  # sha256 of the request body
+    order_id = Column(Integer, ForeignKey("orders.id", ondelete="SET NULL"), nullable=True)
+    checkout_job_id = Column(Integer, ForeignKey("checkout_jobs.id", ondelete="CASCADE"), nullable=True)  # set for asynchronous checkouts
+    response = Column(JSON, nullable=True)
+    expires_at = Column(DateTime, nullable=False)
+    
+    def __repr__(self):
+        return f"<IdempotencyKey(user_id={self.user_id}, key='{self.key}', order_id={self.order_id})>"
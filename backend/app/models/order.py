@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, Float, String, Enum, Text
+from sqlalchemy import Column, Integer, ForeignKey, Float, String, Enum, Text, Index
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 import enum
@@ -14,6 +14,13 @@ class OrderStatus(str, enum.Enum):
 class Order(BaseModel):
     """Order model for customer orders"""
     __tablename__ = "orders"
+    __table_args__ = (
+        Index("ix_orders_user_id_created_at", "user_id", "created_at"),
+        Index("ix_orders_shipper_id_created_at", "shipper_id", "created_at"),
+        Index("ix_orders_user_id_updated_at", "user_id", "updated_at"),
+        Index("ix_orders_status_created_at", "status", "created_at"),
+        Index("ix_orders_created_at_id", "created_at", "id"),
+    )
     
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     shipper_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
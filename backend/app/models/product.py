@@ -1,17 +1,25 @@
-from sqlalchemy import Column, String, Float, Integer, Text, Boolean, JSON
+from sqlalchemy import Column, String, Float, Integer, Text, Boolean, JSON, Index
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 
 class Product(BaseModel):
     """Product model for PC components and systems"""
     __tablename__ = "products"
+    __table_args__ = (
+        Index("ix_products_is_active_category_created_at", "is_active", "category", "created_at"),
+        Index("ix_products_is_active_created_at", "is_active", "created_at"),
+        Index("ix_products_updated_at", "updated_at"),
+    )
     
     name = Column(String(200), nullable=False, index=True)
     description = Column(Text, nullable=True)
     category = Column(String(100), nullable=False, index=True)
     price = Column(Float, nullable=False, index=True)
     stock_quantity = Column(Integer, default=0, nullable=False, index=True)
+    reserved_quantity = Column(Integer, default=0, server_default="0", nullable=False)  # units held by stock_reservations
+    stock_shards = Column(Integer, default=0, server_default="0", nullable=False)  # > 0: hot-SKU mode, see product_stock_shards
     image_url = Column(String(255), nullable=True)
+    image_variants = Column(JSON, nullable=True)  # {"thumb": url, "card": url, "full": url}
     sku = Column(String(100), unique=True, nullable=False, index=True)
     
     # Technical specifications as JSON-like fields
@@ -25,12 +33,18 @@ class Product(BaseModel):
     # Relationships
     shopping_cart_items = relationship("ShoppingCart", back_populates="product", cascade="all, delete-orphan")
     order_items = relationship("OrderItem", back_populates="product", cascade="all, delete-orphan")
+    attributes = relationship("ProductAttribute", back_populates="product", cascade="all, delete-orphan")
     
+    @property
+    def available_quantity(self):
+        """Units not held in carts (see app.cart.reservations)"""
+        return max(self.stock_quantity - (self.reserved_quantity or 0), 0)
+
     @property
     def is_in_stock(self):
-        """Check if product is in stock (threshold of 6 units as per business rules)"""
+        """Check if product can be bought (threshold of 6 units as per business rules, minus held units)"""
         STOCK_THRESHOLD = 6
-        return self.stock_quantity >= STOCK_THRESHOLD
+        return self.stock_quantity >= STOCK_THRESHOLD and self.available_quantity > 0
     
     @property
     def is_low_stock(self):
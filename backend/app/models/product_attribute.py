@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, ForeignKey, String, Float, Index
+from sqlalchemy.orm import relationship
+from .base import BaseModel
+
+class ProductAttribute(BaseModel):
+    """Typed, indexed copy of one Product.specifications leaf, used for spec filters"""
+    __tablename__ = "product_attributes"
+    __table_args__ = (
+        Index("ix_product_attributes_key_str", "key", "value_str", "product_id"),
+        Index("ix_product_attributes_key_num", "key", "value_num", "product_id"),
+    )
+    
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False, index=True)
+    key = Column(String(100), nullable=False)
+    value_str = Column(String(255), nullable=True)  # normalized (lower-cased) text value
+    value_num = Column(Float, nullable=True)  # numeric part, e.g. 16 for "16GB"
+    
+    # Relationships
+    product = relationship("Product", back_populates="attributes")
+    
+    def __repr__(self):
+        return f"<ProductAttribute(product_id={self.product_id}, key='{self.key}', value='{self.value_str}')>"
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, ForeignKey, Index
+from .base import BaseModel
+
+class ProductStockShard(BaseModel):
+    """One counter slot of a hot product's unreserved stock"""
+    __tablename__ = "product_stock_shards"
+    __table_args__ = (
+        Index("uq_product_stock_shards_product_id_slot", "product_id", "slot", unique=True),
+    )
+    
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    slot = Column(Integer, nullable=False)  # 0 .. products.stock_shards - 1
+    stock_quantity = Column(Integer, default=0, nullable=False)
+    
+    def __repr__(self):
+        return f"<ProductStockShard(product_id={self.product_id}, slot={self.slot}, stock={self.stock_quantity})>"
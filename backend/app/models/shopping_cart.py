@@ -1,10 +1,13 @@
-from sqlalchemy import Column, Integer, ForeignKey, Float
+from sqlalchemy import Column, Integer, ForeignKey, Float, Index
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 
 class ShoppingCart(BaseModel):
     """ShoppingCart model for user's shopping cart items"""
     __tablename__ = "shopping_cart"
+    __table_args__ = (
+        Index("uq_shopping_cart_user_id_product_id", "user_id", "product_id", unique=True),
+    )
     
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False, index=True)
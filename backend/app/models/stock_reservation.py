@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index
+from .base import BaseModel
+
+class StockReservation(BaseModel):
+    """Time-limited hold on product units for a user's cart line"""
+    __tablename__ = "stock_reservations"
+    __table_args__ = (
+        Index("uq_stock_reservations_user_id_product_id", "user_id", "product_id", unique=True),
+        Index("ix_stock_reservations_expires_at", "expires_at"),
+    )
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False, index=True)
+    quantity = Column(Integer, nullable=False)  # units counted in products.reserved_quantity
+    expires_at = Column(DateTime, nullable=False)
+    
+    def __repr__(self):
+        return f"<StockReservation(user_id={self.user_id}, product_id={self.product_id}, qty={self.quantity})>"
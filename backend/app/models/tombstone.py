@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, Index
+from .base import BaseModel
+
+class Tombstone(BaseModel):
+    """Record of a deleted row, so change feeds can report deletes"""
+    __tablename__ = "tombstones"
+    __table_args__ = (
+        Index("ix_tombstones_entity_updated_at", "entity", "updated_at"),
+        Index("ix_tombstones_entity_owner_id_updated_at", "entity", "owner_id", "updated_at"),
+    )
+    
+    entity = Column(String(50), nullable=False)  # e.g. "product", "order"
+    entity_id = Column(Integer, nullable=False)
+    owner_id = Column(Integer, nullable=True)  # user the row belonged to, for per-user feeds
+    
+    def __repr__(self):
+        return f"<Tombstone(entity='{self.entity}', entity_id={self.entity_id})>"
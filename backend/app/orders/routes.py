@@ -1,22 +1,138 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Optional
-
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session, joinedload, selectinload
+from datetime import datetime
+from typing import Dict, NamedTuple, Optional, Union
+
+from app.cart import shards
+from app.changes import read_changes
+from app.config import settings
 from app.database import get_db
-from app.models import Order, OrderItem, Product, User, OrderStatus
-from app.middleware import get_current_user, require_roles
+from app.models import Order, OrderItem, Product, User, OrderStatus, Tombstone
+from app.middleware import get_current_user, require_roles, users_with_roles
 from app.schemas import (
     OrderResponse,
+    OrderChanges,
+    OrderPage,
+    OrderSummary,
+    OrderSummaryPage,
     OrderItemResponse,
     OrderStatusUpdateRequest,
     AssignShipperRequest,
 )
+from app.products import events
+from app.pagination import clamp_limit, paginate_desc
+from app.serialization import json_response
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
 
+def _orders(db: Session):
+    """Order query that loads items and their product names in one extra round trip."""
+    return db.query(Order).options(
+        selectinload(Order.order_items).joinedload(OrderItem.product).load_only(Product.name)
+    )
+
+
+FULL_VIEW = "full"
+SUMMARY_VIEW = "summary"
+
+# Correlated count, served from the order_items.order_id index per listed row.
+_ITEM_COUNT = (
+    select(func.count(OrderItem.id))
+    .where(OrderItem.order_id == Order.id)
+    .correlate(Order)
+    .scalar_subquery()
+    .label("item_count")
+)
+
+
+def _order_summaries(db: Session):
+    """Column-only order query for list views: no items, no products."""
+    return db.query(
+        Order.id,
+        Order.user_id,
+        Order.shipper_id,
+        Order.status,
+        Order.total_price,
+        Order.shipping_address,
+        Order.created_at,
+        Order.updated_at,
+        _ITEM_COUNT,
+    )
+
+
+def _list_query(db: Session, view: str):
+    return _order_summaries(db) if view == SUMMARY_VIEW else _orders(db)
+
+
+def order_view(
+    view: str = Query(
+        FULL_VIEW,
+        pattern=f"^({FULL_VIEW}|{SUMMARY_VIEW})$",
+        description="summary: id, status, totals, item count and dates only, without items",
+    ),
+) -> str:
+    return view
+
+
+class OrderFilters(NamedTuple):
+    status: Optional[OrderStatus]
+    created_from: Optional[datetime]
+    created_to: Optional[datetime]
+    min_total: Optional[float]
+
+
+def order_filters(
+    status: Optional[OrderStatus] = Query(None),
+    created_from: Optional[datetime] = Query(None, description="Inclusive lower bound on created_at (UTC)"),
+    created_to: Optional[datetime] = Query(None, description="Exclusive upper bound on created_at (UTC)"),
+    min_total: Optional[float] = Query(None, ge=0),
+) -> OrderFilters:
+    return OrderFilters(status, created_from, created_to, min_total)
+
+
+def _apply_filters(query, filters: OrderFilters):
+    if filters.status is not None:
+        query = query.filter(Order.status == filters.status)
+    if filters.created_from is not None:
+        query = query.filter(Order.created_at >= filters.created_from)
+    if filters.created_to is not None:
+        query = query.filter(Order.created_at < filters.created_to)
+    if filters.min_total is not None:
+        query = query.filter(Order.total_price >= filters.min_total)
+    return query
+
+
+def _order_page(query, view: str, filters: OrderFilters, cursor: Optional[str], limit: int):
+    rows, next_cursor = paginate_desc(
+        _apply_filters(query, filters), Order.created_at, Order.id, cursor, clamp_limit(limit)
+    )
+    if view == SUMMARY_VIEW:
+        page = OrderSummaryPage.model_construct(
+            items=[_to_order_summary(row) for row in rows], next_cursor=next_cursor
+        )
+        return json_response(OrderSummaryPage, page)
+    page = OrderPage.model_construct(items=[_to_order_response(o) for o in rows], next_cursor=next_cursor)
+    return json_response(OrderPage, page)
+
+
+def _to_order_summary(row) -> OrderSummary:
+    return OrderSummary.model_construct(
+        id=row.id,
+        user_id=row.user_id,
+        shipper_id=row.shipper_id,
+        status=row.status.value if hasattr(row.status, "value") else str(row.status),
+        total_price=row.total_price,
+        shipping_address=row.shipping_address,
+        item_count=row.item_count,
+        created_at=row.created_at,
+        updated_at=row.updated_at,
+    )
+
+
 def _to_order_item_response(item: OrderItem) -> OrderItemResponse:
-    return OrderItemResponse(
+    return OrderItemResponse.model_construct(
         id=item.id,
         product_id=item.product_id,
         product_name=item.product.name if item.product else "",
@@ -26,7 +142,7 @@ def _to_order_item_response(item: OrderItem) -> OrderItemResponse:
 
 
 def _to_order_response(order: Order) -> OrderResponse:
-    return OrderResponse(
+    return OrderResponse.model_construct(
         id=order.id,
         user_id=order.user_id,
         shipper_id=order.shipper_id,
@@ -40,33 +156,52 @@ def _to_order_response(order: Order) -> OrderResponse:
     )
 
 
-@router.get("/my", response_model=List[OrderResponse])
+@router.get("/my", response_model=Union[OrderPage, OrderSummaryPage])
 def list_my_orders(
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
+    view: str = Depends(order_view),
+    filters: OrderFilters = Depends(order_filters),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, description=f"Page size, capped at {settings.MAX_PAGE_SIZE}"),
 ):
-    orders = (
-        db.query(Order)
-        .filter(Order.user_id == user.id)
-        .order_by(Order.created_at.desc())
-        .all()
+    return _order_page(_list_query(db, view).filter(Order.user_id == user.id), view, filters, cursor, limit)
+
+
+@router.get("/my/changes", response_model=OrderChanges)
+def list_my_order_changes(
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+    since: Optional[str] = Query(None, description="next_token from the previous call; omit for a full sync"),
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, description=f"Capped at {settings.MAX_PAGE_SIZE}"),
+):
+    """The caller's orders created, updated or deleted after `since`, oldest change first."""
+    changes = read_changes(
+        _orders(db).filter(Order.user_id == user.id),
+        Order,
+        db.query(Tombstone).filter(Tombstone.entity == "order", Tombstone.owner_id == user.id),
+        since,
+        clamp_limit(limit),
     )
-    return [_to_order_response(o) for o in orders]
+    return json_response(OrderChanges, OrderChanges.model_construct(
+        items=[_to_order_response(o) for o in changes.rows],
+        deleted=changes.deleted,
+        next_token=changes.next_token,
+        has_more=changes.has_more,
+    ))
 
 
-@router.get("/assigned", response_model=List[OrderResponse])
+@router.get("/assigned", response_model=Union[OrderPage, OrderSummaryPage])
 def list_assigned_orders(
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
-    _=Depends(require_roles(["SHIPPER"]))
+    _=Depends(require_roles(["SHIPPER"])),
+    view: str = Depends(order_view),
+    filters: OrderFilters = Depends(order_filters),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, description=f"Page size, capped at {settings.MAX_PAGE_SIZE}"),
 ):
-    orders = (
-        db.query(Order)
-        .filter(Order.shipper_id == user.id)
-        .order_by(Order.created_at.desc())
-        .all()
-    )
-    return [_to_order_response(o) for o in orders]
+    return _order_page(_list_query(db, view).filter(Order.shipper_id == user.id), view, filters, cursor, limit)
 
 
 @router.get("/{order_id}", response_model=OrderResponse)
@@ -75,7 +210,7 @@ def get_order(
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = _orders(db).filter(Order.id == order_id).first()
     if not order:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
 
@@ -99,7 +234,8 @@ def cancel_order(
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    order = db.query(Order).filter(Order.id == order_id).first()
+    # Locked so two concurrent cancels cannot both pass the status check.
+    order = _orders(db).filter(Order.id == order_id).with_for_update().first()
     if not order:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
     if order.user_id != user.id:
@@ -113,28 +249,64 @@ def cancel_order(
 
     order.status = OrderStatus.CANCELLED
 
-    # Restock items (checkout already reduced stock)
+    # Restock items (checkout already reduced stock) with relative UPDATEs in
+    # product id order, the same order checkout locks them in.
+    restock: Dict[int, int] = {}
     for item in order.order_items:
-        product = db.query(Product).filter(Product.id == item.product_id).first()
-        if product:
-            product.stock += item.quantity
+        restock[item.product_id] = restock.get(item.product_id, 0) + item.quantity
+    hot = shards.hot_products(db, restock)
+    for product_id in sorted(restock):
+        if product_id in hot:
+            # Hot product: the background fold reports the new stock level.
+            shards.put(db, product_id, restock[product_id], hot[product_id][0])
+            continue
+        db.execute(
+            update(Product)
+            .where(Product.id == product_id)
+            .values(stock_quantity=Product.stock_quantity + restock[product_id])
+            .execution_options(synchronize_session=False)
+        )
+    stock_changes = []
+    cold = [product_id for product_id in restock if product_id not in hot]
+    for row in db.query(
+        Product.id, Product.category, Product.price, Product.stock_quantity, Product.is_active
+    ).filter(Product.id.in_(cold)):
+        current = events.ProductSnapshot(
+            id=row.id,
+            category=row.category,
+            price=row.price,
+            stock_quantity=row.stock_quantity,
+            is_active=bool(row.is_active),
+        )
+        stock_changes.append((current._replace(stock_quantity=row.stock_quantity - restock[row.id]), current))
 
     db.commit()
-    db.refresh(order)
+    order = _orders(db).filter(Order.id == order_id).populate_existing().one()
+    events.inventory_changed(stock_changes)
     return _to_order_response(order)
 
 
-@router.get("/", response_model=List[OrderResponse])
+@router.get("/", response_model=Union[OrderPage, OrderSummaryPage])
 def list_all_orders(
     db: Session = Depends(get_db),
-    user: User = Depends(require_roles(["ADMIN", "SHIPPER"]))
+    user: User = Depends(require_roles(["ADMIN", "SHIPPER"])),
+    view: str = Depends(order_view),
+    filters: OrderFilters = Depends(order_filters),
+    user_id: Optional[int] = Query(None, description="Orders of this customer"),
+    shipper_id: Optional[int] = Query(None, description="Orders assigned to this shipper (admins only)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, description=f"Page size, capped at {settings.MAX_PAGE_SIZE}"),
 ):
     user_roles = [ur.role.name for ur in user.user_roles]
-    q = db.query(Order).order_by(Order.created_at.desc())
+    q = _list_query(db, view)
     if "ADMIN" not in user_roles:
-        q = q.filter(Order.shipper_id == user.id)
-    orders = q.all()
-    return [_to_order_response(o) for o in orders]
+        # Shippers only ever see their own assignments.
+        shipper_id = user.id
+    if user_id is not None:
+        q = q.filter(Order.user_id == user_id)
+    if shipper_id is not None:
+        q = q.filter(Order.shipper_id == shipper_id)
+    return _order_page(q, view, filters, cursor, limit)
 
 
 @router.put("/{order_id}/status", response_model=OrderResponse)
@@ -144,7 +316,7 @@ def update_order_status(
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = _orders(db).filter(Order.id == order_id).first()
     if not order:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
 
@@ -169,7 +341,7 @@ def update_order_status(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
 
     db.commit()
-    db.refresh(order)
+    order = _orders(db).filter(Order.id == order_id).populate_existing().one()
     return _to_order_response(order)
 
 
@@ -180,11 +352,11 @@ def assign_shipper(
     db: Session = Depends(get_db),
     _user=Depends(require_roles(["ADMIN"]))
 ):
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = _orders(db).filter(Order.id == order_id).first()
     if not order:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
 
-    shipper = db.query(User).filter(User.id == payload.shipper_id).first()
+    shipper = users_with_roles(db).filter(User.id == payload.shipper_id).first()
     if not shipper:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Shipper not found")
 
@@ -194,5 +366,5 @@ def assign_shipper(
 
     order.shipper_id = shipper.id
     db.commit()
-    db.refresh(order)
+    order = _orders(db).filter(Order.id == order_id).populate_existing().one()
     return _to_order_response(order)
@@ -0,0 +1,321 @@
+"""
+Bulk catalog writes: streaming supplier-feed import and batched inventory sync.
+
+Rows are parsed one at a time from the uploaded file (spooled to disk by
+Starlette), validated with ProductCreate and written in batches of
+IMPORT_BATCH_SIZE as a single multi-row INSERT ... ON DUPLICATE KEY UPDATE
+keyed by the unique sku. Each batch commits on its own, so a bad row or even a
+failed batch never aborts the rest of the feed.
+"""
+import codecs
+import csv
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.cart import shards
+from app.config import settings
+from app.models import Product, ProductAttribute
+from app.products import events
+from app.products.specs import attribute_values
+from app.schemas import ProductCreate, InventoryUpdateItem
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+# Rows per SELECT ... FOR UPDATE / CASE-based UPDATE statement.
+INVENTORY_CHUNK_SIZE = 1000
+
+# Columns the feed may leave empty in CSV; empty cells are treated as missing.
+CSV_JSON_COLUMNS = {"specifications"}
+
+
+def iter_csv_rows(binary_file) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Yield (line number, row) from a CSV file with a header line."""
+    # codecs' reader works on SpooledTemporaryFile, which TextIOWrapper does
+    # not accept before Python 3.11.
+    reader = csv.DictReader(codecs.getreader("utf-8-sig")(binary_file))
+    for row in reader:
+        cleaned: Dict[str, Any] = {}
+        for key, value in row.items():
+            if key is None or value is None:
+                continue
+            key = key.strip()
+            value = value.strip()
+            if value == "":
+                continue
+            if key in CSV_JSON_COLUMNS:
+                try:
+                    value = json.loads(value)
+                except ValueError:
+                    pass  # left as a string; validation reports it
+            cleaned[key] = value
+        yield reader.line_num, cleaned
+
+
+def iter_ndjson_rows(binary_file) -> Iterator[Tuple[int, Any]]:
+    """Yield (line number, decoded object) from a newline-delimited JSON file."""
+    for line_number, line in enumerate(codecs.getreader("utf-8-sig")(binary_file), start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError as exc:
+            yield line_number, exc
+
+
+def _error_message(exc: Exception) -> str:
+    if isinstance(exc, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in err['loc']) or 'row'}: {err['msg']}" for err in exc.errors()
+        )
+    return str(exc)
+
+
+class ImportReport:
+    def __init__(self):
+        self.processed = 0
+        self.upserted = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def fail(self, row: int, sku, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < settings.IMPORT_MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "sku": sku, "message": message})
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "processed": self.processed,
+            "upserted": self.upserted,
+            "failed": self.failed,
+            "errors": self.errors,
+        }
+
+
+def _upsert_batch(db: Session, batch: Dict[str, Tuple[int, Dict[str, Any]]]) -> None:
+    now = datetime.utcnow()
+    values = []
+    for _, data in batch.values():
+        values.append({**data, "created_at": now, "updated_at": now})
+
+    stmt = mysql_insert(Product.__table__).values(values)
+    inserted = stmt.inserted
+    table = Product.__table__.c
+    # MySQL applies these left to right and later ones see earlier results, so
+    # image_variants is reset (only when the image actually changes) before
+    # image_url is overwritten. A feed without image_url keeps the current image.
+    stmt = stmt.on_duplicate_key_update([
+        (
+            "image_variants",
+            func.IF(
+                func.coalesce(inserted.image_url, table.image_url) == table.image_url,
+                table.image_variants,
+                None,
+            ),
+        ),
+        ("image_url", func.coalesce(inserted.image_url, table.image_url)),
+        ("name", inserted.name),
+        ("description", inserted.description),
+        ("category", inserted.category),
+        ("price", inserted.price),
+        ("stock_quantity", inserted.stock_quantity),
+        ("brand", inserted.brand),
+        ("model", inserted.model),
+        ("warranty_months", inserted.warranty_months),
+        ("specifications", inserted.specifications),
+        ("is_active", inserted.is_active),
+        ("updated_at", inserted.updated_at),
+    ])
+    db.execute(stmt)
+
+    # Rebuild the spec attribute rows of every product touched by the batch.
+    ids_by_sku = dict(
+        db.execute(select(Product.sku, Product.id).where(Product.sku.in_(list(batch)))).all()
+    )
+    product_ids = list(ids_by_sku.values())
+    db.execute(delete(ProductAttribute).where(ProductAttribute.product_id.in_(product_ids)))
+    attribute_rows = []
+    for sku, (_, data) in batch.items():
+        for key, value_str, value_num in attribute_values(data.get("specifications")):
+            attribute_rows.append({
+                "product_id": ids_by_sku[sku],
+                "key": key,
+                "value_str": value_str,
+                "value_num": value_num,
+                "created_at": now,
+                "updated_at": now,
+            })
+    if attribute_rows:
+        db.execute(insert(ProductAttribute.__table__), attribute_rows)
+
+    shards.respread(db, {ids_by_sku[sku]: data["stock_quantity"] for sku, (_, data) in batch.items()})
+
+
+def _flush(db: Session, batch: Dict[str, Tuple[int, Dict[str, Any]]], report: ImportReport) -> None:
+    if not batch:
+        return
+    try:
+        _upsert_batch(db, batch)
+        db.commit()
+        report.upserted += len(batch)
+    except SQLAlchemyError as exc:
+        db.rollback()
+        message = f"Batch failed: {exc.__class__.__name__}: {getattr(exc, 'orig', exc)}"
+        for sku, (row, _) in batch.items():
+            report.fail(row, sku, message)
+    batch.clear()
+
+
+def import_products(db: Session, binary_file, fmt: str) -> ImportReport:
+    """Validate and upsert every row of a feed file; returns the per-row report."""
+    rows = iter_csv_rows(binary_file) if fmt == "csv" else iter_ndjson_rows(binary_file)
+    report = ImportReport()
+    # Keyed by sku so a sku repeated within a batch is written once (last wins).
+    batch: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+
+    for row_number, raw in rows:
+        report.processed += 1
+        sku = raw.get("sku") if isinstance(raw, dict) else None
+        if isinstance(raw, Exception) or not isinstance(raw, dict):
+            report.fail(row_number, sku, _error_message(raw) if isinstance(raw, Exception) else "Row is not an object")
+            continue
+        try:
+            product = ProductCreate.model_validate(raw)
+        except ValidationError as exc:
+            report.fail(row_number, sku, _error_message(exc))
+            continue
+
+        batch.pop(product.sku, None)
+        batch[product.sku] = (row_number, product.model_dump())
+        if len(batch) >= settings.IMPORT_BATCH_SIZE:
+            _flush(db, batch, report)
+
+    _flush(db, batch, report)
+    return report
+
+
+def _chunks(values: List, size: int) -> Iterator[List]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def apply_inventory_updates(db: Session, items: List[InventoryUpdateItem]) -> Dict[str, Any]:
+    """
+    Apply absolute/relative stock and price changes in one transaction.
+
+    Affected rows are locked in ascending id order (so concurrent syncs and
+    checkouts cannot deadlock against each other), the final values are
+    computed in Python and written back with one CASE-based UPDATE per chunk.
+    Several entries for the same product apply in request order. A delta that
+    would take stock below zero rejects that product only.
+
+    Hot products start from their live level (shards plus holds) rather than
+    the folded products row. Absolute levels are respread over their shards;
+    pure deltas are put into or taken from them, and may not take stock below
+    the units held in carts.
+    """
+    skus = {item.sku for item in items if item.sku is not None}
+    ids_by_sku: Dict[str, int] = {}
+    for chunk in _chunks(sorted(skus), INVENTORY_CHUNK_SIZE):
+        ids_by_sku.update(db.execute(select(Product.sku, Product.id).where(Product.sku.in_(chunk))).all())
+
+    not_found = []
+    resolved: List[Tuple[int, str, InventoryUpdateItem]] = []
+    for item in items:
+        ref = f"sku:{item.sku}" if item.sku is not None else f"id:{item.id}"
+        product_id = ids_by_sku.get(item.sku) if item.sku is not None else item.id
+        if product_id is None:
+            not_found.append(ref)
+            continue
+        resolved.append((product_id, ref, item))
+
+    columns = (Product.id, Product.category, Product.price, Product.stock_quantity, Product.is_active)
+    current: Dict[int, events.ProductSnapshot] = {}
+    hot: Dict[int, shards.ShardedStock] = {}
+    for chunk in _chunks(sorted({product_id for product_id, _, _ in resolved}), INVENTORY_CHUNK_SIZE):
+        rows = db.execute(
+            select(*columns).where(Product.id.in_(chunk)).order_by(Product.id).with_for_update()
+        ).all()
+        hot.update(shards.locked_stock(db, chunk))
+        for row in rows:
+            live = hot.get(row.id)
+            current[row.id] = events.ProductSnapshot(
+                id=row.id,
+                category=row.category,
+                price=row.price,
+                stock_quantity=live.free + live.held if live else row.stock_quantity,
+                is_active=bool(row.is_active),
+            )
+
+    previous = dict(current)
+    rejected = []
+    rejected_ids = set()
+    absolute = set()
+    for product_id, ref, item in resolved:
+        state = current.get(product_id)
+        if state is None:
+            not_found.append(ref)
+            continue
+        stock = state.stock_quantity
+        if item.stock_quantity is not None:
+            stock = item.stock_quantity
+            absolute.add(product_id)
+        elif item.stock_delta is not None:
+            stock += item.stock_delta
+            held = hot[product_id].held if product_id in hot and product_id not in absolute else 0
+            if stock < 0:
+                reason = f"Stock would drop below zero ({stock})"
+            elif stock < held:
+                reason = f"Stock would drop below the {held} units held in carts ({stock})"
+            else:
+                reason = None
+            if reason:
+                rejected.append({"ref": ref, "reason": reason})
+                rejected_ids.add(product_id)
+                continue
+        price = item.price if item.price is not None else state.price
+        current[product_id] = state._replace(stock_quantity=stock, price=price)
+
+    changed = sorted(
+        product_id
+        for product_id, state in current.items()
+        if product_id not in rejected_ids and state != previous[product_id]
+    )
+    now = datetime.utcnow()
+    for chunk in _chunks(changed, INVENTORY_CHUNK_SIZE):
+        db.execute(
+            update(Product)
+            .where(Product.id.in_(chunk))
+            .values(
+                stock_quantity=case({pid: current[pid].stock_quantity for pid in chunk}, value=Product.id),
+                price=case({pid: current[pid].price for pid in chunk}, value=Product.id),
+                updated_at=now,
+            )
+            .execution_options(synchronize_session=False)
+        )
+    shards.respread(db, {pid: current[pid].stock_quantity for pid in changed if pid in absolute})
+    for pid in changed:
+        if pid not in hot or pid in absolute:
+            continue
+        delta = current[pid].stock_quantity - previous[pid].stock_quantity
+        if delta > 0:
+            shards.put(db, pid, delta, hot[pid].slots)
+        elif delta < 0:
+            # The shards are locked and hold at least this much, see above.
+            shards.take(db, pid, -delta)
+    db.commit()
+
+    events.inventory_changed((previous[pid], current[pid]) for pid in changed)
+    return {
+        "requested": len(items),
+        "updated": len(changed),
+        "not_found": not_found,
+        "rejected": rejected,
+    }
@@ -0,0 +1,157 @@
+"""
+Per-worker read cache for the product catalog.
+
+Product detail responses are cached by id and list pages by their normalized
+filter set, each together with its HTTP validators (app.http_cache). Writes
+and cart holds made through this worker invalidate entries precisely (see
+app.products.events); writes made by other workers become visible once the
+entries expire, so CATALOG_CACHE_TTL_SECONDS is the upper bound on staleness.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, NamedTuple, Optional, Tuple
+
+from app.config import settings
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after a fixed TTL."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.max_entries <= 0 or self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def discard_where(self, predicate: Callable[[Hashable], bool]) -> None:
+        with self._lock:
+            for key in [k for k in self._entries if predicate(k)]:
+                del self._entries[key]
+
+    def discard_values_where(self, predicate: Callable[[Any], bool]) -> None:
+        with self._lock:
+            for key in [k for k, (_, value) in self._entries.items() if predicate(value)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class ListFilters(NamedTuple):
+    """Normalized filter set of GET /products/, used as (part of) a cache key."""
+    category: Optional[str]
+    min_price: Optional[float]
+    max_price: Optional[float]
+    in_stock: Optional[bool]
+    is_active: Optional[bool]
+    specs: Tuple = ()
+
+    def matches(self, product) -> bool:
+        """
+        Whether a product (ORM row or snapshot) falls inside this filter set.
+
+        Spec filters are ignored, which errs on the side of invalidating.
+        """
+        if self.category and product.category != self.category:
+            return False
+        if self.min_price is not None and product.price < self.min_price:
+            return False
+        if self.max_price is not None and product.price > self.max_price:
+            return False
+        if self.is_active is not None and bool(product.is_active) != self.is_active:
+            return False
+        if self.in_stock is not None:
+            if (product.stock_quantity >= settings.STOCK_THRESHOLD) != self.in_stock:
+                return False
+        return True
+
+
+def list_filters(category, min_price, max_price, in_stock, is_active, specs=()) -> ListFilters:
+    return ListFilters(
+        category=category or None,
+        min_price=float(min_price) if min_price is not None else None,
+        max_price=float(max_price) if max_price is not None else None,
+        in_stock=in_stock,
+        is_active=is_active,
+        specs=tuple(specs),
+    )
+
+
+class CatalogCache:
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.products = TTLCache(max_entries, ttl_seconds)
+        self.lists = TTLCache(max_entries, ttl_seconds)
+
+    def get_product(self, product_id: int):
+        return self.products.get(product_id)
+
+    def put_product(self, product_id: int, entry) -> None:
+        self.products.set(product_id, entry)
+
+    def get_list(self, filters: ListFilters, cursor: Optional[str], limit: int):
+        return self.lists.get((filters, cursor, limit))
+
+    def put_list(self, filters: ListFilters, cursor: Optional[str], limit: int, entry) -> None:
+        self.lists.set((filters, cursor, limit), entry)
+
+    def invalidate(self, *states) -> None:
+        """
+        Drop everything a product change can affect.
+
+        states are the product before and/or after the change (ORM rows or
+        snapshots, None is ignored). Only list pages whose filters match one of
+        the states are dropped, so e.g. a GPU stock change leaves CPU pages warm.
+        """
+        states = [s for s in states if s is not None]
+        for state in states:
+            self.products.pop(state.id)
+        self.lists.discard_where(
+            lambda key: any(key[0].matches(state) for state in states)
+        )
+
+    def invalidate_held(self, product_ids) -> None:
+        """
+        Drop everything showing the availability of product_ids after their
+        holds moved. Holds do not move a product in or out of any filter set,
+        so only the list pages that contain one of them are dropped.
+        """
+        product_ids = set(product_ids)
+        for product_id in product_ids:
+            self.products.pop(product_id)
+        self.lists.discard_values_where(
+            lambda entry: any(item.id in product_ids for item in entry[0].items)
+        )
+
+    def clear(self) -> None:
+        self.products.clear()
+        self.lists.clear()
+
+
+catalog_cache = CatalogCache(settings.CATALOG_CACHE_MAX_ENTRIES, settings.CATALOG_CACHE_TTL_SECONDS)
@@ -0,0 +1,75 @@
+"""
+Post-commit hooks for product writes.
+
+Routes call these after a product change has been committed so the in-process
+catalog structures (search index, read cache, facet counts, low-stock set, ...)
+stay consistent with the database. Callers take a snapshot() before mutating a product so hooks can
+reason about both the old and the new state.
+"""
+from typing import Iterable, NamedTuple, Optional, Tuple
+
+from app.models import Product
+from app.products.cache import catalog_cache
+from app.products.facets import facet_index
+from app.products.low_stock import low_stock_index
+from app.products.search import search_index
+from app.products.suggest import suggest_index
+
+
+class ProductSnapshot(NamedTuple):
+    id: int
+    category: str
+    price: float
+    stock_quantity: int
+    is_active: bool
+
+
+def snapshot(product: Product) -> ProductSnapshot:
+    return ProductSnapshot(
+        id=product.id,
+        category=product.category,
+        price=product.price,
+        stock_quantity=product.stock_quantity,
+        is_active=bool(product.is_active),
+    )
+
+
+def product_saved(product: Product, previous: Optional[ProductSnapshot] = None) -> None:
+    catalog_cache.invalidate(previous, snapshot(product))
+    search_index.add(product)
+    suggest_index.add(product)
+    facet_index.add(product)
+    low_stock_index.update(product.id, product.category, product.stock_quantity)
+
+
+def product_deleted(previous: ProductSnapshot) -> None:
+    catalog_cache.invalidate(previous)
+    search_index.remove(previous.id)
+    suggest_index.remove(previous.id)
+    facet_index.remove(previous.id)
+    low_stock_index.remove(previous.id)
+
+
+def inventory_changed(changes: Iterable[Tuple[ProductSnapshot, ProductSnapshot]]) -> None:
+    """Stock and/or price changes, as (previous, current) snapshot pairs."""
+    changes = list(changes)
+    if not changes:
+        return
+    catalog_cache.invalidate(*(state for change in changes for state in change))
+    for _, current in changes:
+        facet_index.update_inventory(current.id, current.stock_quantity, current.price)
+        low_stock_index.update(current.id, current.category, current.stock_quantity)
+
+
+def holds_changed(product_ids: Iterable[int]) -> None:
+    """Cart holds moved reserved_quantity (and so availability) of these products."""
+    catalog_cache.invalidate_held(product_ids)
+
+
+def catalog_reloaded() -> None:
+    """Bulk writes bypassed the per-product hooks: drop all derived state."""
+    catalog_cache.clear()
+    search_index.reset()
+    suggest_index.reset()
+    facet_index.reset()
+    low_stock_index.reset()
@@ -0,0 +1,204 @@
+"""
+Incrementally maintained facet counts for the product catalog.
+
+Every product is reduced to a cell (is_active, category, brand, price
+bucket, stock state). The number of distinct cells is bounded by the catalog's
+variety (categories x brands x FACET_PRICE_BUCKETS x stock states), not its
+size, so facet requests walk a few thousand cells instead of grouping over the
+products table. Each cell keeps the sorted prices of its products: its count
+is the list's length, and a min_price/max_price that cuts through the cell's
+bucket is answered with two bisections. Like the search index, the cube is
+built on first use and then updated by app.products.events.
+
+The cube is per process and only sees writes made through this process, so
+the backend is meant to run as a single process (see README "Deployment").
+"""
+import bisect
+import threading
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Product
+
+IN_STOCK = "in_stock"
+LOW_STOCK = "low_stock"
+OUT_OF_STOCK = "out_of_stock"
+
+
+class FacetCell(NamedTuple):
+    is_active: bool
+    category: str
+    brand: Optional[str]
+    price_bucket: int
+    stock_state: str
+
+
+def stock_state(stock_quantity: int) -> str:
+    if stock_quantity >= settings.STOCK_THRESHOLD:
+        return IN_STOCK
+    if stock_quantity > 0:
+        return LOW_STOCK
+    return OUT_OF_STOCK
+
+
+def price_bucket(price: float) -> int:
+    """
+    Index into settings.FACET_PRICE_BUCKETS; the last index is the open-ended
+    bucket. Buckets are [min_price, max_price), so a price equal to a bound
+    counts in the bucket that starts there, like GET /products/?min_price=.
+    """
+    return bisect.bisect_right(settings.FACET_PRICE_BUCKETS, price)
+
+
+def _bucket_bounds(index: int) -> Tuple[float, float]:
+    bounds = settings.FACET_PRICE_BUCKETS
+    low = bounds[index - 1] if index > 0 else float("-inf")
+    high = bounds[index] if index < len(bounds) else float("inf")
+    return low, high
+
+
+def _cell(product) -> FacetCell:
+    return FacetCell(
+        is_active=bool(product.is_active),
+        category=product.category,
+        brand=product.brand,
+        price_bucket=price_bucket(product.price),
+        stock_state=stock_state(product.stock_quantity),
+    )
+
+
+def _count_in_range(cell: FacetCell, prices: List[float], min_price, max_price) -> int:
+    """Products of a cell priced within [min_price, max_price]."""
+    low, high = _bucket_bounds(cell.price_bucket)
+    if (min_price is None or min_price <= low) and (max_price is None or max_price >= high):
+        return len(prices)
+    if (min_price is not None and min_price >= high) or (max_price is not None and max_price < low):
+        return 0
+    start = 0 if min_price is None else bisect.bisect_left(prices, min_price)
+    end = len(prices) if max_price is None else bisect.bisect_right(prices, max_price)
+    return max(end - start, 0)
+
+
+class FacetIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._built = False
+        self._prices: Dict[FacetCell, List[float]] = {}
+        self._cell_by_id: Dict[int, Tuple[FacetCell, float]] = {}
+
+    def ensure_built(self, db: Session) -> None:
+        if self._built:
+            return
+        with self._lock:
+            if self._built:
+                return
+            rows = db.query(
+                Product.id,
+                Product.is_active,
+                Product.category,
+                Product.brand,
+                Product.price,
+                Product.stock_quantity,
+            ).yield_per(5000)
+            for row in rows:
+                self._set_locked(row.id, _cell(row), row.price)
+            self._built = True
+
+    def reset(self) -> None:
+        with self._lock:
+            self._built = False
+            self._prices.clear()
+            self._cell_by_id.clear()
+
+    def add(self, product: Product) -> None:
+        with self._lock:
+            if self._built:
+                self._set_locked(product.id, _cell(product), product.price)
+
+    def remove(self, product_id: int) -> None:
+        with self._lock:
+            if self._built:
+                self._set_locked(product_id, None, None)
+
+    def update_inventory(self, product_id: int, stock_quantity: int, price: float) -> None:
+        with self._lock:
+            entry = self._cell_by_id.get(product_id)
+            if self._built and entry is not None:
+                cell = entry[0]._replace(stock_state=stock_state(stock_quantity), price_bucket=price_bucket(price))
+                self._set_locked(product_id, cell, price)
+
+    def _set_locked(self, product_id: int, cell: Optional[FacetCell], price: Optional[float]) -> None:
+        old = self._cell_by_id.pop(product_id, None)
+        if old is not None:
+            old_cell, old_price = old
+            prices = self._prices[old_cell]
+            del prices[bisect.bisect_left(prices, old_price)]
+            if not prices:
+                del self._prices[old_cell]
+        if cell is not None:
+            self._cell_by_id[product_id] = (cell, price)
+            bisect.insort(self._prices.setdefault(cell, []), price)
+
+    def counts(self, category, min_price, max_price, in_stock, is_active) -> dict:
+        """
+        Facet counts for a filter set, using the filters of GET /products/.
+
+        Each dimension is counted with every filter except its own applied, so
+        the client can still offer the alternatives to the active selection.
+        """
+        categories: Counter = Counter()
+        brands: Counter = Counter()
+        buckets: Counter = Counter()
+        availability: Counter = Counter()
+        total = 0
+
+        with self._lock:
+            cells = [
+                (cell, len(prices), _count_in_range(cell, prices, min_price, max_price))
+                for cell, prices in self._prices.items()
+                if is_active is None or cell.is_active == is_active
+            ]
+
+        for cell, count, priced in cells:
+            category_ok = not category or cell.category == category
+            stock_ok = in_stock is None or (cell.stock_state == IN_STOCK) == in_stock
+
+            if category_ok and stock_ok:
+                buckets[cell.price_bucket] += count
+            if not priced:
+                continue
+            if stock_ok:
+                categories[cell.category] += priced
+            if category_ok and stock_ok:
+                total += priced
+                if cell.brand:
+                    brands[cell.brand] += priced
+            if category_ok:
+                availability[cell.stock_state] += priced
+
+        bounds = settings.FACET_PRICE_BUCKETS
+        price_buckets = []
+        for index in range(len(bounds) + 1):
+            price_buckets.append({
+                "min_price": bounds[index - 1] if index > 0 else 0.0,
+                "max_price": bounds[index] if index < len(bounds) else None,
+                "count": buckets.get(index, 0),
+            })
+
+        return {
+            "total": total,
+            "categories": dict(sorted(categories.items())),
+            "brands": dict(sorted(brands.items())),
+            "price_buckets": price_buckets,
+            "availability": {
+                IN_STOCK: availability.get(IN_STOCK, 0),
+                LOW_STOCK: availability.get(LOW_STOCK, 0),
+                OUT_OF_STOCK: availability.get(OUT_OF_STOCK, 0),
+            },
+        }
+
+
+facet_index = FacetIndex()
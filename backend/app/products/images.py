@@ -0,0 +1,83 @@
+"""
+Derived image variants for product photos.
+
+Uploads are stored untouched by the upload route; process_product_image then
+runs as a background task (after the response has been sent) and writes
+resized WebP renditions next to the original, recording their URLs on the
+product.
+"""
+import logging
+import os
+
+from PIL import Image, ImageOps
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Product
+from app.products import events
+
+logger = logging.getLogger(__name__)
+
+# Variant name -> longest edge in pixels.
+IMAGE_VARIANTS = {
+    "thumb": 160,
+    "card": 480,
+    "full": 1200,
+}
+
+
+def _url_to_path(url: str) -> str:
+    return url.lstrip("/")
+
+
+def _variant_path(stem: str, name: str) -> str:
+    return f"{stem}_{name}.webp"
+
+
+def render_variants(source_path: str) -> dict:
+    """
+    Write every variant for source_path and return {variant: url}.
+
+    Originals are content-addressed, so variants derived from them are too:
+    when they already exist (the same image was uploaded before) they are
+    reused instead of re-rendered.
+    """
+    stem = os.path.splitext(source_path)[0]
+    variants = {name: "/" + _variant_path(stem, name).replace(os.sep, "/") for name in IMAGE_VARIANTS}
+    if all(os.path.exists(_variant_path(stem, name)) for name in IMAGE_VARIANTS):
+        return variants
+
+    with Image.open(source_path) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+        for name, edge in IMAGE_VARIANTS.items():
+            rendition = image.copy()
+            rendition.thumbnail((edge, edge), Image.LANCZOS)
+            target = _variant_path(stem, name)
+            tmp_target = f"{target}.{os.getpid()}.tmp"
+            rendition.save(tmp_target, format="WEBP", quality=settings.IMAGE_WEBP_QUALITY, method=4)
+            os.replace(tmp_target, target)
+    return variants
+
+
+def process_product_image(product_id: int, image_url: str) -> None:
+    """Background task: render variants of image_url and attach them to the product."""
+    try:
+        variants = render_variants(_url_to_path(image_url))
+    except Exception:
+        logger.exception("Failed to process image %s for product %s", image_url, product_id)
+        return
+
+    db = SessionLocal()
+    try:
+        product = db.query(Product).filter(Product.id == product_id).first()
+        # Skip if the product is gone or got a newer image meanwhile.
+        if not product or product.image_url != image_url:
+            return
+        product.image_variants = variants
+        db.commit()
+        db.refresh(product)
+        events.product_saved(product)
+    finally:
+        db.close()
@@ -0,0 +1,105 @@
+"""
+Incrementally maintained set of products below STOCK_THRESHOLD.
+
+Entries are kept as (stock_quantity, id) keys in sorted lists, one for the
+whole catalog and one per category, so a page of the admin low-stock view is
+a bisect plus a slice instead of a scan and sort of the products table. Like
+the facet cube it is built on first use and then updated by
+app.products.events.
+
+The set is per process. The route re-checks the entries it returns, but a
+product that another process moved below the threshold is never added, so
+the backend is meant to run as a single process (see README "Deployment").
+"""
+import bisect
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Product
+
+StockKey = Tuple[int, int]
+
+
+class LowStockIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._built = False
+        self._entries: Dict[int, Tuple[StockKey, str]] = {}
+        self._all: List[StockKey] = []
+        self._by_category: Dict[str, List[StockKey]] = {}
+
+    def ensure_built(self, db: Session) -> None:
+        if self._built:
+            return
+        with self._lock:
+            if self._built:
+                return
+            rows = (
+                db.query(Product.id, Product.category, Product.stock_quantity)
+                .filter(Product.stock_quantity < settings.STOCK_THRESHOLD)
+                .all()
+            )
+            for row in rows:
+                self._set_locked(row.id, row.category, row.stock_quantity)
+            self._built = True
+
+    def reset(self) -> None:
+        with self._lock:
+            self._built = False
+            self._entries.clear()
+            self._all.clear()
+            self._by_category.clear()
+
+    def update(self, product_id: int, category: str, stock_quantity: int) -> None:
+        with self._lock:
+            if self._built:
+                self._set_locked(product_id, category, stock_quantity)
+
+    def remove(self, product_id: int) -> None:
+        with self._lock:
+            if self._built:
+                self._discard_locked(product_id)
+
+    def page(self, category: Optional[str], after: Optional[StockKey], limit: int) -> Tuple[List[StockKey], bool]:
+        """
+        Up to `limit` keys ordered by stock then id, starting after `after`,
+        and whether more follow.
+        """
+        with self._lock:
+            keys = self._by_category.get(category, []) if category else self._all
+            start = bisect.bisect_right(keys, after) if after else 0
+            chunk = keys[start:start + limit + 1]
+        return chunk[:limit], len(chunk) > limit
+
+    def _set_locked(self, product_id: int, category: str, stock_quantity: int) -> None:
+        self._discard_locked(product_id)
+        if stock_quantity >= settings.STOCK_THRESHOLD:
+            return
+        key = (stock_quantity, product_id)
+        self._entries[product_id] = (key, category)
+        bisect.insort(self._all, key)
+        bisect.insort(self._by_category.setdefault(category, []), key)
+
+    def _discard_locked(self, product_id: int) -> None:
+        entry = self._entries.pop(product_id, None)
+        if entry is None:
+            return
+        key, category = entry
+        _remove_key(self._all, key)
+        keys = self._by_category.get(category)
+        if keys is not None:
+            _remove_key(keys, key)
+            if not keys:
+                del self._by_category[category]
+
+
+def _remove_key(keys: List[StockKey], key: StockKey) -> None:
+    index = bisect.bisect_left(keys, key)
+    if index < len(keys) and keys[index] == key:
+        del keys[index]
+
+
+low_stock_index = LowStockIndex()
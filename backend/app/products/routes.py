@@ -1,57 +1,63 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query, UploadFile, File, Request
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session, selectinload
 from typing import Optional, List
 import os
-import uuid
+from datetime import datetime
 
 from app.database import get_db
-from app.models import Product
-from app.schemas import ProductCreate, ProductUpdate, ProductStockUpdate, ProductResponse
+from app.models import Order, Product, Tombstone
+from app.schemas import (
+    ProductCreate,
+    ProductUpdate,
+    ProductStockUpdate,
+    ProductStockShardsUpdate,
+    ProductStockShards,
+    ProductResponse,
+    ProductPage,
+    ProductBatchRequest,
+    ProductBatch,
+    ProductChanges,
+    ProductSearchHit,
+    ProductSuggestion,
+    ProductFacets,
+    ProductImportResult,
+    InventoryUpdateRequest,
+    InventoryUpdateResult,
+)
 from app.middleware import require_roles
+from app.cart import shards
 from app.config import settings
+from app.uploads import image_extension, store_upload
+from app.changes import read_changes, record_deletion
+from app.http_cache import make_validators, is_not_modified, set_validators, not_modified
+from app.pagination import clamp_limit, decode_key_cursor, encode_key_cursor, paginate_desc
+from app.serialization import json_response
+from app.products import events
+from app.products.cache import catalog_cache, list_filters, ListFilters
+from app.products.bulk import IMPORT_FORMATS, import_products, apply_inventory_updates
+from app.products.facets import facet_index
+from app.products.images import process_product_image
+from app.products.low_stock import low_stock_index
+from app.products.search import search_index
+from app.products.suggest import suggest_index
+from app.products.specs import build_attributes, parse_spec_filters, spec_filter_clause
 
 router = APIRouter(prefix="/products", tags=["products"])
 
+SUGGEST_DEFAULT_LIMIT = 10
+SUGGEST_MAX_LIMIT = 20
 
-def _validate_image(file: UploadFile) -> None:
-    if not file.filename:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No file provided")
+# Ids accepted per multi-get; GET is further limited by URL length in practice.
+BATCH_MAX_IDS = 1000
 
-    ext = os.path.splitext(file.filename)[1].lstrip(".").lower()
-    if ext not in settings.ALLOWED_IMAGE_EXTENSIONS:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid image type. Allowed: {', '.join(settings.ALLOWED_IMAGE_EXTENSIONS)}",
-        )
-
-    file.file.seek(0, os.SEEK_END)
-    size = file.file.tell()
-    file.file.seek(0)
-
-    if size > settings.MAX_UPLOAD_SIZE:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File too large. Max size: {settings.MAX_UPLOAD_SIZE} bytes",
-        )
 
-
-def _save_image(file: UploadFile) -> str:
-    ext = os.path.splitext(file.filename)[1].lower()
-    filename = f"{uuid.uuid4().hex}{ext}"
-    upload_dir = os.path.join("uploads", "products")
-    os.makedirs(upload_dir, exist_ok=True)
-    file_path = os.path.join(upload_dir, filename)
-
-    with open(file_path, "wb") as out_file:
-        out_file.write(file.file.read())
-
-    return f"/uploads/products/{filename}"
-
-
-def to_product_response(product: Product) -> ProductResponse:
-    is_in_stock = product.stock_quantity >= settings.STOCK_THRESHOLD
+def _product_fields(product: Product) -> dict:
+    # Units held in other carts cannot be bought (app.cart.reservations).
+    available_quantity = max(product.stock_quantity - product.reserved_quantity, 0)
+    is_in_stock = product.stock_quantity >= settings.STOCK_THRESHOLD and available_quantity > 0
     is_low_stock = 0 < product.stock_quantity < settings.STOCK_THRESHOLD
-    return ProductResponse(
+    return dict(
         id=product.id,
         name=product.name,
         description=product.description,
@@ -59,63 +65,305 @@ def to_product_response(product: Product) -> ProductResponse:
         price=product.price,
         stock_quantity=product.stock_quantity,
         image_url=product.image_url,
+        image_variants=product.image_variants,
         sku=product.sku,
         brand=product.brand,
         model=product.model,
         warranty_months=product.warranty_months,
         specifications=product.specifications,
         is_active=product.is_active,
+        available_quantity=available_quantity,
         is_in_stock=is_in_stock,
         is_low_stock=is_low_stock,
     )
 
 
-@router.get("/", response_model=List[ProductResponse])
+def to_product_response(product: Product) -> ProductResponse:
+    # Built from a trusted row, so skip validation (see app.serialization).
+    return ProductResponse.model_construct(**_product_fields(product))
+
+
+def _batch(ids: List[int], db: Session):
+    """Resolve ids from the read cache, then the rest with a single IN query."""
+    if len(ids) > BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {BATCH_MAX_IDS} ids per request",
+        )
+
+    found = {}
+    for product_id in set(ids):
+        cached = catalog_cache.get_product(product_id)
+        if cached is not None:
+            found[product_id] = cached[0]
+
+    wanted = [product_id for product_id in set(ids) if product_id not in found]
+    if wanted:
+        for product in db.query(Product).filter(Product.id.in_(wanted)).all():
+            body = to_product_response(product)
+            found[product.id] = body
+            validators = make_validators(
+                product.updated_at, product.id, product.stock_quantity, product.reserved_quantity
+            )
+            catalog_cache.put_product(product.id, (body, validators))
+
+    batch = ProductBatch.model_construct(
+        items=[found.get(product_id) for product_id in ids],
+        missing=list(dict.fromkeys(product_id for product_id in ids if product_id not in found)),
+    )
+    return json_response(ProductBatch, batch)
+
+
+def _list_validators(query, *parts):
+    """
+    Validators for a list: newest updated_at, row count and held units of the
+    filtered set (holds leave updated_at alone but change availability).
+    """
+    last_modified, count, reserved = query.with_entities(
+        func.max(Product.updated_at), func.count(Product.id), func.sum(Product.reserved_quantity)
+    ).one()
+    return make_validators(last_modified, count, reserved, *parts)
+
+
+def _filtered_query(db: Session, filters: ListFilters):
+    query = db.query(Product)
+
+    if filters.category:
+        query = query.filter(Product.category == filters.category)
+    if filters.min_price is not None:
+        query = query.filter(Product.price >= filters.min_price)
+    if filters.max_price is not None:
+        query = query.filter(Product.price <= filters.max_price)
+    if filters.is_active is not None:
+        query = query.filter(Product.is_active == filters.is_active)
+    if filters.in_stock is not None:
+        if filters.in_stock:
+            query = query.filter(Product.stock_quantity >= settings.STOCK_THRESHOLD)
+        else:
+            query = query.filter(Product.stock_quantity < settings.STOCK_THRESHOLD)
+    for spec_filter in filters.specs:
+        query = query.filter(spec_filter_clause(spec_filter))
+
+    return query
+
+
+@router.get("/", response_model=ProductPage)
 def list_products(
+    request: Request,
     db: Session = Depends(get_db),
     category: Optional[str] = Query(None),
     min_price: Optional[float] = Query(None, ge=0),
     max_price: Optional[float] = Query(None, ge=0),
     in_stock: Optional[bool] = Query(None),
     is_active: Optional[bool] = Query(True),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, description=f"Page size, capped at {settings.MAX_PAGE_SIZE}"),
 ):
-    query = db.query(Product)
-
+    """
+    List products, newest first.
+
+    Besides the declared parameters, specification attributes can be filtered
+    with spec.<key>=value (repeat for OR), spec.<key>.min=n and spec.<key>.max=n,
+    e.g. ?spec.socket=LGA1700&spec.vram.min=16.
+    """
+    filters = list_filters(
+        category, min_price, max_price, in_stock, is_active, parse_spec_filters(request.query_params)
+    )
+    limit = clamp_limit(limit)
+    cached = catalog_cache.get_list(filters, cursor, limit)
+    if cached is not None:
+        page, validators = cached
+    else:
+        page = None
+        validators = _list_validators(_filtered_query(db, filters), filters, cursor, limit)
+
+    if is_not_modified(request, validators):
+        return not_modified(validators)
+
+    if page is None:
+        products, next_cursor = paginate_desc(_filtered_query(db, filters), Product.created_at, Product.id, cursor, limit)
+        page = ProductPage.model_construct(items=[to_product_response(p) for p in products], next_cursor=next_cursor)
+        catalog_cache.put_list(filters, cursor, limit, (page, validators))
+    result = json_response(ProductPage, page)
+    set_validators(result, validators)
+    return result
+
+
+@router.get("/search", response_model=List[ProductSearchHit])
+def search_products(
+    q: str = Query(..., min_length=1, max_length=200),
+    category: Optional[str] = Query(None),
+    limit: int = Query(20, ge=1),
+    db: Session = Depends(get_db),
+):
+    search_index.ensure_built(db)
+    limit = clamp_limit(limit)
+    # Over-fetch when filtering by category so the page still fills up.
+    ranked = search_index.search(q, limit * 5 if category else limit)
+    if not ranked:
+        return []
+
+    query = db.query(Product).filter(Product.id.in_([product_id for product_id, _ in ranked]))
     if category:
         query = query.filter(Product.category == category)
-    if min_price is not None:
-        query = query.filter(Product.price >= min_price)
-    if max_price is not None:
-        query = query.filter(Product.price <= max_price)
-    if is_active is not None:
-        query = query.filter(Product.is_active == is_active)
-    if in_stock is not None:
-        if in_stock:
-            query = query.filter(Product.stock_quantity >= settings.STOCK_THRESHOLD)
-        else:
-            query = query.filter(Product.stock_quantity < settings.STOCK_THRESHOLD)
+    products = {p.id: p for p in query.all()}
+
+    hits = []
+    for product_id, score in ranked:
+        product = products.get(product_id)
+        if product is None or not product.is_active:
+            continue
+        hits.append(ProductSearchHit.model_construct(**_product_fields(product), score=round(score, 4)))
+        if len(hits) == limit:
+            break
+    return json_response(List[ProductSearchHit], hits)
+
+
+@router.get("/suggest", response_model=List[ProductSuggestion])
+def suggest_products(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(SUGGEST_DEFAULT_LIMIT, ge=1, description=f"Capped at {SUGGEST_MAX_LIMIT}"),
+    db: Session = Depends(get_db),
+):
+    """Typeahead completions for a prefix, served from the in-memory prefix index."""
+    suggest_index.ensure_built(db)
+    hits = suggest_index.suggest(q, min(limit, SUGGEST_MAX_LIMIT))
+    return json_response(List[ProductSuggestion], [ProductSuggestion.model_construct(**hit._asdict()) for hit in hits])
 
-    products = query.order_by(Product.created_at.desc()).all()
-    return [to_product_response(p) for p in products]
 
+@router.get("/facets", response_model=ProductFacets)
+def product_facets(
+    db: Session = Depends(get_db),
+    category: Optional[str] = Query(None),
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    in_stock: Optional[bool] = Query(None),
+    is_active: Optional[bool] = Query(True),
+):
+    facet_index.ensure_built(db)
+    return facet_index.counts(category, min_price, max_price, in_stock, is_active)
 
-@router.get("/low-stock", response_model=List[ProductResponse])
-def list_low_stock_products(db: Session = Depends(get_db)):
-    products = (
-        db.query(Product)
-        .filter(Product.stock_quantity < settings.STOCK_THRESHOLD)
-        .order_by(Product.stock_quantity.asc())
-        .all()
+
+@router.get("/low-stock", response_model=ProductPage)
+def list_low_stock_products(
+    request: Request,
+    db: Session = Depends(get_db),
+    category: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, description=f"Page size, capped at {settings.MAX_PAGE_SIZE}"),
+):
+    """Products below STOCK_THRESHOLD, lowest stock first."""
+    low_stock_index.ensure_built(db)
+    limit = clamp_limit(limit)
+    after = decode_key_cursor(cursor, 2) if cursor else None
+
+    # The index is per process; another worker may have changed stock since it
+    # was last updated here. Stale entries are corrected and the page re-read.
+    for _ in range(2):
+        keys, has_more = low_stock_index.page(category, after, limit)
+        ids = [product_id for _, product_id in keys]
+        products = {p.id: p for p in db.query(Product).filter(Product.id.in_(ids)).all()} if ids else {}
+        stale = False
+        for stock_quantity, product_id in keys:
+            product = products.get(product_id)
+            if product is None:
+                low_stock_index.remove(product_id)
+                stale = True
+            elif product.stock_quantity != stock_quantity or (category and product.category != category):
+                low_stock_index.update(product.id, product.category, product.stock_quantity)
+                stale = True
+        if not stale:
+            break
+
+    items = [products[product_id] for _, product_id in keys if product_id in products]
+    next_cursor = encode_key_cursor(*keys[-1]) if has_more and keys else None
+    validators = make_validators(
+        max((p.updated_at for p in items if p.updated_at), default=None),
+        "low-stock", category, cursor, limit, next_cursor,
+        [(p.id, p.stock_quantity, p.reserved_quantity) for p in items],
     )
-    return [to_product_response(p) for p in products]
+    if is_not_modified(request, validators):
+        return not_modified(validators)
+
+    page = ProductPage.model_construct(items=[to_product_response(p) for p in items], next_cursor=next_cursor)
+    result = json_response(ProductPage, page)
+    set_validators(result, validators)
+    return result
+
+
+@router.get("/batch", response_model=ProductBatch)
+def get_products_batch(
+    ids: Optional[List[str]] = Query(None, description="Product ids, comma separated and/or repeated"),
+    db: Session = Depends(get_db),
+):
+    """Multi-get: products in request order, null entries for unknown ids."""
+    try:
+        parsed = [int(part) for value in ids or () for part in value.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="ids must be integers")
+    if not parsed:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No ids given")
+    return _batch(parsed, db)
+
+
+@router.post("/batch", response_model=ProductBatch)
+def post_products_batch(payload: ProductBatchRequest, db: Session = Depends(get_db)):
+    """POST variant of GET /products/batch for id lists too long for a URL."""
+    return _batch(payload.ids, db)
+
+
+@router.get("/changes", response_model=ProductChanges)
+def list_product_changes(
+    db: Session = Depends(get_db),
+    since: Optional[str] = Query(None, description="next_token from the previous call; omit for a full sync"),
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, description=f"Capped at {settings.MAX_PAGE_SIZE}"),
+):
+    """Products created, updated or deleted after `since`, oldest change first."""
+    changes = read_changes(
+        db.query(Product),
+        Product,
+        db.query(Tombstone).filter(Tombstone.entity == "product"),
+        since,
+        clamp_limit(limit),
+    )
+    return json_response(ProductChanges, ProductChanges.model_construct(
+        items=[to_product_response(p) for p in changes.rows],
+        deleted=changes.deleted,
+        next_token=changes.next_token,
+        has_more=changes.has_more,
+    ))
 
 
 @router.get("/{product_id}", response_model=ProductResponse)
-def get_product(product_id: int, db: Session = Depends(get_db)):
-    product = db.query(Product).filter(Product.id == product_id).first()
-    if not product:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
-    return to_product_response(product)
+def get_product(product_id: int, request: Request, db: Session = Depends(get_db)):
+    cached = catalog_cache.get_product(product_id)
+    if cached is not None:
+        body, validators = cached
+    else:
+        body = None
+        # Validate against a couple of columns before loading the whole row.
+        row = (
+            db.query(Product.updated_at, Product.stock_quantity, Product.reserved_quantity)
+            .filter(Product.id == product_id)
+            .first()
+        )
+        if not row:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
+        validators = make_validators(row.updated_at, product_id, row.stock_quantity, row.reserved_quantity)
+
+    if is_not_modified(request, validators):
+        return not_modified(validators)
+
+    if body is None:
+        product = db.query(Product).filter(Product.id == product_id).first()
+        if not product:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
+        body = to_product_response(product)
+        validators = make_validators(product.updated_at, product_id, product.stock_quantity, product.reserved_quantity)
+        catalog_cache.put_product(product_id, (body, validators))
+    result = json_response(ProductResponse, body)
+    set_validators(result, validators)
+    return result
 
 
 @router.post("/", response_model=ProductResponse, status_code=status.HTTP_201_CREATED)
@@ -130,12 +378,51 @@ def create_product(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="SKU already exists")
 
     product = Product(**payload.model_dump())
+    product.attributes = build_attributes(product.specifications)
     db.add(product)
     db.commit()
     db.refresh(product)
+    events.product_saved(product)
     return to_product_response(product)
 
 
+def _import_format(file: UploadFile, requested: Optional[str]) -> str:
+    if requested:
+        return requested
+    ext = os.path.splitext(file.filename or "")[1].lower()
+    content_type = (file.content_type or "").split(";")[0].strip()
+    if ext == ".csv" or content_type == "text/csv":
+        return "csv"
+    if ext in {".ndjson", ".jsonl"} or content_type in {"application/x-ndjson", "application/jsonl"}:
+        return "ndjson"
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Cannot tell the feed format; pass format={'|'.join(IMPORT_FORMATS)}",
+    )
+
+
+@router.post("/import", response_model=ProductImportResult)
+def import_products_feed(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+    db: Session = Depends(get_db),
+    _user=Depends(require_roles(["ADMIN"]))
+):
+    report = import_products(db, file.file, _import_format(file, format))
+    if report.upserted:
+        events.catalog_reloaded()
+    return report.as_dict()
+
+
+@router.post("/inventory", response_model=InventoryUpdateResult)
+def bulk_update_inventory(
+    payload: InventoryUpdateRequest,
+    db: Session = Depends(get_db),
+    _user=Depends(require_roles(["ADMIN"]))
+):
+    return apply_inventory_updates(db, payload.items)
+
+
 @router.put("/{product_id}", response_model=ProductResponse)
 def update_product(
     product_id: int,
@@ -144,21 +431,34 @@ def update_product(
     _user=Depends(require_roles(["ADMIN"]))
 ):
     print(f"DEBUG: Updating product {product_id} with payload: {payload.model_dump()}")
-    product = db.query(Product).filter(Product.id == product_id).first()
+    update_data = payload.model_dump(exclude_unset=True)
+    query = db.query(Product)
+    if "specifications" in update_data:
+        # The attribute rows are replaced below, which needs the current ones.
+        query = query.options(selectinload(Product.attributes))
+    product = query.filter(Product.id == product_id).first()
     if not product:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
 
-    update_data = payload.model_dump(exclude_unset=True)
     if "sku" in update_data:
         existing = db.query(Product).filter(Product.sku == update_data["sku"], Product.id != product_id).first()
         if existing:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="SKU already exists")
 
+    previous = events.snapshot(product)
     for key, value in update_data.items():
         setattr(product, key, value)
-
+    if "image_url" in update_data:
+        product.image_variants = None
+    if "specifications" in update_data:
+        product.attributes = build_attributes(product.specifications)
+    if update_data.get("stock_quantity") is not None:
+        shards.respread(db, {product_id: update_data["stock_quantity"]})
+
+    # No refresh(): it would also reload the attributes collection; the
+    # expired columns are re-read on first access instead.
     db.commit()
-    db.refresh(product)
+    events.product_saved(product, previous)
     return to_product_response(product)
 
 
@@ -173,30 +473,102 @@ def update_stock(
     if not product:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
 
+    previous = events.snapshot(product)
     product.stock_quantity = payload.stock_quantity
+    shards.respread(db, {product_id: payload.stock_quantity})
     db.commit()
     db.refresh(product)
+    events.inventory_changed([(previous, events.snapshot(product))])
     return to_product_response(product)
 
 
+def _stock_shards(db: Session, product: Product) -> ProductStockShards:
+    return ProductStockShards(
+        product_id=product.id,
+        shards=product.stock_shards,
+        stock_quantity=product.stock_quantity,
+        reserved_quantity=product.reserved_quantity,
+        shard_stock=shards.shard_levels(db, product.id),
+    )
+
+
+@router.get("/{product_id}/stock-shards", response_model=ProductStockShards)
+def get_stock_shards(
+    product_id: int,
+    db: Session = Depends(get_db),
+    _user=Depends(require_roles(["ADMIN"]))
+):
+    product = db.query(Product).filter(Product.id == product_id).first()
+    if not product:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
+    return _stock_shards(db, product)
+
+
+@router.put("/{product_id}/stock-shards", response_model=ProductStockShards)
+def update_stock_shards(
+    product_id: int,
+    payload: ProductStockShardsUpdate,
+    db: Session = Depends(get_db),
+    _user=Depends(require_roles(["ADMIN"]))
+):
+    """
+    Turn hot-SKU mode on (shards > 0) or off for a product. Best done ahead of
+    a launch: sales of a hot product lock one shard row instead of the product.
+    """
+    product = db.query(Product).filter(Product.id == product_id).with_for_update().first()
+    if not product:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
+
+    previous = events.snapshot(product)
+    shards.configure(db, product, payload.shards)
+    db.commit()
+    db.refresh(product)
+    events.inventory_changed([(previous, events.snapshot(product))])
+    return _stock_shards(db, product)
+
+
 @router.delete("/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_product(
     product_id: int,
     db: Session = Depends(get_db),
     _user=Depends(require_roles(["ADMIN"]))
 ):
-    product = db.query(Product).filter(Product.id == product_id).first()
+    # The ORM cascades the delete to these collections, so load them up front.
+    product = (
+        db.query(Product)
+        .options(
+            selectinload(Product.shopping_cart_items),
+            selectinload(Product.order_items),
+            selectinload(Product.attributes),
+        )
+        .filter(Product.id == product_id)
+        .first()
+    )
     if not product:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
 
+    previous = events.snapshot(product)
+    # The order items go with the product, so the orders that held them change
+    # too; bump them so order change feeds and ETags pick that up.
+    order_ids = sorted({item.order_id for item in product.order_items})
+    if order_ids:
+        db.execute(
+            update(Order)
+            .where(Order.id.in_(order_ids))
+            .values(updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
     db.delete(product)
+    record_deletion(db, "product", product_id)
     db.commit()
+    events.product_deleted(previous)
     return None
 
 
 @router.post("/{product_id}/image", response_model=ProductResponse)
 def upload_product_image(
     product_id: int,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
     _user=Depends(require_roles(["ADMIN"]))
@@ -205,10 +577,12 @@ def upload_product_image(
     if not product:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
 
-    _validate_image(file)
-    image_url = _save_image(file)
+    image_url = store_upload(file, "products", image_extension(file)).url
 
     product.image_url = image_url
+    product.image_variants = None
     db.commit()
     db.refresh(product)
+    events.product_saved(product)
+    background_tasks.add_task(process_product_image, product.id, image_url)
     return to_product_response(product)
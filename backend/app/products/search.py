@@ -0,0 +1,207 @@
+"""
+In-process full-text index over the product catalog.
+
+The index lives in worker memory: it is built from the products table on the
+first search and then kept current by app.products.events after every product
+write commits. Ranking is BM25 over weighted fields; query terms that are not
+in the vocabulary (typos, partial words) are expanded to similar indexed terms
+through a character trigram index.
+"""
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models import Product
+from app.products.specs import flatten_specifications
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Field weights are applied to term frequencies (a BM25F-style shortcut).
+FIELD_WEIGHTS = {
+    "name": 3,
+    "brand": 2,
+    "model": 2,
+    "category": 1,
+    "description": 1,
+    "specifications": 1,
+}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Minimum trigram similarity for a vocabulary term to stand in for a query term.
+FUZZY_MIN_SIMILARITY = 0.3
+FUZZY_MAX_EXPANSIONS = 5
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+    return TOKEN_RE.findall(str(text).lower())
+
+
+def trigrams(term: str) -> Set[str]:
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _product_terms(product) -> Counter:
+    fields = {
+        "name": product.name,
+        "brand": product.brand,
+        "model": product.model,
+        "category": product.category,
+        "description": product.description,
+        "specifications": " ".join(
+            f"{key} {value}" for key, value in flatten_specifications(product.specifications)
+        ),
+    }
+    terms: Counter = Counter()
+    for field, text in fields.items():
+        weight = FIELD_WEIGHTS[field]
+        for token in tokenize(text):
+            terms[token] += weight
+    return terms
+
+
+class SearchIndex:
+    """Inverted index with BM25 scoring; safe to share between threadpool workers."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built = False
+        self._postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self._doc_terms: Dict[int, Counter] = {}
+        self._doc_len: Dict[int, int] = {}
+        self._total_len = 0
+        self._trigrams: Dict[str, Set[str]] = defaultdict(set)
+
+    def ensure_built(self, db: Session) -> None:
+        if self._built:
+            return
+        with self._lock:
+            if self._built:
+                return
+            rows = (
+                db.query(
+                    Product.id,
+                    Product.name,
+                    Product.brand,
+                    Product.model,
+                    Product.category,
+                    Product.description,
+                    Product.specifications,
+                )
+                .filter(Product.is_active == True)
+                .yield_per(1000)
+            )
+            for row in rows:
+                self._add_locked(row.id, _product_terms(row))
+            self._built = True
+
+    def reset(self) -> None:
+        """Drop everything; the next search rebuilds from the database."""
+        with self._lock:
+            self._built = False
+            self._postings.clear()
+            self._doc_terms.clear()
+            self._doc_len.clear()
+            self._total_len = 0
+            self._trigrams.clear()
+
+    def add(self, product: Product) -> None:
+        """Index (or re-index) a committed product; inactive products are dropped."""
+        with self._lock:
+            if not self._built:
+                return
+            self._remove_locked(product.id)
+            if product.is_active:
+                self._add_locked(product.id, _product_terms(product))
+
+    def remove(self, product_id: int) -> None:
+        with self._lock:
+            if self._built:
+                self._remove_locked(product_id)
+
+    def _add_locked(self, doc_id: int, terms: Counter) -> None:
+        if not terms:
+            return
+        self._doc_terms[doc_id] = terms
+        length = sum(terms.values())
+        self._doc_len[doc_id] = length
+        self._total_len += length
+        for term, tf in terms.items():
+            if term not in self._postings:
+                for gram in trigrams(term):
+                    self._trigrams[gram].add(term)
+            self._postings[term][doc_id] = tf
+
+    def _remove_locked(self, doc_id: int) -> None:
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        self._total_len -= self._doc_len.pop(doc_id)
+        for term in terms:
+            postings = self._postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+                for gram in trigrams(term):
+                    bucket = self._trigrams.get(gram)
+                    if bucket is not None:
+                        bucket.discard(term)
+                        if not bucket:
+                            del self._trigrams[gram]
+
+    def _expand(self, term: str) -> List[Tuple[str, float]]:
+        """Return (indexed term, weight) pairs that a query term should match."""
+        if term in self._postings:
+            return [(term, 1.0)]
+
+        query_grams = trigrams(term)
+        overlap: Counter = Counter()
+        for gram in query_grams:
+            for candidate in self._trigrams.get(gram, ()):
+                overlap[candidate] += 1
+
+        expansions = []
+        for candidate, shared in overlap.items():
+            similarity = shared / (len(query_grams) + len(trigrams(candidate)) - shared)
+            if candidate.startswith(term):
+                similarity = max(similarity, 0.8)
+            if similarity >= FUZZY_MIN_SIMILARITY:
+                expansions.append((candidate, similarity))
+        expansions.sort(key=lambda pair: pair[1], reverse=True)
+        return expansions[:FUZZY_MAX_EXPANSIONS]
+
+    def search(self, query: str, limit: int) -> List[Tuple[int, float]]:
+        """Return up to limit (product_id, score) pairs, best first."""
+        query_terms = tokenize(query)
+        if not query_terms:
+            return []
+
+        with self._lock:
+            doc_count = len(self._doc_len)
+            if not doc_count:
+                return []
+            avg_len = self._total_len / doc_count
+
+            scores: Dict[int, float] = defaultdict(float)
+            for query_term in query_terms:
+                for term, weight in self._expand(query_term):
+                    postings = self._postings[term]
+                    df = len(postings)
+                    idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+                    for doc_id, tf in postings.items():
+                        norm = BM25_K1 * (1 - BM25_B + BM25_B * self._doc_len[doc_id] / avg_len)
+                        scores[doc_id] += weight * idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda pair: (-pair[1], pair[0]))
+        return ranked[:limit]
+
+
+search_index = SearchIndex()
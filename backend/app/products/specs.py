@@ -0,0 +1,155 @@
+import re
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import or_, select
+
+from app.models import Product, ProductAttribute
+
+# A number with an optional unit suffix: "16", "16GB", "3.5 GHz", "-10dB".
+NUMERIC_VALUE_RE = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*[^\d\s]*\s*$")
+
+KEY_MAX_LENGTH = 100
+VALUE_MAX_LENGTH = 255
+
+SPEC_PARAM_PREFIX = "spec."
+MAX_SPEC_FILTERS = 10
+
+
+def flatten_specifications(specs: Optional[Dict[str, Any]], prefix: str = "") -> Iterator[Tuple[str, Any]]:
+    """
+    Yield (key, value) leaves of a specifications document.
+
+    Nested objects are joined with dots ({"memory": {"size": 16}} becomes
+    "memory.size") and lists yield one pair per element under the same key.
+    """
+    if not isinstance(specs, dict):
+        return
+    for key, value in specs.items():
+        full_key = f"{prefix}{key}"
+        if isinstance(value, dict):
+            yield from flatten_specifications(value, f"{full_key}.")
+        elif isinstance(value, (list, tuple)):
+            for element in value:
+                if isinstance(element, dict):
+                    yield from flatten_specifications(element, f"{full_key}.")
+                elif element is not None:
+                    yield full_key, element
+        elif value is not None:
+            yield full_key, value
+
+
+def normalize_key(key: str) -> str:
+    return key.strip().lower()[:KEY_MAX_LENGTH]
+
+
+def normalize_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value).strip().lower()[:VALUE_MAX_LENGTH]
+
+
+def parse_number(value: Any) -> Optional[float]:
+    """Numeric part of a spec value, or None when it is not number-like."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = NUMERIC_VALUE_RE.match(str(value))
+    return float(match.group(1)) if match else None
+
+
+def attribute_values(specs: Optional[Dict[str, Any]]) -> List[Tuple[str, str, Optional[float]]]:
+    """Deduplicated (key, value_str, value_num) triples for a specifications document."""
+    seen = set()
+    values = []
+    for key, value in flatten_specifications(specs):
+        row = (normalize_key(key), normalize_value(value))
+        if row in seen:
+            continue
+        seen.add(row)
+        values.append((row[0], row[1], parse_number(value)))
+    return values
+
+
+def build_attributes(specs: Optional[Dict[str, Any]]) -> List[ProductAttribute]:
+    """ProductAttribute rows (not yet attached to a product) for a specifications document."""
+    return [
+        ProductAttribute(key=key, value_str=value_str, value_num=value_num)
+        for key, value_str, value_num in attribute_values(specs)
+    ]
+
+
+class SpecFilter(NamedTuple):
+    key: str
+    op: str  # "eq", "min" or "max"
+    values: Tuple[Any, ...]
+
+
+def parse_spec_filters(query_params) -> Tuple[SpecFilter, ...]:
+    """
+    Collect spec.<key>=value, spec.<key>.min=n and spec.<key>.max=n parameters.
+
+    Repeating spec.<key>=... matches any of the given values. A bare number
+    compares numerically (so spec.vram=16 matches "16GB"); anything else is a
+    case-insensitive exact match on the text value.
+    """
+    grouped: Dict[Tuple[str, str], List[str]] = {}
+    for name, value in query_params.multi_items():
+        if not name.startswith(SPEC_PARAM_PREFIX):
+            continue
+        key, op = name[len(SPEC_PARAM_PREFIX):], "eq"
+        for suffix in ("min", "max"):
+            if key.endswith(f".{suffix}"):
+                key, op = key[: -len(suffix) - 1], suffix
+        key = normalize_key(key)
+        if not key:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid filter: {name}")
+        grouped.setdefault((key, op), []).append(value)
+
+    if len(grouped) > MAX_SPEC_FILTERS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_SPEC_FILTERS} spec filters are allowed",
+        )
+
+    filters = []
+    for (key, op), values in sorted(grouped.items()):
+        if op == "eq":
+            parsed = tuple(sorted(set(_eq_value(v) for v in values), key=repr))
+        else:
+            number = parse_number(values[-1])
+            if number is None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"spec.{key}.{op} must be a number",
+                )
+            parsed = (number,)
+        filters.append(SpecFilter(key=key, op=op, values=parsed))
+    return tuple(filters)
+
+
+def _eq_value(value: str):
+    try:
+        return float(value)
+    except ValueError:
+        return normalize_value(value)
+
+
+def spec_filter_clause(spec_filter: SpecFilter):
+    """Product.id IN (...) predicate served by the (key, value, product_id) indexes."""
+    condition = [ProductAttribute.key == spec_filter.key]
+    if spec_filter.op == "min":
+        condition.append(ProductAttribute.value_num >= spec_filter.values[0])
+    elif spec_filter.op == "max":
+        condition.append(ProductAttribute.value_num <= spec_filter.values[0])
+    else:
+        numbers = [v for v in spec_filter.values if isinstance(v, float)]
+        texts = [v for v in spec_filter.values if not isinstance(v, float)]
+        alternatives = []
+        if numbers:
+            alternatives.append(ProductAttribute.value_num.in_(numbers))
+        if texts:
+            alternatives.append(ProductAttribute.value_str.in_(texts))
+        condition.append(or_(*alternatives))
+    return Product.id.in_(select(ProductAttribute.product_id).where(*condition))
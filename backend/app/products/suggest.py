@@ -0,0 +1,216 @@
+"""
+In-process prefix index for search-as-you-type suggestions.
+
+Every word of a product name, brand and category is stored as a
+(word, kind, ident) key in a sorted list, so the completions of a prefix are
+a contiguous slice found with bisect. Brands and categories are suggested once
+with the number of active products carrying them.
+
+Brand and category words live in their own small list, which is always
+scanned in full, so they are never crowded out by product words. Product
+names are found first through the list of their first words, so names that
+start with the query beat names that merely contain it, then through the list
+of all their words; together those two scans stop after MAX_PRODUCT_MATCHES
+products that pass every query word. Like the other catalog structures the
+index is built on first use and then updated by app.products.events.
+It is per process and only sees writes made through this process, so the
+backend is meant to run as a single process (see README "Deployment").
+"""
+import bisect
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models import Product
+from app.products.search import tokenize
+
+PRODUCT = "product"
+BRAND = "brand"
+CATEGORY = "category"
+
+# Categories and brands narrow the catalog more than a single product does.
+KIND_RANK = {CATEGORY: 0, BRAND: 1, PRODUCT: 2}
+
+# Upper bound on matching products collected per request, which keeps
+# one-letter prefixes cheap on large catalogs.
+MAX_PRODUCT_MATCHES = 2000
+
+EntryKey = Tuple[str, str]
+
+
+class Suggestion(NamedTuple):
+    kind: str
+    text: str
+    product_id: Optional[int]
+    count: int
+
+
+class _Entry:
+    __slots__ = ("kind", "text", "product_id", "count", "words")
+
+    def __init__(self, kind: str, text: str, product_id: Optional[int]):
+        self.kind = kind
+        self.text = text
+        self.product_id = product_id
+        self.count = 0
+        self.words = tokenize(text)
+
+
+def _matches(words: List[str], prefix: str, leading: List[str]) -> bool:
+    return any(w.startswith(prefix) for w in words) and all(
+        any(w.startswith(lead) for w in words) for lead in leading
+    )
+
+
+def _entries_for(product) -> List[Tuple[EntryKey, str, Optional[int]]]:
+    entries = [((PRODUCT, str(product.id)), product.name, product.id)]
+    if product.brand:
+        entries.append(((BRAND, product.brand.lower()), product.brand, None))
+    if product.category:
+        entries.append(((CATEGORY, product.category.lower()), product.category, None))
+    return entries
+
+
+class SuggestIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._built = False
+        self._keys: List[Tuple[str, str, str]] = []  # every word of product names
+        self._lead_keys: List[Tuple[str, str, str]] = []  # first word of product names
+        self._facet_keys: List[Tuple[str, str, str]] = []  # every word of brands and categories
+        self._entries: Dict[EntryKey, _Entry] = {}
+        self._by_product: Dict[int, List[EntryKey]] = {}
+
+    def ensure_built(self, db: Session) -> None:
+        if self._built:
+            return
+        with self._lock:
+            if self._built:
+                return
+            rows = (
+                db.query(Product.id, Product.name, Product.brand, Product.category)
+                .filter(Product.is_active == True)
+                .yield_per(5000)
+            )
+            for row in rows:
+                self._add_locked(row)
+            self._built = True
+
+    def reset(self) -> None:
+        with self._lock:
+            self._built = False
+            self._keys.clear()
+            self._lead_keys.clear()
+            self._facet_keys.clear()
+            self._entries.clear()
+            self._by_product.clear()
+
+    def add(self, product: Product) -> None:
+        """Index (or re-index) a committed product; inactive products are dropped."""
+        with self._lock:
+            if not self._built:
+                return
+            self._remove_locked(product.id)
+            if product.is_active:
+                self._add_locked(product)
+
+    def remove(self, product_id: int) -> None:
+        with self._lock:
+            if self._built:
+                self._remove_locked(product_id)
+
+    def _add_locked(self, product) -> None:
+        keys = []
+        for key, text, product_id in _entries_for(product):
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry(key[0], text, product_id)
+                for index_list, index_key in self._index_keys(key, entry):
+                    bisect.insort(index_list, index_key)
+            entry.count += 1
+            keys.append(key)
+        self._by_product[product.id] = keys
+
+    def _remove_locked(self, product_id: int) -> None:
+        for key in self._by_product.pop(product_id, ()):
+            entry = self._entries[key]
+            entry.count -= 1
+            if entry.count:
+                continue
+            del self._entries[key]
+            for index_list, index_key in self._index_keys(key, entry):
+                index = bisect.bisect_left(index_list, index_key)
+                if index < len(index_list) and index_list[index] == index_key:
+                    del index_list[index]
+
+    def _index_keys(self, key: EntryKey, entry: _Entry) -> List[Tuple[List, Tuple[str, str, str]]]:
+        if key[0] != PRODUCT:
+            return [(self._facet_keys, (word,) + key) for word in set(entry.words)]
+        index_keys = [(self._keys, (word,) + key) for word in set(entry.words)]
+        if entry.words:
+            index_keys.append((self._lead_keys, (entry.words[0],) + key))
+        return index_keys
+
+    def _scan(
+        self,
+        keys: List[Tuple[str, str, str]],
+        start: str,
+        prefix: str,
+        leading: List[str],
+        matches: Dict[EntryKey, _Entry],
+        budget: Optional[int],
+    ) -> int:
+        """
+        Add the entries behind keys whose word starts with start and that match
+        the query; stop after budget new matches (None: no limit).
+        """
+        found = 0
+        for index in range(bisect.bisect_left(keys, (start,)), len(keys)):
+            if budget is not None and found >= budget:
+                break
+            word, kind, ident = keys[index]
+            if not word.startswith(start):
+                break
+            key = (kind, ident)
+            if key in matches:
+                continue
+            entry = self._entries[key]
+            if _matches(entry.words, prefix, leading):
+                matches[key] = entry
+                found += 1
+        return found
+
+    def suggest(self, query: str, limit: int) -> List[Suggestion]:
+        """
+        Entries with a word starting with the last query word and, for
+        multi-word queries, a word starting with each of the earlier ones.
+        """
+        words = tokenize(query)
+        if not words:
+            return []
+        prefix, leading = words[-1], words[:-1]
+        phrase = " ".join(words)
+
+        with self._lock:
+            matches: Dict[EntryKey, _Entry] = {}
+            self._scan(self._facet_keys, prefix, prefix, leading, matches, None)
+            budget = MAX_PRODUCT_MATCHES
+            budget -= self._scan(self._lead_keys, words[0], prefix, leading, matches, budget)
+            self._scan(self._keys, prefix, prefix, leading, matches, budget)
+            hits = [
+                Suggestion(entry.kind, entry.text, entry.product_id, entry.count)
+                for entry in matches.values()
+            ]
+
+        hits.sort(key=lambda s: (
+            not " ".join(tokenize(s.text)).startswith(phrase),
+            KIND_RANK[s.kind],
+            -s.count,
+            len(s.text),
+            s.text.lower(),
+        ))
+        return hits[:limit]
+
+
+suggest_index = SuggestIndex()
@@ -12,7 +12,20 @@ from .product import (
     ProductCreate,
     ProductUpdate,
     ProductStockUpdate,
+    ProductStockShardsUpdate,
+    ProductStockShards,
     ProductResponse,
+    ProductPage,
+    ProductBatchRequest,
+    ProductBatch,
+    ProductChanges,
+    ProductSearchHit,
+    ProductSuggestion,
+    ProductFacets,
+    ProductImportResult,
+    InventoryUpdateItem,
+    InventoryUpdateRequest,
+    InventoryUpdateResult,
 )
 from .cart import (
     CartAddRequest,
@@ -23,10 +36,17 @@ from .order import (
     CheckoutRequest,
     CheckoutItem,
     CheckoutResponse,
+    CheckoutShortfall,
+    CheckoutConflict,
+    CheckoutJobResponse,
 )
 from .order_management import (
     OrderItemResponse,
     OrderResponse,
+    OrderChanges,
+    OrderPage,
+    OrderSummary,
+    OrderSummaryPage,
     OrderStatusUpdateRequest,
     AssignShipperRequest,
 )
@@ -48,15 +68,35 @@ __all__ = [
     "ProductCreate",
     "ProductUpdate",
     "ProductStockUpdate",
+    "ProductStockShardsUpdate",
+    "ProductStockShards",
     "ProductResponse",
+    "ProductPage",
+    "ProductBatchRequest",
+    "ProductBatch",
+    "ProductChanges",
+    "ProductSearchHit",
+    "ProductSuggestion",
+    "ProductFacets",
+    "ProductImportResult",
+    "InventoryUpdateItem",
+    "InventoryUpdateRequest",
+    "InventoryUpdateResult",
     "CartAddRequest",
     "CartUpdateRequest",
     "CartItemResponse",
     "CheckoutRequest",
     "CheckoutItem",
     "CheckoutResponse",
+    "CheckoutShortfall",
+    "CheckoutConflict",
+    "CheckoutJobResponse",
     "OrderItemResponse",
     "OrderResponse",
+    "OrderChanges",
+    "OrderPage",
+    "OrderSummary",
+    "OrderSummaryPage",
     "OrderStatusUpdateRequest",
     "AssignShipperRequest",
     "RoleApplicationCreate",
@@ -1,3 +1,4 @@
+from datetime import datetime
 from pydantic import BaseModel, Field
 from typing import Optional
 
@@ -21,6 +22,7 @@ class CartItemResponse(BaseModel):
     stock_quantity: int
     is_in_stock: bool
     is_low_stock: bool
+    reserved_until: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -1,3 +1,4 @@
+from datetime import datetime
 from pydantic import BaseModel, Field
 from typing import Optional, List
 
@@ -14,6 +15,18 @@ class CheckoutItem(BaseModel):
     price_at_order: float
 
 
+class CheckoutShortfall(BaseModel):
+    product_id: int
+    product_name: str
+    requested: int
+    available: int
+
+
+class CheckoutConflict(BaseModel):
+    detail: str
+    oversold: List[CheckoutShortfall]
+
+
 class CheckoutResponse(BaseModel):
     order_id: int
     total_price: float
@@ -21,3 +34,13 @@ class CheckoutResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class CheckoutJobResponse(BaseModel):
+    id: int
+    status: str
+    order_id: Optional[int] = None
+    result: Optional[CheckoutResponse] = None
+    error: Optional[CheckoutConflict] = None
+    created_at: datetime
+    updated_at: datetime
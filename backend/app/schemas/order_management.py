@@ -30,6 +30,35 @@ class OrderResponse(BaseModel):
         from_attributes = True
 
 
+class OrderPage(BaseModel):
+    items: List[OrderResponse]
+    next_cursor: Optional[str] = None
+
+
+class OrderSummary(BaseModel):
+    id: int
+    user_id: int
+    shipper_id: Optional[int]
+    status: str
+    total_price: float
+    shipping_address: str
+    item_count: int
+    created_at: datetime
+    updated_at: datetime
+
+
+class OrderSummaryPage(BaseModel):
+    items: List[OrderSummary]
+    next_cursor: Optional[str] = None
+
+
+class OrderChanges(BaseModel):
+    items: List[OrderResponse]  # created or updated, oldest change first
+    deleted: List[int]
+    next_token: str
+    has_more: bool
+
+
 class OrderStatusUpdateRequest(BaseModel):
     status: str = Field(..., description="New order status")
 
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional, Dict, Any, List
 
 class ProductBase(BaseModel):
     name: str = Field(..., min_length=2, max_length=200)
@@ -36,10 +36,122 @@ class ProductUpdate(BaseModel):
 class ProductStockUpdate(BaseModel):
     stock_quantity: int = Field(..., ge=0)
 
+class ProductStockShardsUpdate(BaseModel):
+    shards: int = Field(..., ge=0, le=64, description="Counter rows to split stock over; 0 turns hot-SKU mode off")
+
+class ProductStockShards(BaseModel):
+    product_id: int
+    shards: int
+    stock_quantity: int
+    reserved_quantity: int
+    shard_stock: List[int]
+
 class ProductResponse(ProductBase):
     id: int
+    image_variants: Optional[Dict[str, str]] = None
+    available_quantity: int  # stock_quantity minus the units held in carts
     is_in_stock: bool
     is_low_stock: bool
 
     class Config:
         from_attributes = True
+
+
+class ProductPage(BaseModel):
+    items: List[ProductResponse]
+    next_cursor: Optional[str] = None
+
+
+class ProductBatchRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=1000)
+
+
+class ProductBatch(BaseModel):
+    # Aligned with the requested ids; null where the id does not exist.
+    items: List[Optional[ProductResponse]]
+    missing: List[int]
+
+
+class ProductChanges(BaseModel):
+    items: List[ProductResponse]  # created or updated, oldest change first
+    deleted: List[int]
+    next_token: str
+    has_more: bool
+
+
+class ProductSearchHit(ProductResponse):
+    score: float
+
+
+class ProductSuggestion(BaseModel):
+    kind: str  # "category", "brand" or "product"
+    text: str
+    product_id: Optional[int] = None
+    count: int
+
+
+class PriceBucketFacet(BaseModel):
+    min_price: float = Field(..., description="Inclusive lower bound")
+    max_price: Optional[float] = Field(None, description="Exclusive upper bound; null for the last bucket")
+    count: int
+
+
+class AvailabilityFacet(BaseModel):
+    in_stock: int
+    low_stock: int
+    out_of_stock: int
+
+
+class ProductFacets(BaseModel):
+    total: int
+    categories: Dict[str, int]
+    brands: Dict[str, int]
+    price_buckets: List[PriceBucketFacet]
+    availability: AvailabilityFacet
+
+
+class ProductImportError(BaseModel):
+    row: int
+    sku: Optional[str] = None
+    message: str
+
+
+class ProductImportResult(BaseModel):
+    processed: int
+    upserted: int
+    failed: int
+    errors: List[ProductImportError]
+
+
+class InventoryUpdateItem(BaseModel):
+    id: Optional[int] = None
+    sku: Optional[str] = None
+    stock_quantity: Optional[int] = Field(None, ge=0, description="Absolute stock level")
+    stock_delta: Optional[int] = Field(None, description="Relative stock change")
+    price: Optional[float] = Field(None, gt=0)
+
+    @model_validator(mode="after")
+    def check_reference_and_change(self):
+        if (self.id is None) == (self.sku is None):
+            raise ValueError("Exactly one of id or sku is required")
+        if self.stock_quantity is not None and self.stock_delta is not None:
+            raise ValueError("Use either stock_quantity or stock_delta, not both")
+        if self.stock_quantity is None and self.stock_delta is None and self.price is None:
+            raise ValueError("Nothing to update")
+        return self
+
+
+class InventoryUpdateRequest(BaseModel):
+    items: List[InventoryUpdateItem] = Field(..., min_length=1, max_length=50000)
+
+
+class InventoryRejection(BaseModel):
+    ref: str
+    reason: str
+
+
+class InventoryUpdateResult(BaseModel):
+    requested: int
+    updated: int
+    not_found: List[str]
+    rejected: List[InventoryRejection]
@@ -0,0 +1,35 @@
+"""
+Fast JSON encoding for trusted ORM-to-schema conversions.
+
+The to_*_response helpers build response models straight from database rows
+with model_construct (no validation). Hot list routes then return them via
+json_response, which encodes with pydantic-core's serializer directly to
+bytes. Returning a Response makes FastAPI skip its second validation pass
+against response_model, while the response_model declared on the route still
+drives the OpenAPI schema.
+"""
+from functools import lru_cache
+from typing import Any, Mapping, Optional
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def _adapter(model_type: Any) -> TypeAdapter:
+    return TypeAdapter(model_type)
+
+
+def json_response(
+    model_type: Any,
+    content: Any,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None,
+) -> Response:
+    """Encode content (an instance of model_type) without re-validating it."""
+    return Response(
+        content=_adapter(model_type).dump_json(content),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
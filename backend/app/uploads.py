@@ -0,0 +1,143 @@
+"""
+Shared storage path for uploaded files (product images, avatars).
+
+Uploads are copied in fixed-size chunks into a temporary file next to their
+final location while the size limit is enforced and a SHA-256 digest is
+computed, then atomically renamed into place. Nothing holds the whole file in
+memory, and a partially written file is never visible under its final name.
+
+Files are content-addressed (uploads/<subdir>/<sha[:2]>/<sha>.<ext>), so
+identical uploads share one file and a URL always refers to the same bytes.
+UploadFiles serves them with immutable caching headers.
+"""
+import hashlib
+import os
+import re
+import tempfile
+from typing import NamedTuple
+
+from fastapi import HTTPException, UploadFile, status
+from fastapi.staticfiles import StaticFiles
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.types import Scope
+
+from app.config import settings
+
+UPLOAD_ROOT = "uploads"
+CHUNK_SIZE = 64 * 1024
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# <sha256>.<ext> originals and <sha256>_<variant>.<ext> derived renditions.
+CONTENT_ADDRESSED_RE = re.compile(r"^([0-9a-f]{64}(?:_[a-z]+)?)\.[a-z0-9]+$")
+
+
+class StoredUpload(NamedTuple):
+    path: str
+    url: str
+    size: int
+    sha256: str
+
+
+def image_extension(file: UploadFile) -> str:
+    """Validate the filename of an image upload and return its lower-cased extension."""
+    if not file.filename:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No file provided")
+
+    ext = os.path.splitext(file.filename)[1].lstrip(".").lower()
+    if ext not in settings.ALLOWED_IMAGE_EXTENSIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid image type. Allowed: {', '.join(settings.ALLOWED_IMAGE_EXTENSIONS)}",
+        )
+    return ext
+
+
+def store_upload(file: UploadFile, subdir: str, ext: str) -> StoredUpload:
+    """
+    Stream an upload into uploads/<subdir>/ under its content hash and return
+    where it ended up. Re-uploading identical bytes reuses the existing file.
+
+    Blocking; call it from a sync route (which runs in the threadpool) or use
+    store_upload_async from async code.
+    """
+    upload_dir = os.path.join(UPLOAD_ROOT, subdir)
+    os.makedirs(upload_dir, exist_ok=True)
+
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=upload_dir, prefix=".upload-", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out_file:
+            file.file.seek(0)
+            while True:
+                chunk = file.file.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > settings.MAX_UPLOAD_SIZE:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"File too large. Max size: {settings.MAX_UPLOAD_SIZE} bytes",
+                    )
+                digest.update(chunk)
+                out_file.write(chunk)
+
+        sha256 = digest.hexdigest()
+        relative_path = f"{subdir}/{sha256[:2]}/{sha256}.{ext}"
+        file_path = os.path.join(UPLOAD_ROOT, *relative_path.split("/"))
+        if os.path.exists(file_path):
+            os.unlink(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+    return StoredUpload(
+        path=file_path,
+        url=f"/{UPLOAD_ROOT}/{relative_path}",
+        size=size,
+        sha256=sha256,
+    )
+
+
+async def store_upload_async(file: UploadFile, subdir: str, ext: str) -> StoredUpload:
+    """store_upload for async routes; the copy runs in the threadpool, off the event loop."""
+    return await run_in_threadpool(store_upload, file, subdir, ext)
+
+
+class UploadFiles(StaticFiles):
+    """
+    StaticFiles for the uploads directory.
+
+    Every stored upload is write-once, so responses are marked immutable and
+    may be cached by browsers and proxies for a year. Content-addressed files
+    use their SHA-256 as a strong ETag.
+    """
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        headers = {"cache-control": IMMUTABLE_CACHE_CONTROL}
+        match = CONTENT_ADDRESSED_RE.match(os.path.basename(str(full_path)))
+        if match:
+            headers["etag"] = f'"{match.group(1)}"'
+
+        response = FileResponse(
+            full_path, status_code=status_code, headers=headers, stat_result=stat_result, method=scope["method"]
+        )
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return Response(status_code=304, headers={
+                name: value
+                for name, value in response.headers.items()
+                if name in {"cache-control", "etag", "last-modified", "expires", "vary"}
+            })
+        return response
@@ -1,15 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
-import os
-import uuid
 
 from app.database import get_db
 from app.models import User, Role, RoleApplication, RoleApplicationStatus
-from app.middleware import get_current_user, get_current_user_roles
+from app.middleware import get_current_user, get_current_user_roles, users_with_roles
 from app.schemas import UserResponse, UserUpdate, PasswordChangeRequest, RoleApplicationCreate, RoleApplicationResponse
 from app.auth import verify_password, hash_password
-from app.config import settings
+from app.uploads import image_extension, store_upload_async
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -52,7 +50,7 @@ async def update_my_profile(
         setattr(user, key, value)
     
     db.commit()
-    db.refresh(user)
+    user = users_with_roles(db).filter(User.id == user.id).populate_existing().one()
     return _to_user_response(user)
 
 @router.put("/me/password")
@@ -77,27 +75,10 @@ async def upload_avatar(
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
-    if not file.filename:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No file provided")
-    
-    ext = os.path.splitext(file.filename)[1].lstrip(".").lower()
-    if ext not in settings.ALLOWED_IMAGE_EXTENSIONS:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid image type. Allowed: {', '.join(settings.ALLOWED_IMAGE_EXTENSIONS)}",
-        )
-
-    filename = f"avatar_{user.id}_{uuid.uuid4().hex}.{ext}"
-    upload_dir = os.path.join("uploads", "avatars")
-    os.makedirs(upload_dir, exist_ok=True)
-    file_path = os.path.join(upload_dir, filename)
-
-    with open(file_path, "wb") as out_file:
-        out_file.write(file.file.read())
-
-    user.avatar_url = f"/uploads/avatars/{filename}"
+    stored = await store_upload_async(file, "avatars", image_extension(file))
+    user.avatar_url = stored.url
     db.commit()
-    db.refresh(user)
+    user = users_with_roles(db).filter(User.id == user.id).populate_existing().one()
     return _to_user_response(user)
 
 @router.post("/apply-role", response_model=RoleApplicationResponse)
@@ -148,7 +129,12 @@ async def get_my_applications(
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
-    apps = db.query(RoleApplication).filter(RoleApplication.user_id == user.id).all()
+    apps = (
+        db.query(RoleApplication)
+        .options(joinedload(RoleApplication.role))
+        .filter(RoleApplication.user_id == user.id)
+        .all()
+    )
     return [
         RoleApplicationResponse(
             id=a.id,
@@ -0,0 +1,132 @@
+"""
+Shared fixtures: the app on a throwaway SQLite database.
+
+DATABASE_URL has to be set before anything imports app.database. Every test
+gets freshly created tables; the TestClient is not used as a context manager,
+so the background workers started by the lifespan stay off and tests drive
+them explicitly.
+"""
+import os
+import tempfile
+
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db")
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.auth.jwt import create_access_token
+from app.database import SessionLocal, engine
+from app.main import app
+from app.models import Base, Product, Role, ShoppingCart, User, UserRole
+from app.products import events
+
+
+@pytest.fixture(autouse=True)
+def tables():
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    events.catalog_reloaded()
+    db = SessionLocal()
+    db.add_all(Role(name=name) for name in ("USER", "ADMIN", "SHIPPER"))
+    db.commit()
+    db.close()
+    yield
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture
+def make_user(db):
+    def _make_user(username: str, role: str = "USER") -> User:
+        user = User(username=username, email=f"{username}@example.com", password_hash="x", is_active=True)
+        db.add(user)
+        db.flush()
+        role_id = db.query(Role.id).filter(Role.name == role).scalar()
+        db.add(UserRole(user_id=user.id, role_id=role_id))
+        db.commit()
+        return user
+
+    return _make_user
+
+
+@pytest.fixture
+def admin(make_user):
+    return make_user("admin", role="ADMIN")
+
+
+@pytest.fixture
+def customer(make_user):
+    return make_user("alice")
+
+
+@pytest.fixture
+def other_customer(make_user):
+    return make_user("bob")
+
+
+@pytest.fixture
+def auth_headers(db):
+    def _auth_headers(user: User) -> dict:
+        roles = [
+            name
+            for (name,) in db.query(Role.name).join(UserRole, UserRole.role_id == Role.id)
+            .filter(UserRole.user_id == user.id)
+            .all()
+        ]
+        return {"Authorization": "Bearer " + create_access_token(user.id, user.username, roles)}
+
+    return _auth_headers
+
+
+@pytest.fixture
+def make_product(db):
+    count = 0
+
+    def _make_product(stock_quantity: int = 10, price: float = 100.0, **fields) -> Product:
+        nonlocal count
+        count += 1
+        fields = {"name": f"Product {count}", "category": "CPU", "sku": f"SKU-{count}", **fields}
+        product = Product(price=price, stock_quantity=stock_quantity, **fields)
+        db.add(product)
+        db.commit()
+        return product
+
+    return _make_product
+
+
+@pytest.fixture
+def put_in_cart(db):
+    """Add a cart line directly, without taking a hold."""
+
+    def _put_in_cart(user: User, product: Product, quantity: int) -> ShoppingCart:
+        item = ShoppingCart(user_id=user.id, product_id=product.id, quantity=quantity)
+        db.add(item)
+        db.commit()
+        return item
+
+    return _put_in_cart
+
+
+@pytest.fixture
+def stock_of(db):
+    """(stock_quantity, reserved_quantity) of a product as committed."""
+
+    def _stock_of(product: Product) -> tuple:
+        db.expire_all()
+        return tuple(
+            db.query(Product.stock_quantity, Product.reserved_quantity).filter(Product.id == product.id).one()
+        )
+
+    return _stock_of
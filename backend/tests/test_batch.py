@@ -0,0 +1,37 @@
+from app.products import routes
+from app.products.cache import catalog_cache
+
+
+def names(body):
+    return [item and item["name"] for item in body["items"]]
+
+
+def test_items_follow_request_order_with_missing_markers(client, make_product):
+    first, second = make_product(name="First"), make_product(name="Second")
+
+    response = client.get("/products/batch", params={"ids": [f"{second.id},999", f"{first.id},999"]})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert names(body) == ["Second", None, "First", None]
+    assert body["missing"] == [999]
+
+
+def test_post_mixes_cached_and_loaded_products(client, make_product):
+    cached, loaded = make_product(name="Cached"), make_product(name="Loaded")
+    client.get(f"/products/{cached.id}")
+    assert catalog_cache.get_product(cached.id) is not None
+
+    response = client.post("/products/batch", json={"ids": [loaded.id, cached.id, loaded.id, 998]})
+
+    assert names(response.json()) == ["Loaded", "Cached", "Loaded", None]
+    assert response.json()["missing"] == [998]
+    assert catalog_cache.get_product(loaded.id) is not None
+
+
+def test_invalid_id_lists_are_rejected(client, monkeypatch):
+    assert client.get("/products/batch").status_code == 400
+    assert client.get("/products/batch", params={"ids": "1,x"}).status_code == 400
+    assert client.post("/products/batch", json={"ids": []}).status_code == 422
+    monkeypatch.setattr(routes, "BATCH_MAX_IDS", 2)
+    assert client.get("/products/batch", params={"ids": "1,2,3"}).status_code == 400
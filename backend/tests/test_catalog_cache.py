@@ -0,0 +1,58 @@
+from app.products.cache import catalog_cache, list_filters
+
+
+def cached_pages(category):
+    return catalog_cache.get_list(list_filters(category, None, None, None, True), None, 50)
+
+
+def test_product_writes_replace_the_cached_detail(client, db, admin, auth_headers, make_product):
+    product = make_product(stock_quantity=10, price=100.0)
+    url = f"/products/{product.id}"
+    assert client.get(url).json()["price"] == 100.0
+    assert catalog_cache.get_product(product.id) is not None
+
+    client.put(url, json={"price": 80.0}, headers=auth_headers(admin))
+    assert catalog_cache.get_product(product.id) is None
+    assert client.get(url).json()["price"] == 80.0
+
+    client.put(f"{url}/stock", json={"stock_quantity": 3}, headers=auth_headers(admin))
+    body = client.get(url).json()
+    assert (body["stock_quantity"], body["is_in_stock"], body["is_low_stock"]) == (3, False, True)
+
+
+def test_stock_writes_drop_only_the_pages_they_can_affect(client, admin, auth_headers, make_product):
+    cpu = make_product(category="CPU")
+    make_product(category="GPU")
+    client.get("/products/", params={"category": "CPU"})
+    client.get("/products/", params={"category": "GPU"})
+    assert cached_pages("CPU") is not None and cached_pages("GPU") is not None
+
+    client.post(
+        "/products/inventory",
+        json={"items": [{"id": cpu.id, "stock_delta": -4}]},
+        headers=auth_headers(admin),
+    )
+
+    assert cached_pages("CPU") is None
+    assert cached_pages("GPU") is not None
+    [item] = client.get("/products/", params={"category": "CPU"}).json()["items"]
+    assert item["stock_quantity"] == 6
+
+
+def test_moving_a_product_drops_the_pages_it_left(client, admin, auth_headers, make_product):
+    product = make_product(category="CPU")
+    assert len(client.get("/products/", params={"category": "CPU"}).json()["items"]) == 1
+
+    client.put(f"/products/{product.id}", json={"category": "GPU"}, headers=auth_headers(admin))
+
+    assert client.get("/products/", params={"category": "CPU"}).json()["items"] == []
+    assert len(client.get("/products/", params={"category": "GPU"}).json()["items"]) == 1
+
+
+def test_deletes_drop_the_cached_detail(client, admin, auth_headers, make_product):
+    product = make_product()
+    assert client.get(f"/products/{product.id}").status_code == 200
+
+    client.delete(f"/products/{product.id}", headers=auth_headers(admin))
+
+    assert client.get(f"/products/{product.id}").status_code == 404
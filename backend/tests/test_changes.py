@@ -0,0 +1,82 @@
+import pytest
+
+from app.config import settings
+
+CHECKOUT = {"shipping_address": "1 Main Street"}
+
+
+@pytest.fixture(autouse=True)
+def settled(monkeypatch):
+    monkeypatch.setattr(settings, "CHANGE_FEED_SETTLE_SECONDS", 0)
+
+
+def read(client, url, since=None, limit=50, headers=None):
+    params = {"limit": limit} if since is None else {"limit": limit, "since": since}
+    response = client.get(url, params=params, headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_token_resumes_after_the_last_change(client, auth_headers, admin, make_product):
+    products = [make_product() for _ in range(3)]
+
+    first = read(client, "/products/changes", limit=2)
+    rest = read(client, "/products/changes", since=first["next_token"], limit=2)
+    caught_up = read(client, "/products/changes", since=rest["next_token"])
+
+    assert [p["id"] for p in first["items"]] == [products[0].id, products[1].id]
+    assert first["has_more"]
+    assert [p["id"] for p in rest["items"]] == [products[2].id]
+    assert not rest["has_more"]
+    assert caught_up["items"] == [] and caught_up["deleted"] == []
+
+    response = client.put(f"/products/{products[0].id}", json={"price": 90.0}, headers=auth_headers(admin))
+    assert response.status_code == 200
+    updated = read(client, "/products/changes", since=caught_up["next_token"])
+    assert [(p["id"], p["price"]) for p in updated["items"]] == [(products[0].id, 90.0)]
+
+
+def test_deletes_arrive_as_tombstones(client, auth_headers, admin, make_product):
+    kept, dropped = make_product(), make_product()
+    token = read(client, "/products/changes")["next_token"]
+
+    assert client.delete(f"/products/{dropped.id}", headers=auth_headers(admin)).status_code == 204
+    changes = read(client, "/products/changes", since=token)
+
+    assert changes["items"] == []
+    assert changes["deleted"] == [dropped.id]
+    assert read(client, "/products/changes", since=changes["next_token"])["deleted"] == []
+    assert [p["id"] for p in read(client, "/products/changes")["items"]] == [kept.id]
+
+
+def test_unsettled_changes_are_held_back(client, make_product, monkeypatch):
+    monkeypatch.setattr(settings, "CHANGE_FEED_SETTLE_SECONDS", 60)
+    make_product()
+
+    changes = read(client, "/products/changes")
+
+    assert changes["items"] == []
+    assert not changes["has_more"]
+
+
+def test_invalid_token_is_rejected(client):
+    response = client.get("/products/changes", params={"since": "not-a-token"})
+    assert response.status_code == 400
+
+
+def test_deleting_a_product_updates_the_orders_that_held_it(
+    client, auth_headers, admin, customer, make_product, put_in_cart
+):
+    kept, dropped = make_product(), make_product()
+    put_in_cart(customer, kept, 1)
+    put_in_cart(customer, dropped, 1)
+    headers = auth_headers(customer)
+    order_id = client.post("/cart/checkout", json=CHECKOUT, headers=headers).json()["order_id"]
+    token = read(client, "/orders/my/changes", headers=headers)["next_token"]
+
+    assert client.delete(f"/products/{dropped.id}", headers=auth_headers(admin)).status_code == 204
+    changes = read(client, "/orders/my/changes", since=token, headers=headers)
+
+    [order] = changes["items"]
+    assert order["id"] == order_id
+    assert [item["product_id"] for item in order["items"]] == [kept.id]
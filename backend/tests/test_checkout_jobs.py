@@ -0,0 +1,150 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import idempotency
+from app.cart import jobs
+from app.models import CheckoutJob, Order
+
+CHECKOUT = {"shipping_address": "1 Main Street"}
+
+
+@pytest.fixture(autouse=True)
+def checkout_queue(monkeypatch):
+    """A fresh queue whose workers only run when a test drains it."""
+    fresh = jobs.CheckoutQueue(workers=1, size=10, batch_size=5)
+    monkeypatch.setattr(jobs, "checkout_queue", fresh)
+    return fresh
+
+
+def drain(checkout_queue):
+    checkout_queue.start()
+    checkout_queue.stop()
+
+
+def queue_checkout(client, headers, body=CHECKOUT):
+    response = client.post("/cart/checkout/async", json=body, headers=headers)
+    assert response.status_code == 202
+    assert response.headers["Location"] == f"/cart/checkout/jobs/{response.json()['id']}"
+    return response.json()
+
+
+def test_job_succeeds(client, db, customer, auth_headers, make_product, put_in_cart, stock_of, checkout_queue):
+    product = make_product(stock_quantity=10)
+    put_in_cart(customer, product, 2)
+    headers = auth_headers(customer)
+
+    job = queue_checkout(client, headers)
+    assert job["status"] == "QUEUED"
+    assert client.get(f"/cart/checkout/jobs/{job['id']}", headers=headers).headers["Retry-After"] == "1"
+
+    drain(checkout_queue)
+
+    polled = client.get(f"/cart/checkout/jobs/{job['id']}", headers=headers).json()
+    order = db.query(Order).one()
+    assert polled["status"] == "SUCCEEDED"
+    assert polled["order_id"] == order.id
+    assert polled["result"]["order_id"] == order.id
+    assert stock_of(product) == (8, 0)
+
+
+def test_job_fails_when_stock_is_short(client, db, customer, auth_headers, make_product, put_in_cart, stock_of):
+    product = make_product(stock_quantity=10)
+    put_in_cart(customer, product, 11)
+    headers = auth_headers(customer)
+    job = queue_checkout(client, headers)
+
+    jobs.process(db, job["id"])
+
+    polled = client.get(f"/cart/checkout/jobs/{job['id']}", headers=headers).json()
+    assert polled["status"] == "FAILED"
+    assert polled["order_id"] is None
+    assert polled["error"]["oversold"] == [
+        {"product_id": product.id, "product_name": product.name, "requested": 11, "available": 10}
+    ]
+    assert db.query(Order).count() == 0
+    assert stock_of(product) == (10, 0)
+
+
+def test_enqueue_replays_the_same_key(client, db, customer, auth_headers, make_product, put_in_cart, checkout_queue):
+    product = make_product(stock_quantity=10)
+    put_in_cart(customer, product, 2)
+    headers = {**auth_headers(customer), idempotency.HEADER: "order-1"}
+
+    first = queue_checkout(client, headers)
+    replay = queue_checkout(client, headers)
+    different = client.post("/cart/checkout/async", json={"shipping_address": "2 Side Street"}, headers=headers)
+
+    assert replay["id"] == first["id"]
+    assert different.status_code == 422
+    assert db.query(CheckoutJob).count() == 1
+    assert checkout_queue.queued() == {first["id"]}
+
+
+def test_requeuer_skips_jobs_already_queued(
+    client, db, customer, auth_headers, make_product, put_in_cart, checkout_queue, monkeypatch
+):
+    product = make_product(stock_quantity=10)
+    put_in_cart(customer, product, 2)
+    job = queue_checkout(client, auth_headers(customer))
+    db.query(CheckoutJob).update({"updated_at": datetime.utcnow() - timedelta(hours=1)})
+    db.commit()
+
+    jobs.CheckoutRequeuer(interval=1).run_once()
+    assert checkout_queue.free_slots() == 9
+
+    # Lost from the queue (e.g. a restart): the requeuer offers it again.
+    lost = jobs.CheckoutQueue(workers=1, size=10, batch_size=5)
+    monkeypatch.setattr(jobs, "checkout_queue", lost)
+    db.query(CheckoutJob).update({"updated_at": datetime.utcnow() - timedelta(hours=1)})
+    db.commit()
+    jobs.CheckoutRequeuer(interval=1).run_once()
+    assert lost.queued() == {job["id"]}
+
+    drain(lost)
+    assert lost.queued() == set()
+    db.expire_all()
+    assert db.query(CheckoutJob.status).scalar().value == "SUCCEEDED"
+
+
+def test_keys_are_not_shared_between_endpoints(client, db, customer, auth_headers, make_product, put_in_cart):
+    product = make_product(stock_quantity=10)
+    headers = auth_headers(customer)
+
+    put_in_cart(customer, product, 1)
+    sync_headers = {**headers, idempotency.HEADER: "sync-1"}
+    assert client.post("/cart/checkout", json=CHECKOUT, headers=sync_headers).status_code == 201
+    put_in_cart(customer, product, 1)
+    response = client.post("/cart/checkout/async", json=CHECKOUT, headers=sync_headers)
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Idempotency-Key was already used for a synchronous checkout"
+
+    async_headers = {**headers, idempotency.HEADER: "async-1"}
+    queue_checkout(client, async_headers)
+    response = client.post("/cart/checkout", json=CHECKOUT, headers=async_headers)
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Idempotency-Key was already used for an asynchronous checkout"
+
+    assert db.query(Order).count() == 1
+    assert db.query(CheckoutJob).count() == 1
+
+
+def test_concurrent_keys_meet_on_one_index(
+    client, db, customer, auth_headers, make_product, put_in_cart, checkout_queue, monkeypatch
+):
+    product = make_product(stock_quantity=10)
+    put_in_cart(customer, product, 1)
+    headers = {**auth_headers(customer), idempotency.HEADER: "order-1"}
+
+    def sync_checkout_meanwhile():
+        # Commits after the job path looked the key up, before it inserts.
+        assert client.post("/cart/checkout", json=CHECKOUT, headers=headers).status_code == 201
+        return False
+
+    monkeypatch.setattr(checkout_queue, "full", sync_checkout_meanwhile)
+    response = client.post("/cart/checkout/async", json=CHECKOUT, headers=headers)
+
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Idempotency-Key was already used for a synchronous checkout"
+    assert db.query(Order).count() == 1
+    assert db.query(CheckoutJob).count() == 0
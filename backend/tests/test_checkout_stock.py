@@ -0,0 +1,64 @@
+from app.cart.stock import StockShortfall, decrement_stock
+from app.cart import reservations
+from app.models import Order, ShoppingCart
+
+CHECKOUT = {"shipping_address": "1 Main Street"}
+
+
+def test_competing_checkouts_for_last_units(
+    client, db, customer, other_customer, auth_headers, make_product, put_in_cart, stock_of
+):
+    product = make_product(stock_quantity=10)
+    put_in_cart(customer, product, 6)
+    put_in_cart(other_customer, product, 6)
+
+    first = client.post("/cart/checkout", json=CHECKOUT, headers=auth_headers(customer))
+    second = client.post("/cart/checkout", json=CHECKOUT, headers=auth_headers(other_customer))
+
+    assert first.status_code == 201
+    assert second.status_code == 409
+    assert second.json()["oversold"] == [
+        {"product_id": product.id, "product_name": product.name, "requested": 6, "available": 0}
+    ]
+    assert stock_of(product) == (4, 0)
+    assert db.query(Order).count() == 1
+    assert db.query(ShoppingCart).filter(ShoppingCart.user_id == other_customer.id).count() == 1
+
+
+def test_request_beyond_unreserved_plus_own_hold_is_short(db, customer, other_customer, make_product, stock_of):
+    product = make_product(stock_quantity=12)
+    reservations.hold(db, other_customer.id, product.id, 4)
+    reservations.hold(db, customer.id, product.id, 2)
+    db.commit()
+
+    # 12 in stock, 6 reserved, 2 of them by this buyer: 8 can be sold.
+    assert decrement_stock(db, [(product.id, 9)], held={product.id: 2}) == [
+        StockShortfall(product_id=product.id, requested=9, available=8)
+    ]
+    db.rollback()
+    assert stock_of(product) == (12, 6)
+
+    assert decrement_stock(db, [(product.id, 8)], held={product.id: 2}) == []
+    db.commit()
+    assert stock_of(product) == (4, 4)
+
+
+def test_one_short_line_rolls_back_the_whole_checkout(
+    client, db, customer, auth_headers, make_product, put_in_cart, stock_of
+):
+    cpu = make_product(stock_quantity=10)
+    gpu = make_product(stock_quantity=10)
+    ram = make_product(stock_quantity=7)
+    put_in_cart(customer, cpu, 2)
+    put_in_cart(customer, gpu, 3)
+    put_in_cart(customer, ram, 8)
+
+    response = client.post("/cart/checkout", json=CHECKOUT, headers=auth_headers(customer))
+
+    assert response.status_code == 409
+    assert response.json()["oversold"] == [
+        {"product_id": ram.id, "product_name": ram.name, "requested": 8, "available": 7}
+    ]
+    assert [stock_of(product) for product in (cpu, gpu, ram)] == [(10, 0), (10, 0), (7, 0)]
+    assert db.query(Order).count() == 0
+    assert db.query(ShoppingCart).filter(ShoppingCart.user_id == customer.id).count() == 3
@@ -0,0 +1,56 @@
+def facets(client, **params):
+    response = client.get("/products/facets", params=params)
+    assert response.status_code == 200
+    return response.json()
+
+
+def bucket_counts(body):
+    return [bucket["count"] for bucket in body["price_buckets"]]
+
+
+def test_counts_per_dimension(client, make_product):
+    make_product(category="CPU", brand="AMD", price=99.99, stock_quantity=10)
+    make_product(category="CPU", brand="Intel", price=100.0, stock_quantity=3)
+    make_product(category="GPU", brand="AMD", price=250.0, stock_quantity=0)
+    make_product(category="GPU", brand="Nvidia", price=2500.0, stock_quantity=8)
+    make_product(category="RAM", brand="Kingston", price=60.0, stock_quantity=20, is_active=False)
+
+    body = facets(client, category="CPU")
+
+    assert body["total"] == 2
+    # Each dimension ignores its own filter.
+    assert body["categories"] == {"CPU": 2, "GPU": 2}
+    assert body["brands"] == {"AMD": 1, "Intel": 1}
+    assert bucket_counts(body) == [1, 1, 0, 0, 0, 0]
+    assert body["availability"] == {"in_stock": 1, "low_stock": 1, "out_of_stock": 0}
+
+    body = facets(client, in_stock=True)
+    assert body["total"] == 2
+    assert body["availability"] == {"in_stock": 2, "low_stock": 1, "out_of_stock": 1}
+
+
+def test_price_filter_inside_a_bucket(client, make_product):
+    for price in (101.0, 120.0, 180.0, 240.0, 260.0):
+        make_product(price=price)
+
+    body = facets(client, min_price=110, max_price=240)
+
+    assert body["total"] == 3
+    assert body["categories"] == {"CPU": 3}
+    # The price dimension ignores the price filter.
+    assert bucket_counts(body) == [0, 4, 1, 0, 0, 0]
+
+
+def test_counts_follow_writes(client, admin, auth_headers, make_product):
+    product = make_product(price=120.0, stock_quantity=10)
+    assert facets(client)["availability"]["in_stock"] == 1
+
+    client.put(f"/products/{product.id}/stock", json={"stock_quantity": 2}, headers=auth_headers(admin))
+    client.put(f"/products/{product.id}", json={"price": 300.0}, headers=auth_headers(admin))
+
+    body = facets(client)
+    assert body["availability"] == {"in_stock": 0, "low_stock": 1, "out_of_stock": 0}
+    assert bucket_counts(body) == [0, 0, 1, 0, 0, 0]
+
+    client.delete(f"/products/{product.id}", headers=auth_headers(admin))
+    assert facets(client)["total"] == 0
@@ -0,0 +1,53 @@
+def get(client, url, etag=None):
+    return client.get(url, headers={"If-None-Match": etag} if etag else {})
+
+
+def test_product_etag_and_304(client, admin, auth_headers, make_product):
+    product = make_product(stock_quantity=10, price=100.0)
+    url = f"/products/{product.id}"
+
+    first = get(client, url)
+    etag = first.headers["ETag"]
+    assert first.status_code == 200
+    assert "Last-Modified" in first.headers
+
+    revalidated = get(client, url, etag)
+    assert revalidated.status_code == 304
+    assert revalidated.headers["ETag"] == etag
+    assert get(client, url, f'W/{etag}, "other"').status_code == 304
+
+    # Two writes within the same second must both change the ETag.
+    client.put(f"{url}/stock", json={"stock_quantity": 9}, headers=auth_headers(admin))
+    after_stock = get(client, url, etag)
+    client.put(url, json={"price": 95.0}, headers=auth_headers(admin))
+    after_price = get(client, url, after_stock.headers["ETag"])
+
+    assert after_stock.status_code == 200
+    assert after_stock.json()["stock_quantity"] == 9
+    assert after_price.status_code == 200
+    assert after_price.json()["price"] == 95.0
+
+
+def test_list_etag_follows_writes(client, admin, auth_headers, make_product):
+    product = make_product(stock_quantity=10)
+    first = get(client, "/products/")
+    etag = first.headers["ETag"]
+    assert get(client, "/products/", etag).status_code == 304
+    # The ETag identifies the filtered representation, not just the table.
+    assert get(client, "/products/?category=GPU", etag).status_code == 200
+
+    client.put(f"/products/{product.id}", json={"price": 80.0}, headers=auth_headers(admin))
+
+    changed = get(client, "/products/", etag)
+    assert changed.status_code == 200
+    assert changed.json()["items"][0]["price"] == 80.0
+
+
+def test_if_modified_since(client, make_product):
+    product = make_product()
+    last_modified = get(client, f"/products/{product.id}").headers["Last-Modified"]
+
+    response = client.get(f"/products/{product.id}", headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 304
+    stale = client.get(f"/products/{product.id}", headers={"If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"})
+    assert stale.status_code == 200
@@ -0,0 +1,62 @@
+from app import idempotency
+from app.models import IdempotencyKey, Order, ShoppingCart
+
+CHECKOUT = {"shipping_address": "1 Main Street"}
+
+
+def keyed(headers, key="order-1"):
+    return {**headers, idempotency.HEADER: key}
+
+
+def test_replay_returns_the_stored_response(
+    client, db, customer, auth_headers, make_product, put_in_cart, stock_of
+):
+    product = make_product(stock_quantity=10)
+    put_in_cart(customer, product, 2)
+    headers = keyed(auth_headers(customer))
+
+    first = client.post("/cart/checkout", json=CHECKOUT, headers=headers)
+    # Refill the cart so a second order could be placed if the key were ignored.
+    put_in_cart(customer, product, 2)
+    replay = client.post("/cart/checkout", json=CHECKOUT, headers=headers)
+
+    assert first.status_code == 201
+    assert idempotency.REPLAYED_HEADER not in first.headers
+    assert replay.status_code == 201
+    assert replay.headers[idempotency.REPLAYED_HEADER] == "true"
+    assert replay.json() == first.json()
+    assert db.query(Order).count() == 1
+    assert db.query(ShoppingCart).filter(ShoppingCart.user_id == customer.id).count() == 1
+    assert stock_of(product) == (8, 0)
+
+
+def test_same_key_with_a_different_body_is_rejected(
+    client, db, customer, auth_headers, make_product, put_in_cart
+):
+    product = make_product(stock_quantity=10)
+    put_in_cart(customer, product, 2)
+    headers = keyed(auth_headers(customer))
+    client.post("/cart/checkout", json=CHECKOUT, headers=headers)
+    put_in_cart(customer, product, 2)
+
+    response = client.post("/cart/checkout", json={"shipping_address": "2 Side Street"}, headers=headers)
+
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Idempotency-Key was already used for a different request"
+    assert db.query(Order).count() == 1
+
+
+def test_failed_checkout_does_not_keep_the_key(
+    client, db, customer, auth_headers, make_product, put_in_cart
+):
+    product = make_product(stock_quantity=10)
+    item = put_in_cart(customer, product, 11)
+    headers = keyed(auth_headers(customer))
+
+    assert client.post("/cart/checkout", json=CHECKOUT, headers=headers).status_code == 409
+    assert db.query(IdempotencyKey).count() == 0
+
+    item.quantity = 4
+    db.commit()
+    assert client.post("/cart/checkout", json=CHECKOUT, headers=headers).status_code == 201
+    assert db.query(Order).count() == 1
@@ -0,0 +1,57 @@
+"""
+The upsert itself is MySQL-only (INSERT ... ON DUPLICATE KEY UPDATE), so
+these tests cover the per-row report for rows that never reach a batch.
+"""
+from app.config import settings
+
+
+def import_feed(client, auth_headers, admin, content: bytes, filename: str, **params):
+    response = client.post(
+        "/products/import",
+        files={"file": (filename, content)},
+        params=params,
+        headers=auth_headers(admin),
+    )
+    return response
+
+
+def test_invalid_ndjson_rows_are_reported_by_line(client, admin, auth_headers):
+    feed = b"\n".join([
+        b'{"name": "Ryzen 5", "category": "CPU", "price": -1, "stock_quantity": 3, "sku": "R5"}',
+        b"",
+        b"not json",
+        b"[1, 2]",
+    ])
+
+    response = import_feed(client, auth_headers, admin, feed, "feed.ndjson")
+
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["processed"], report["upserted"], report["failed"]) == (3, 0, 3)
+    assert [(error["row"], error["sku"]) for error in report["errors"]] == [(1, "R5"), (3, None), (4, None)]
+    assert report["errors"][0]["message"].startswith("price: ")
+    assert report["errors"][2]["message"] == "Row is not an object"
+
+
+def test_csv_rows_missing_required_columns_are_reported(client, admin, auth_headers):
+    feed = b"name,category,price,stock_quantity,sku\nRyzen 5,CPU,199,,R5\n"
+
+    report = import_feed(client, auth_headers, admin, feed, "feed.csv").json()
+
+    assert report["failed"] == 1
+    assert report["errors"] == [{"row": 2, "sku": "R5", "message": "stock_quantity: Field required"}]
+
+
+def test_reported_errors_are_capped(client, admin, auth_headers, monkeypatch):
+    monkeypatch.setattr(settings, "IMPORT_MAX_REPORTED_ERRORS", 2)
+    feed = b"\n".join(b"{}" for _ in range(5))
+
+    report = import_feed(client, auth_headers, admin, feed, "feed.jsonl").json()
+
+    assert report["failed"] == 5
+    assert len(report["errors"]) == 2
+
+
+def test_unknown_feed_format_is_rejected(client, admin, auth_headers):
+    assert import_feed(client, auth_headers, admin, b"{}", "feed.txt").status_code == 400
+    assert import_feed(client, auth_headers, admin, b"{}", "feed.txt", format="ndjson").status_code == 200
@@ -0,0 +1,61 @@
+def sync(client, auth_headers, admin, items):
+    response = client.post("/products/inventory", json={"items": items}, headers=auth_headers(admin))
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_report_lists_unknown_references(client, admin, auth_headers, make_product, stock_of):
+    product = make_product(stock_quantity=10, sku="GPU-1")
+
+    report = sync(client, auth_headers, admin, [
+        {"sku": "GPU-1", "stock_quantity": 4},
+        {"sku": "NOPE", "stock_quantity": 4},
+        {"id": 999, "stock_delta": 1},
+    ])
+
+    assert report == {"requested": 3, "updated": 1, "not_found": ["sku:NOPE", "id:999"], "rejected": []}
+    assert stock_of(product) == (4, 0)
+
+
+def test_entries_for_one_product_apply_in_order(client, db, admin, auth_headers, make_product, stock_of):
+    product = make_product(stock_quantity=10, price=100.0, sku="CPU-1")
+
+    report = sync(client, auth_headers, admin, [
+        {"id": product.id, "stock_quantity": 20},
+        {"sku": "CPU-1", "stock_delta": -5},
+        {"id": product.id, "price": 90.0},
+    ])
+
+    assert report["updated"] == 1
+    assert stock_of(product) == (15, 0)
+    db.refresh(product)
+    assert product.price == 90.0
+
+
+def test_delta_below_zero_rejects_only_that_product(client, admin, auth_headers, make_product, stock_of):
+    short, fine = make_product(stock_quantity=2), make_product(stock_quantity=2)
+
+    report = sync(client, auth_headers, admin, [
+        {"id": short.id, "price": 50.0},
+        {"id": short.id, "stock_delta": -3},
+        {"id": fine.id, "stock_delta": -2},
+    ])
+
+    assert report["updated"] == 1
+    assert report["rejected"] == [{"ref": f"id:{short.id}", "reason": "Stock would drop below zero (-1)"}]
+    assert stock_of(short) == (2, 0)
+    assert stock_of(fine) == (0, 0)
+
+
+def test_unchanged_values_are_not_counted(client, admin, auth_headers, make_product):
+    product = make_product(stock_quantity=10, price=100.0)
+
+    report = sync(client, auth_headers, admin, [{"id": product.id, "stock_quantity": 10, "price": 100.0}])
+
+    assert report["updated"] == 0
+
+
+def test_items_need_exactly_one_reference_and_a_change(client, admin, auth_headers):
+    for item in ({"stock_quantity": 1}, {"id": 1, "sku": "A", "stock_quantity": 1}, {"id": 1}):
+        response = client.post("/products/inventory", json={"items": [item]}, headers=auth_headers(admin))
+        assert response.status_code == 422
@@ -0,0 +1,55 @@
+from app.models import Product
+
+CHECKOUT = {"shipping_address": "1 Main Street"}
+
+
+def low_stock(client, **params):
+    response = client.get("/products/low-stock", params=params)
+    assert response.status_code == 200
+    body = response.json()
+    return [(item["name"], item["stock_quantity"]) for item in body["items"]], body["next_cursor"]
+
+
+def test_lowest_stock_first_with_cursor_and_category(client, make_product):
+    make_product(name="Cooler", stock_quantity=5)
+    make_product(name="Fan", stock_quantity=0)
+    make_product(name="Case", stock_quantity=3)
+    make_product(name="Board", stock_quantity=10)
+    make_product(name="Monitor", stock_quantity=2, category="Display")
+
+    first, cursor = low_stock(client, limit=2)
+    rest, last = low_stock(client, limit=2, cursor=cursor)
+
+    assert first == [("Fan", 0), ("Monitor", 2)]
+    assert rest == [("Case", 3), ("Cooler", 5)]
+    assert last is None
+    assert low_stock(client, category="Display") == ([("Monitor", 2)], None)
+
+
+def test_writes_move_products_in_and_out(
+    client, admin, customer, auth_headers, make_product, put_in_cart
+):
+    board = make_product(name="Board", stock_quantity=10)
+    fan = make_product(name="Fan", stock_quantity=1)
+    assert low_stock(client)[0] == [("Fan", 1)]
+
+    put_in_cart(customer, board, 5)
+    assert client.post("/cart/checkout", json=CHECKOUT, headers=auth_headers(customer)).status_code == 201
+    client.put(f"/products/{fan.id}/stock", json={"stock_quantity": 30}, headers=auth_headers(admin))
+
+    assert low_stock(client)[0] == [("Board", 5)]
+
+    client.delete(f"/products/{board.id}", headers=auth_headers(admin))
+    assert low_stock(client)[0] == []
+
+
+def test_stale_entries_are_corrected_from_the_database(client, db, make_product):
+    fan = make_product(name="Fan", stock_quantity=1)
+    make_product(name="Case", stock_quantity=3)
+    assert low_stock(client)[0] == [("Fan", 1), ("Case", 3)]
+
+    # Another process restocks the fan without going through this one's hooks.
+    db.query(Product).filter(Product.id == fan.id).update({"stock_quantity": 8})
+    db.commit()
+
+    assert low_stock(client)[0] == [("Case", 3)]
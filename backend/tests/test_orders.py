@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import Order, OrderItem, OrderStatus
+
+CHECKOUT = {"shipping_address": "1 Main Street"}
+
+
+def checkout(client, headers):
+    response = client.post("/cart/checkout", json=CHECKOUT, headers=headers)
+    assert response.status_code == 201
+    return response.json()
+
+
+def test_cancel_restocks_on_top_of_later_sales(
+    client, customer, other_customer, auth_headers, make_product, put_in_cart, stock_of
+):
+    cpu = make_product(stock_quantity=20)
+    gpu = make_product(stock_quantity=20)
+    put_in_cart(customer, cpu, 2)
+    put_in_cart(customer, gpu, 1)
+    order = checkout(client, auth_headers(customer))
+    put_in_cart(other_customer, cpu, 3)
+    checkout(client, auth_headers(other_customer))
+
+    response = client.put(f"/orders/{order['order_id']}/cancel", headers=auth_headers(customer))
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "CANCELLED"
+    assert stock_of(cpu) == (17, 0)
+    assert stock_of(gpu) == (20, 0)
+
+
+def test_cancel_restocks_once(client, customer, auth_headers, make_product, put_in_cart, stock_of):
+    product = make_product(stock_quantity=20)
+    put_in_cart(customer, product, 4)
+    order = checkout(client, auth_headers(customer))
+    url = f"/orders/{order['order_id']}/cancel"
+
+    assert client.put(url, headers=auth_headers(customer)).status_code == 200
+    assert client.put(url, headers=auth_headers(customer)).status_code == 400
+    assert stock_of(product) == (20, 0)
+
+
+@pytest.fixture
+def make_order(db, make_product):
+    product = None
+
+    def _make_order(user, created_at, total_price=100.0, status=OrderStatus.PENDING, items=1):
+        nonlocal product
+        product = product or make_product()
+        order = Order(
+            user_id=user.id,
+            status=status,
+            total_price=total_price,
+            shipping_address="1 Main Street",
+            created_at=created_at,
+        )
+        order.order_items = [
+            OrderItem(product_id=product.id, quantity=1, price_at_order=total_price / items) for _ in range(items)
+        ]
+        db.add(order)
+        db.commit()
+        return order
+
+    return _make_order
+
+
+def list_ids(client, url, headers, **params):
+    response = client.get(url, params=params, headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    return [order["id"] for order in body["items"]], body["next_cursor"]
+
+
+def test_order_pages_follow_the_cursor_newest_first(client, customer, other_customer, auth_headers, make_order):
+    start = datetime(2024, 5, 1)
+    # Two orders share a timestamp; the id breaks the tie.
+    orders = [make_order(customer, start + timedelta(hours=hours)) for hours in (0, 1, 1, 2)]
+    make_order(other_customer, start + timedelta(hours=3))
+    headers = auth_headers(customer)
+
+    first, cursor = list_ids(client, "/orders/my", headers, limit=3)
+    rest, last = list_ids(client, "/orders/my", headers, limit=3, cursor=cursor)
+
+    assert first == [orders[3].id, orders[2].id, orders[1].id]
+    assert rest == [orders[0].id]
+    assert last is None
+
+
+def test_order_filters(client, admin, customer, auth_headers, make_order):
+    start = datetime(2024, 5, 1)
+    early = make_order(customer, start, total_price=50.0)
+    shipped = make_order(customer, start + timedelta(days=1), total_price=500.0, status=OrderStatus.SHIPPED)
+    late = make_order(customer, start + timedelta(days=2), total_price=900.0)
+    headers = auth_headers(admin)
+
+    assert list_ids(client, "/orders/", headers, status="PENDING")[0] == [late.id, early.id]
+    assert list_ids(client, "/orders/", headers, min_total=400)[0] == [late.id, shipped.id]
+    window = {"created_from": "2024-05-01T00:00:00", "created_to": "2024-05-03T00:00:00"}
+    assert list_ids(client, "/orders/", headers, **window)[0] == [shipped.id, early.id]
+    assert client.get("/orders/", params={"status": "LOST"}, headers=headers).status_code == 422
+
+
+def test_summary_view_counts_items_instead_of_listing_them(client, customer, auth_headers, make_order):
+    order = make_order(customer, datetime(2024, 5, 1), total_price=300.0, items=3)
+
+    response = client.get("/orders/my", params={"view": "summary"}, headers=auth_headers(customer))
+
+    assert response.status_code == 200
+    [summary] = response.json()["items"]
+    assert summary["id"] == order.id
+    assert summary["item_count"] == 3
+    assert summary["total_price"] == 300.0
+    assert "items" not in summary
+    assert client.get("/orders/my", params={"view": "brief"}, headers=auth_headers(customer)).status_code == 422
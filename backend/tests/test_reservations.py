@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+
+from app.cart.reservations import ReservationSweeper
+from app.models import Product, StockReservation
+
+
+def updated_at(db, product):
+    db.expire_all()
+    return db.query(Product.updated_at).filter(Product.id == product.id).scalar()
+
+
+def test_hold_beyond_available_stock_is_rejected(
+    client, db, customer, other_customer, auth_headers, make_product, stock_of
+):
+    product = make_product(stock_quantity=10)
+    before = updated_at(db, product)
+
+    held = client.post("/cart/", json={"product_id": product.id, "quantity": 6}, headers=auth_headers(other_customer))
+    rejected = client.post("/cart/", json={"product_id": product.id, "quantity": 5}, headers=auth_headers(customer))
+
+    assert held.status_code == 201
+    assert held.json()["reserved_until"] is not None
+    assert rejected.status_code == 400
+    assert rejected.json()["detail"] == "Requested quantity exceeds available stock (available: 4)"
+    assert stock_of(product) == (10, 6)
+    assert updated_at(db, product) == before
+
+
+def test_expired_hold_is_swept(client, db, customer, auth_headers, make_product, stock_of):
+    product = make_product(stock_quantity=10)
+    client.post("/cart/", json={"product_id": product.id, "quantity": 3}, headers=auth_headers(customer))
+    assert stock_of(product) == (10, 3)
+    before = updated_at(db, product)
+
+    db.query(StockReservation).update({"expires_at": datetime.utcnow() - timedelta(seconds=1)})
+    db.commit()
+
+    assert ReservationSweeper(interval=1, batch_size=10).sweep() == 1
+    assert stock_of(product) == (10, 0)
+    assert db.query(StockReservation).count() == 0
+    assert updated_at(db, product) == before
+
+
+def test_checkout_consumes_own_hold(client, db, customer, other_customer, auth_headers, make_product, stock_of):
+    product = make_product(stock_quantity=10)
+    client.post("/cart/", json={"product_id": product.id, "quantity": 6}, headers=auth_headers(customer))
+    client.post("/cart/", json={"product_id": product.id, "quantity": 4}, headers=auth_headers(other_customer))
+    assert stock_of(product) == (10, 10)
+
+    # No unreserved units are left, so this only succeeds from the buyer's hold.
+    response = client.post(
+        "/cart/checkout", json={"shipping_address": "1 Main Street"}, headers=auth_headers(customer)
+    )
+
+    assert response.status_code == 201
+    assert stock_of(product) == (4, 4)
+    assert [row.user_id for row in db.query(StockReservation).all()] == [other_customer.id]
+
+
+def test_product_reports_what_holds_leave_available(client, db, customer, auth_headers, make_product):
+    product = make_product(stock_quantity=10, category="GPU")
+    detail = client.get(f"/products/{product.id}")
+    listed = client.get("/products/", params={"category": "GPU"})
+    assert detail.json()["available_quantity"] == 10
+
+    response = client.post("/cart/", json={"product_id": product.id, "quantity": 10}, headers=auth_headers(customer))
+    assert response.status_code == 201
+
+    held = client.get(f"/products/{product.id}", headers={"If-None-Match": detail.headers["ETag"]})
+    assert held.status_code == 200
+    body = held.json()
+    assert (body["stock_quantity"], body["available_quantity"], body["is_in_stock"]) == (10, 0, False)
+    held_list = client.get("/products/", params={"category": "GPU"}, headers={"If-None-Match": listed.headers["ETag"]})
+    assert held_list.status_code == 200
+    assert held_list.json()["items"][0]["available_quantity"] == 0
+
+    [item] = client.get("/cart/", headers=auth_headers(customer)).json()
+    item_id = item["id"]
+    client.delete(f"/cart/{item_id}", headers=auth_headers(customer))
+    body = client.get(f"/products/{product.id}").json()
+    assert (body["available_quantity"], body["is_in_stock"]) == (10, True)
@@ -0,0 +1,43 @@
+def search(client, q, **params):
+    response = client.get("/products/search", params={"q": q, **params})
+    assert response.status_code == 200
+    return [hit["name"] for hit in response.json()]
+
+
+def test_name_matches_outrank_description_matches(client, make_product):
+    make_product(name="Office Chair", description="Pairs well with a Ryzen desktop")
+    make_product(name="Ryzen 7 7800X3D", brand="AMD")
+    make_product(name="Mechanical Keyboard")
+
+    assert search(client, "ryzen") == ["Ryzen 7 7800X3D", "Office Chair"]
+
+
+def test_rare_terms_weigh_more_than_common_ones(client, make_product):
+    for n in range(4):
+        make_product(name=f"Gaming Mouse {n}")
+    make_product(name="Gaming Headset")
+
+    assert search(client, "gaming headset")[0] == "Gaming Headset"
+
+
+def test_typos_and_partial_words_are_expanded(client, make_product):
+    make_product(name="GeForce RTX 4070", category="GPU")
+    make_product(name="Mechanical Keyboard")
+
+    assert search(client, "gefroce") == ["GeForce RTX 4070"]
+    assert search(client, "mechan") == ["Mechanical Keyboard"]
+    assert search(client, "zzzz") == []
+
+
+def test_writes_reach_the_index(client, admin, auth_headers, make_product):
+    product = make_product(name="Radeon RX 7800 XT", category="GPU")
+    make_product(name="Radeon RX 7600", category="GPU")
+    assert sorted(search(client, "radeon", category="GPU")) == ["Radeon RX 7600", "Radeon RX 7800 XT"]
+
+    response = client.put(f"/products/{product.id}", json={"name": "Arc A770"}, headers=auth_headers(admin))
+    assert response.status_code == 200
+    assert search(client, "radeon") == ["Radeon RX 7600"]
+    assert search(client, "arc") == ["Arc A770"]
+
+    client.put(f"/products/{product.id}", json={"is_active": False}, headers=auth_headers(admin))
+    assert search(client, "arc") == []
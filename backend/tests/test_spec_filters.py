@@ -0,0 +1,61 @@
+import pytest
+
+
+@pytest.fixture
+def catalog(client, admin, auth_headers):
+    def create(name, specifications):
+        body = {
+            "name": name,
+            "category": "GPU",
+            "price": 500.0,
+            "stock_quantity": 10,
+            "sku": name.upper().replace(" ", "-"),
+            "specifications": specifications,
+        }
+        response = client.post("/products/", json=body, headers=auth_headers(admin))
+        assert response.status_code == 201
+        return response.json()
+
+    create("RTX 4060", {"vram": "8GB", "memory": {"type": "GDDR6"}, "ports": ["HDMI", "DisplayPort"]})
+    create("RTX 4070", {"vram": "12GB", "memory": {"type": "GDDR6X"}, "ports": ["HDMI"]})
+    create("RX 7900 XTX", {"vram": 24, "memory": {"type": "GDDR6"}, "ports": ["DisplayPort"]})
+    return create
+
+
+def names(client, query):
+    response = client.get(f"/products/?{query}")
+    assert response.status_code == 200
+    return sorted(item["name"] for item in response.json()["items"])
+
+
+def test_equality_on_text_nested_and_list_values(client, catalog):
+    assert names(client, "spec.memory.type=gddr6") == ["RTX 4060", "RX 7900 XTX"]
+    assert names(client, "spec.ports=HDMI") == ["RTX 4060", "RTX 4070"]
+    assert names(client, "spec.memory.type=GDDR6&spec.ports=HDMI") == ["RTX 4060"]
+
+
+def test_repeated_values_match_any_of_them(client, catalog):
+    assert names(client, "spec.memory.type=GDDR6X&spec.memory.type=HBM3") == ["RTX 4070"]
+
+
+def test_numbers_compare_numerically_across_units(client, catalog):
+    assert names(client, "spec.vram=12") == ["RTX 4070"]
+    assert names(client, "spec.vram.min=12") == ["RTX 4070", "RX 7900 XTX"]
+    assert names(client, "spec.vram.min=10&spec.vram.max=16") == ["RTX 4070"]
+
+
+def test_specification_updates_are_reindexed(client, catalog, admin, auth_headers):
+    product = catalog("RTX 4080", {"vram": "16GB"})
+    assert names(client, "spec.vram.min=16") == ["RTX 4080", "RX 7900 XTX"]
+
+    client.put(
+        f"/products/{product['id']}", json={"specifications": {"vram": "8GB"}}, headers=auth_headers(admin)
+    )
+
+    assert names(client, "spec.vram.min=16") == ["RX 7900 XTX"]
+    assert names(client, "spec.vram=8") == ["RTX 4060", "RTX 4080"]
+
+
+def test_invalid_spec_filters_are_rejected(client, catalog):
+    assert client.get("/products/?spec.vram.min=lots").status_code == 400
+    assert client.get("/products/?spec.=1").status_code == 400
@@ -0,0 +1,142 @@
+from app.cart import shards
+from app.models import Product, ProductStockShard
+
+CHECKOUT = {"shipping_address": "1 Main Street"}
+
+
+def set_shards(client, auth_headers, admin, product, count):
+    response = client.put(
+        f"/products/{product.id}/stock-shards", json={"shards": count}, headers=auth_headers(admin)
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def hold(client, auth_headers, user, product, quantity):
+    response = client.post(
+        "/cart/", json={"product_id": product.id, "quantity": quantity}, headers=auth_headers(user)
+    )
+    assert response.status_code == 201
+    return response
+
+
+def updated_at(db, product):
+    db.expire_all()
+    return db.query(Product.updated_at).filter(Product.id == product.id).scalar()
+
+
+def test_take_spanning_several_shards(client, db, admin, auth_headers, make_product):
+    product = make_product(stock_quantity=20)
+    set_shards(client, auth_headers, admin, product, 4)
+    assert shards.shard_levels(db, product.id) == [5, 5, 5, 5]
+
+    assert shards.take(db, product.id, 12)
+    db.commit()
+
+    assert shards.shard_levels(db, product.id) == [2, 2, 2, 2]
+
+
+def test_take_beyond_shard_total_is_rejected(
+    client, db, admin, customer, auth_headers, make_product, put_in_cart, stock_of
+):
+    product = make_product(stock_quantity=20)
+    set_shards(client, auth_headers, admin, product, 4)
+
+    assert not shards.take(db, product.id, 21)
+    db.rollback()
+    assert shards.shard_levels(db, product.id) == [5, 5, 5, 5]
+
+    put_in_cart(customer, product, 21)
+    response = client.post("/cart/checkout", json=CHECKOUT, headers=auth_headers(customer))
+    assert response.status_code == 409
+    assert response.json()["oversold"][0]["available"] == 20
+    assert shards.shard_levels(db, product.id) == [5, 5, 5, 5]
+    assert stock_of(product) == (20, 0)
+
+
+def test_configure_and_fold_keep_the_products_row(
+    client, db, admin, customer, other_customer, auth_headers, make_product, stock_of
+):
+    product = make_product(stock_quantity=20)
+    hold(client, auth_headers, customer, product, 3)
+
+    body = set_shards(client, auth_headers, admin, product, 4)
+    assert (body["stock_quantity"], body["reserved_quantity"]) == (20, 3)
+    assert sum(body["shard_stock"]) == 17
+    configured_at = updated_at(db, product)
+
+    assert shards.fold(db) == []
+    assert stock_of(product) == (20, 3)
+
+    # A hold moves units out of a shard; the fold only moves the counter.
+    hold(client, auth_headers, other_customer, product, 2)
+    assert shards.fold(db) == []
+    assert stock_of(product) == (20, 5)
+    assert updated_at(db, product) == configured_at
+
+    client.post("/cart/checkout", json=CHECKOUT, headers=auth_headers(customer))
+    [(previous, current)] = shards.fold(db)
+    assert (previous.stock_quantity, current.stock_quantity) == (20, 17)
+    assert stock_of(product) == (17, 2)
+    assert updated_at(db, product) > configured_at
+
+
+def test_switching_back_to_cold_keeps_outstanding_holds(
+    client, db, admin, customer, auth_headers, make_product, stock_of
+):
+    product = make_product(stock_quantity=20)
+    set_shards(client, auth_headers, admin, product, 4)
+    hold(client, auth_headers, customer, product, 6)
+    assert sum(shards.shard_levels(db, product.id)) == 14
+
+    body = set_shards(client, auth_headers, admin, product, 0)
+
+    assert (body["shards"], body["stock_quantity"], body["reserved_quantity"]) == (0, 20, 6)
+    assert body["shard_stock"] == []
+    assert db.query(ProductStockShard).count() == 0
+
+    response = client.post("/cart/checkout", json=CHECKOUT, headers=auth_headers(customer))
+    assert response.status_code == 201
+    assert stock_of(product) == (14, 0)
+
+
+def test_inventory_deltas_apply_to_the_live_shard_level(client, db, admin, auth_headers, make_product, stock_of):
+    product = make_product(stock_quantity=20)
+    set_shards(client, auth_headers, admin, product, 4)
+    # Sales the fold has not written back to the products row yet.
+    assert shards.take(db, product.id, 8)
+    db.commit()
+    assert stock_of(product) == (20, 0)
+
+    response = client.post(
+        "/products/inventory",
+        json={"items": [{"id": product.id, "stock_delta": 3}, {"id": product.id, "price": 90.0}]},
+        headers=auth_headers(admin),
+    )
+
+    assert response.status_code == 200
+    assert response.json()["updated"] == 1
+    assert sum(shards.shard_levels(db, product.id)) == 15
+    assert stock_of(product) == (15, 0)
+
+
+def test_inventory_delta_cannot_take_held_units(
+    client, db, admin, customer, auth_headers, make_product, stock_of
+):
+    product = make_product(stock_quantity=20)
+    set_shards(client, auth_headers, admin, product, 4)
+    hold(client, auth_headers, customer, product, 6)
+
+    def apply(delta):
+        items = [{"id": product.id, "stock_delta": delta}]
+        return client.post("/products/inventory", json={"items": items}, headers=auth_headers(admin)).json()
+
+    assert apply(-15)["rejected"] == [
+        {"ref": f"id:{product.id}", "reason": "Stock would drop below the 6 units held in carts (5)"}
+    ]
+    assert sum(shards.shard_levels(db, product.id)) == 14
+
+    assert apply(-14)["updated"] == 1
+    assert shards.shard_levels(db, product.id) == [0, 0, 0, 0]
+    assert shards.fold(db) == []
+    assert stock_of(product) == (6, 6)
@@ -0,0 +1,53 @@
+import pytest
+
+from app.products import suggest
+
+
+def texts(client, q, limit=20):
+    response = client.get("/products/suggest", params={"q": q, "limit": limit})
+    assert response.status_code == 200
+    return [(hit["kind"], hit["text"]) for hit in response.json()]
+
+
+@pytest.fixture
+def small_budget(monkeypatch):
+    monkeypatch.setattr(suggest, "MAX_PRODUCT_MATCHES", 3)
+
+
+def test_brands_and_categories_survive_the_product_budget(client, make_product, small_budget):
+    for n in range(5):
+        make_product(name=f"Aardvark Cable {n}", category="Cables")
+    make_product(name="Mouse", brand="Asus", category="Audio")
+
+    hits = texts(client, "a")
+
+    assert hits[:2] == [("category", "Audio"), ("brand", "Asus")]
+
+
+def test_names_starting_with_the_query_come_first(client, make_product, small_budget):
+    for n in range(5):
+        make_product(name=f"Zeta Alabaster {n}")
+    make_product(name="Alpha Board")
+
+    assert texts(client, "al")[0] == ("product", "Alpha Board")
+
+
+def test_leading_words_filter_before_the_budget(client, make_product, small_budget):
+    for n in range(5):
+        make_product(name=f"Omega Alabaster {n}")
+    make_product(name="Board Zeta Alpine")
+
+    assert texts(client, "zeta al") == [("product", "Board Zeta Alpine")]
+
+
+def test_suggestions_follow_writes(client, admin, auth_headers, make_product):
+    product = make_product(name="Radeon Card", brand="AMD", category="GPU")
+    assert ("product", "Radeon Card") in texts(client, "rad")
+
+    client.put(f"/products/{product.id}", json={"name": "Ryzen Chip"}, headers=auth_headers(admin))
+    assert texts(client, "rad") == []
+    assert ("product", "Ryzen Chip") in texts(client, "ryz")
+
+    client.put(f"/products/{product.id}", json={"is_active": False}, headers=auth_headers(admin))
+    assert texts(client, "ryz") == []
+    assert texts(client, "amd") == []
@@ -18,9 +18,8 @@ function Navigation() {
   useEffect(() => {
     const fetchCategories = async () => {
       try {
-        const res = await apiClient.get('/products/')
-        const unique = Array.from(new Set(res.data.map((p) => p.category).filter(Boolean)))
-        setCategories(unique)
+        const res = await apiClient.get('/products/facets')
+        setCategories(Object.keys(res.data.categories))
       } catch (err) {
         setCategories([])
       }
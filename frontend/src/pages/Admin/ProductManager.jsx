@@ -6,6 +6,7 @@ import { useAuth } from '../../context/AuthContext'
 function ProductManager() {
   const { hasRole } = useAuth()
   const [products, setProducts] = useState([])
+  const [nextCursor, setNextCursor] = useState(null)
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState('')
   const [success, setSuccess] = useState('')
@@ -38,11 +39,14 @@ function ProductManager() {
     }
   }, [isAdmin])
 
-  const fetchProducts = async () => {
+  const fetchProducts = async (cursor = null) => {
     try {
-      setLoading(true)
-      const res = await apiClient.get('/products/', { params: { is_active: null } })
-      setProducts(res.data)
+      if (!cursor) setLoading(true)
+      const params = { is_active: null }
+      if (cursor) params.cursor = cursor
+      const res = await apiClient.get('/products/', { params })
+      setProducts((prev) => (cursor ? [...prev, ...res.data.items] : res.data.items))
+      setNextCursor(res.data.next_cursor)
     } catch (err) {
       setError('Failed to fetch products')
     } finally {
@@ -212,7 +216,7 @@ function ProductManager() {
                 <td className="px-6 py-4">
                   <div className="h-12 w-12 rounded-lg bg-slate-100 overflow-hidden flex items-center justify-center">
                     {product.image_url ? (
-                      <img src={`${import.meta.env.VITE_API_URL}${product.image_url}`} alt="" className="h-full w-full object-cover" />
+                      <img src={`${import.meta.env.VITE_API_URL}${product.image_variants?.thumb || product.image_url}`} alt="" className="h-full w-full object-cover" />
                     ) : (
                       <ImageIcon className="h-6 w-6 text-slate-300" />
                     )}
@@ -249,6 +253,14 @@ function ProductManager() {
         </table>
       </div>
 
+      {!loading && nextCursor && (
+        <div className="flex justify-center">
+          <button className="btn-outline" onClick={() => fetchProducts(nextCursor)}>
+            Load more
+          </button>
+        </div>
+      )}
+
       {modalOpen && (
         <div className="fixed inset-0 z-50 flex items-center justify-center bg-slate-900/50 p-4 backdrop-blur-sm">
           <div className="card-surface w-full max-w-2xl p-6 shadow-2xl max-h-[90vh] overflow-y-auto animate-in fade-in zoom-in duration-200">
@@ -14,6 +14,8 @@ const OrderStatus = {
 function AdminOrders() {
   const { roles, hasRole } = useAuth()
   const [orders, setOrders] = useState([])
+  const [nextCursor, setNextCursor] = useState(null)
+  const [statusFilter, setStatusFilter] = useState('')
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState('')
   const [success, setSuccess] = useState('')
@@ -31,15 +33,19 @@ function AdminOrders() {
     if (isAdmin || isShipper) {
       fetchOrders()
     }
-  }, [isAdmin, isShipper])
+  }, [isAdmin, isShipper, statusFilter])
 
-  const fetchOrders = async () => {
+  const fetchOrders = async (cursor = null) => {
     try {
-      setLoading(true)
+      if (!cursor) setLoading(true)
       setError('')
       const endpoint = isAdmin ? '/orders/' : '/orders/assigned'
-      const res = await apiClient.get(endpoint)
-      setOrders(res.data)
+      const params = { view: 'summary' }
+      if (statusFilter) params.status = statusFilter
+      if (cursor) params.cursor = cursor
+      const res = await apiClient.get(endpoint, { params })
+      setOrders((prev) => (cursor ? [...prev, ...res.data.items] : res.data.items))
+      setNextCursor(res.data.next_cursor)
     } catch (err) {
       setError(err.response?.data?.detail || 'Failed to load orders')
     } finally {
@@ -123,9 +129,23 @@ function AdminOrders() {
             {isAdmin ? 'Manage all system orders and assignments.' : 'View and update your assigned deliveries.'}
           </p>
         </div>
-        <button className="btn-outline" onClick={fetchOrders}>
-          Refresh
-        </button>
+        <div className="flex items-center gap-2">
+          <select
+            className="rounded-xl border border-slate-200 bg-white px-4 py-2 text-sm font-medium focus:border-brand-primary focus:outline-none"
+            value={statusFilter}
+            onChange={(e) => setStatusFilter(e.target.value)}
+          >
+            <option value="">All statuses</option>
+            {Object.values(OrderStatus).map((status) => (
+              <option key={status} value={status}>
+                {status}
+              </option>
+            ))}
+          </select>
+          <button className="btn-outline" onClick={() => fetchOrders()}>
+            Refresh
+          </button>
+        </div>
       </div>
 
       {error && (
@@ -212,6 +232,14 @@ function AdminOrders() {
         </table>
       </div>
 
+      {nextCursor && (
+        <div className="flex justify-center">
+          <button className="btn-outline" onClick={() => fetchOrders(nextCursor)}>
+            Load more
+          </button>
+        </div>
+      )}
+
       {statusDialog && selectedOrder && (
         <div className="fixed inset-0 z-50 flex items-center justify-center bg-slate-900/50 p-4 backdrop-blur-sm">
           <div className="card-surface w-full max-w-md p-6 shadow-2xl">
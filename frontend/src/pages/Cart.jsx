@@ -1,4 +1,4 @@
-import { useEffect, useState } from 'react'
+import { useEffect, useRef, useState } from 'react'
 import { useNavigate } from 'react-router-dom'
 import { ShoppingBag, Trash2, Minus, Plus, ShieldCheck } from 'lucide-react'
 import apiClient from '../services/api'
@@ -13,6 +13,8 @@ function Cart() {
   const [address, setAddress] = useState('')
   const [notes, setNotes] = useState('')
   const [processing, setProcessing] = useState(false)
+  // Reused when the same checkout is retried, so the server places one order
+  const checkoutKey = useRef(null)
 
   useEffect(() => {
     if (!isAuthenticated) {
@@ -64,17 +66,30 @@ function Cart() {
       return
     }
 
+    if (!checkoutKey.current) {
+      checkoutKey.current = crypto.randomUUID()
+    }
+
     try {
       setProcessing(true)
-      await apiClient.post('/cart/checkout', {
-        shipping_address: address,
-        notes: notes || null,
-      })
+      await apiClient.post(
+        '/cart/checkout',
+        {
+          shipping_address: address,
+          notes: notes || null,
+        },
+        { headers: { 'Idempotency-Key': checkoutKey.current } }
+      )
+      checkoutKey.current = null
       setAddress('')
       setNotes('')
       fetchCart()
       navigate('/my-orders')
     } catch (err) {
+      // Keep the key only when the outcome is unknown (no response)
+      if (err.response) {
+        checkoutKey.current = null
+      }
       setError(err.response?.data?.detail || 'Checkout failed')
     } finally {
       setProcessing(false)
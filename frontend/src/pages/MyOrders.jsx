@@ -6,6 +6,7 @@ import { useAuth } from '../context/AuthContext'
 function MyOrders() {
   const { isAuthenticated } = useAuth()
   const [orders, setOrders] = useState([])
+  const [nextCursor, setNextCursor] = useState(null)
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState('')
   const [success, setSuccess] = useState('')
@@ -22,12 +23,15 @@ function MyOrders() {
     }
   }, [isAuthenticated])
 
-  const fetchOrders = async () => {
+  const fetchOrders = async (cursor = null) => {
     try {
-      setLoading(true)
+      if (!cursor) setLoading(true)
       setError('')
-      const res = await apiClient.get('/orders/my')
-      setOrders(res.data)
+      const params = { view: 'summary' }
+      if (cursor) params.cursor = cursor
+      const res = await apiClient.get('/orders/my', { params })
+      setOrders((prev) => (cursor ? [...prev, ...res.data.items] : res.data.items))
+      setNextCursor(res.data.next_cursor)
     } catch (err) {
       setError(err.response?.data?.detail || 'Failed to load orders')
     } finally {
@@ -35,9 +39,14 @@ function MyOrders() {
     }
   }
 
-  const openDetailDialog = (order) => {
-    setSelectedOrder(order)
-    setDetailDialog(true)
+  const openDetailDialog = async (order) => {
+    try {
+      const res = await apiClient.get(`/orders/${order.id}`)
+      setSelectedOrder(res.data)
+      setDetailDialog(true)
+    } catch (err) {
+      setError(err.response?.data?.detail || 'Failed to load order')
+    }
   }
 
   const closeDetailDialog = () => {
@@ -148,17 +157,10 @@ function MyOrders() {
 
               <div className="mt-4 grid gap-4 lg:grid-cols-[2fr_1fr]">
                 <div>
-                  <p className="text-sm font-semibold text-slate-700">Items ({order.items.length})</p>
-                  <div className="mt-2 space-y-1 text-sm text-slate-500">
-                    {order.items.slice(0, 3).map((item) => (
-                      <p key={item.id}>
-                        {item.product_name} × {item.quantity} · ${item.price_at_order.toFixed(2)}
-                      </p>
-                    ))}
-                    {order.items.length > 3 && (
-                      <p className="text-xs text-slate-400">+{order.items.length - 3} more items</p>
-                    )}
-                  </div>
+                  <p className="text-sm font-semibold text-slate-700">Items</p>
+                  <p className="mt-2 text-sm text-slate-500">
+                    {order.item_count} {order.item_count === 1 ? 'item' : 'items'} · open Details for the full list
+                  </p>
                 </div>
                 <div>
                   <p className="text-sm font-semibold text-slate-700">Shipping Address</p>
@@ -166,12 +168,6 @@ function MyOrders() {
                 </div>
               </div>
 
-              {order.notes && (
-                <div className="mt-4 rounded-xl bg-slate-50 p-3 text-sm text-slate-500">
-                  Notes: {order.notes}
-                </div>
-              )}
-
               <div className="mt-4 flex flex-wrap items-center justify-between gap-3">
                 <div className="flex items-center gap-2 text-sm text-slate-500">
                   <Truck className="h-4 w-4" />
@@ -193,6 +189,13 @@ function MyOrders() {
               </div>
             </div>
           ))}
+          {nextCursor && (
+            <div className="flex justify-center">
+              <button className="btn-outline" onClick={() => fetchOrders(nextCursor)}>
+                Load more
+              </button>
+            </div>
+          )}
         </div>
       )}
 
@@ -219,6 +222,12 @@ function MyOrders() {
                 <span>${selectedOrder.total_price.toFixed(2)}</span>
               </div>
             </div>
+
+            {selectedOrder.notes && (
+              <div className="mt-4 rounded-xl bg-slate-50 p-3 text-sm text-slate-500">
+                Notes: {selectedOrder.notes}
+              </div>
+            )}
           </div>
         </div>
       )}
@@ -93,7 +93,7 @@ function ProductDetail() {
         <div className="card-surface p-6 flex items-center justify-center bg-white min-h-[400px]">
           {product.image_url ? (
             <img 
-              src={`${import.meta.env.VITE_API_URL}${product.image_url}`} 
+              src={`${import.meta.env.VITE_API_URL}${product.image_variants?.full || product.image_url}`} 
               alt={product.name}
               className="max-h-[400px] w-full object-contain"
             />
@@ -12,7 +12,7 @@ function Products() {
   const categoryParam = searchParams.get('category')
 
   const [products, setProducts] = useState([])
-  const [allProducts, setAllProducts] = useState([])
+  const [nextCursor, setNextCursor] = useState(null)
   const [categories, setCategories] = useState([])
   const [customCategories, setCustomCategories] = useState([])
   const [loading, setLoading] = useState(true)
@@ -74,25 +74,25 @@ function Products() {
 
   const fetchAll = async () => {
     try {
-      const res = await apiClient.get('/products/')
-      setAllProducts(res.data)
-      const unique = Array.from(new Set(res.data.map((p) => p.category).filter(Boolean)))
-      setCategories(unique)
+      const facets = await apiClient.get('/products/facets')
+      setCategories(Object.keys(facets.data.categories))
     } catch (err) {
       setCategories([])
     }
   }
 
-  const fetchProducts = async () => {
+  const fetchProducts = async (cursor = null) => {
     try {
-      setLoading(true)
+      if (!cursor) setLoading(true)
       setError('')
       const params = {}
       if (categoryParam) {
         params.category = categoryParam
       }
+      if (cursor) params.cursor = cursor
       const res = await apiClient.get('/products/', { params })
-      setProducts(res.data)
+      setProducts((prev) => (cursor ? [...prev, ...res.data.items] : res.data.items))
+      setNextCursor(res.data.next_cursor)
     } catch (err) {
       setError(err.response?.data?.detail || 'Failed to load products')
     } finally {
@@ -135,7 +135,7 @@ function Products() {
   }, [products, searchTerm, sortBy])
 
   const previewCategory = categoryParam || mergedCategories[0]
-  const previewProducts = (allProducts || []).filter((p) => p.category === previewCategory).slice(0, 3)
+  const previewProducts = products.filter((p) => p.category === previewCategory).slice(0, 3)
 
   const handleAddToCart = async (productId) => {
     if (!isAuthenticated) {
@@ -247,7 +247,16 @@ function Products() {
   const handleDeleteCategory = async (category) => {
     if (!window.confirm(`Are you sure you want to delete ALL products in category "${category}"?`)) return
     try {
-      const productsToDelete = allProducts.filter(p => p.category === category)
+      // Collect every product of the category, page by page, before deleting
+      const productsToDelete = []
+      let cursor = null
+      do {
+        const params = { category }
+        if (cursor) params.cursor = cursor
+        const res = await apiClient.get('/products/', { params })
+        productsToDelete.push(...res.data.items)
+        cursor = res.data.next_cursor
+      } while (cursor)
       await Promise.all(productsToDelete.map(p => apiClient.delete(`/products/${p.id}`)))
       if (categoryParam === category) {
         searchParams.delete('category')
@@ -360,7 +369,7 @@ function Products() {
                   <div className="h-10 w-10 rounded-lg bg-slate-100 overflow-hidden">
                     {product.image_url ? (
                       <img
-                        src={`${import.meta.env.VITE_API_URL}${product.image_url}`}
+                        src={`${import.meta.env.VITE_API_URL}${product.image_variants?.card || product.image_url}`}
                         alt={product.name}
                         className="h-full w-full object-cover"
                       />
@@ -432,7 +441,7 @@ function Products() {
                   <div className="h-44 bg-slate-100">
                     {product.image_url ? (
                       <img
-                        src={`${import.meta.env.VITE_API_URL}${product.image_url}`}
+                        src={`${import.meta.env.VITE_API_URL}${product.image_variants?.card || product.image_url}`}
                         alt={product.name}
                         className="h-full w-full object-cover"
                       />
@@ -482,6 +491,14 @@ function Products() {
               )}
             </div>
           )}
+
+          {!loading && nextCursor && (
+            <div className="flex justify-center">
+              <button className="btn-outline" onClick={() => fetchProducts(nextCursor)}>
+                Load more
+              </button>
+            </div>
+          )}
         </div>
       </div>
 
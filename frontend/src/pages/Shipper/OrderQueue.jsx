@@ -6,6 +6,7 @@ import { useAuth } from '../../context/AuthContext'
 function OrderQueue() {
   const { hasRole } = useAuth()
   const [orders, setOrders] = useState([])
+  const [nextCursor, setNextCursor] = useState(null)
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState('')
 
@@ -17,11 +18,14 @@ function OrderQueue() {
     }
   }, [isShipper])
 
-  const fetchAssignedOrders = async () => {
+  const fetchAssignedOrders = async (cursor = null) => {
     try {
-      setLoading(true)
-      const res = await apiClient.get('/orders/assigned')
-      setOrders(res.data)
+      if (!cursor) setLoading(true)
+      const params = { view: 'summary' }
+      if (cursor) params.cursor = cursor
+      const res = await apiClient.get('/orders/assigned', { params })
+      setOrders((prev) => (cursor ? [...prev, ...res.data.items] : res.data.items))
+      setNextCursor(res.data.next_cursor)
     } catch (err) {
       setError('Failed to fetch assigned orders')
     } finally {
@@ -101,6 +105,14 @@ function OrderQueue() {
           ))
         )}
       </div>
+
+      {!loading && nextCursor && (
+        <div className="flex justify-center">
+          <button className="btn-outline" onClick={() => fetchAssignedOrders(nextCursor)}>
+            Load more
+          </button>
+        </div>
+      )}
     </div>
   )
 }